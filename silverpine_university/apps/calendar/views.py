@@ -1,21 +1,15 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render
 from django.views import View
-from django.contrib import messages
 from .models import AcademicEvent, Semester, UniversityHoliday
-from apps.students.models import Student
+from apps.students.middleware import StudentRequiredMixin
 from datetime import datetime
 
 
-class AcademicCalendarView(View):
+class AcademicCalendarView(StudentRequiredMixin, View):
     """View academic calendar with all events"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = Student.objects.get(student_id=student_id)
+        student = request.student
         
         # Get current semester
         current_semester = Semester.objects.filter(is_current=True).first()
@@ -43,16 +37,11 @@ class AcademicCalendarView(View):
         return render(request, 'calendar/academic_calendar.html', context)
 
 
-class SemesterInfoView(View):
+class SemesterInfoView(StudentRequiredMixin, View):
     """View semester-specific information"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = Student.objects.get(student_id=student_id)
+        student = request.student
         
         # Get all semesters
         semesters = Semester.objects.filter(is_active=True).order_by('-start_date')
@@ -1,5 +1,8 @@
+from django import forms
 from django.contrib import admin
-from .models import Department, Professor, Course, CourseSection
+from .models import Department, Professor, Course, CoursePrerequisite, CourseSection
+from .rooms import get_occupancy
+from .services import process_waitlists
 
 
 @admin.register(Department)
@@ -27,11 +30,20 @@ class ProfessorAdmin(admin.ModelAdmin):
     )
 
 
+class CoursePrerequisiteInline(admin.TabularInline):
+    model = CoursePrerequisite
+    fk_name = 'course'
+    fields = ['required_course', 'group']
+    autocomplete_fields = ['required_course']
+    extra = 1
+
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = ['course_code', 'title', 'department', 'credits', 'level']
     list_filter = ['department', 'level', 'credits']
     search_fields = ['course_code', 'title', 'description']
+    inlines = [CoursePrerequisiteInline]
     
     fieldsets = (
         ('Course Information', {
@@ -43,12 +55,40 @@ class CourseAdmin(admin.ModelAdmin):
     )
 
 
+class CourseSectionAdminForm(forms.ModelForm):
+    """Section form that refuses to double-book a room"""
+    
+    class Meta:
+        model = CourseSection
+        fields = '__all__'
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time, end_time = cleaned_data.get('start_time'), cleaned_data.get('end_time')
+        if start_time and end_time and end_time <= start_time:
+            self.add_error('end_time', 'End time must be after the start time.')
+            return cleaned_data
+        
+        meeting = [cleaned_data.get(name) for name in ('semester', 'building', 'room_number', 'days', 'start_time', 'end_time')]
+        if all(meeting) and cleaned_data.get('is_active'):
+            exclude = None if self.instance._state.adding else self.instance.pk
+            conflicts = get_occupancy().conflicts(*meeting, exclude=exclude)
+            if conflicts:
+                raise forms.ValidationError(
+                    f"{cleaned_data['building']} {cleaned_data['room_number']} is already booked "
+                    f"at this time by {', '.join(sorted(conflicts))}."
+                )
+        return cleaned_data
+
+
 @admin.register(CourseSection)
 class CourseSectionAdmin(admin.ModelAdmin):
+    form = CourseSectionAdminForm
     list_display = ['section_id', 'course', 'professor', 'semester', 'days', 'start_time', 'building', 'enrolled_count', 'max_capacity', 'is_active']
     list_filter = ['semester', 'is_active', 'registration_open', 'course__department']
     search_fields = ['section_id', 'course__course_code', 'course__title', 'professor__last_name']
     readonly_fields = ['enrolled_count', 'waitlist_count']
+    actions = ['promote_waitlisted']
     
     fieldsets = (
         ('Section Information', {
@@ -66,4 +106,27 @@ class CourseSectionAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('is_active', 'registration_open')
         }),
-    )
\ No newline at end of file
+    )
+    
+    def save_model(self, request, obj, form, change):
+        """Save without clobbering live seat counters and fill any new seats from the waitlist"""
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+        
+        # Registrations may have moved the counters since this form was loaded
+        counters = {'enrolled_count', 'waitlist_count', 'waitlist_sequence'}
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name not in counters
+        ])
+        
+        if 'max_capacity' in form.changed_data:
+            promoted = process_waitlists([obj.section_id])
+            if promoted:
+                self.message_user(request, f'Promoted {promoted} student(s) from the waitlist.')
+    
+    @admin.action(description='Promote waitlisted students into open seats')
+    def promote_waitlisted(self, request, queryset):
+        promoted = process_waitlists(list(queryset.values_list('section_id', flat=True)))
+        self.message_user(request, f'Promoted {promoted} student(s) from the waitlist.')
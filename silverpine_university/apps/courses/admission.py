@@ -0,0 +1,252 @@
+"""
+Admission control for registration endpoints.
+
+Each protected view has a token bucket that admits requests at a steady
+rate with a short burst allowance. Requests that find the bucket empty
+take a ticket in a bounded FIFO waiting room and get a "you're in line"
+page. That page resubmits the original form when the ticket is due, and
+tickets are admitted strictly in the order they were handed out. Once
+the waiting room is full, new arrivals are turned away with a 503
+instead of queueing on the database.
+
+Limits are configured per view in the ADMISSION_CONTROL setting. State
+lives in the backend named by ADMISSION_BACKEND. LocalAdmissionBackend
+keeps it in process memory. CacheAdmissionBackend keeps it in the
+shared cache alias so that every worker shares one queue.
+"""
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError
+from django.shortcuts import render
+from django.utils.module_loading import import_string
+
+
+TICKET_COOKIE = 'admission_ticket_{scope}'
+
+# Seconds a ticket survives without its holder checking back in
+TICKET_TIMEOUT = 60
+
+DEFAULT_LIMITS = {
+    'rate': 10,          # admissions per second
+    'burst': 20,         # admissions allowed at once after a quiet period
+    'queue_size': 500,   # tickets the waiting room holds before shedding load
+}
+
+
+@dataclass
+class Decision:
+    """Outcome of asking to be admitted"""
+
+    admitted: bool
+    ticket: int = None
+    position: int = None
+    wait: float = 0.0
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.wait))
+
+
+class WaitingRoom:
+    """Token bucket and FIFO ticket queue for one protected view"""
+
+    def __init__(self, rate, burst, queue_size, now):
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.tokens = float(burst)
+        self.updated = now
+        self.next_ticket = 1
+        self.queue = {}  # ticket -> last time its holder checked in, in ticket order
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def expire(self, now):
+        for ticket, seen in list(self.queue.items()):
+            if now - seen > TICKET_TIMEOUT:
+                del self.queue[ticket]
+
+    def admit(self, ticket, now):
+        self.refill(now)
+        self.expire(now)
+
+        if ticket not in self.queue:
+            ticket = None
+        if ticket is None and not self.queue and self.tokens >= 1:
+            # Nobody is waiting, so there is no line to jump
+            self.tokens -= 1
+            return Decision(True)
+
+        if ticket is None:
+            if len(self.queue) >= self.queue_size:
+                return Decision(False, wait=self.queue_size / self.rate)
+            ticket = self.next_ticket
+            self.next_ticket += 1
+        self.queue[ticket] = now
+
+        position = list(self.queue).index(ticket)
+        if position + 1 <= self.tokens:
+            # Everyone ahead of this ticket can be served from the same bucket
+            del self.queue[ticket]
+            self.tokens -= 1
+            return Decision(True, ticket)
+
+        wait = (position + 1 - self.tokens) / self.rate
+        return Decision(False, ticket, position + 1, wait)
+
+
+class RoomBusy(Exception):
+    """The waiting room could not be locked in time"""
+
+
+class AdmissionBackend:
+    """Interface every admission backend implements"""
+
+    def room(self, scope, limits, now):
+        """Context manager yielding the scope's WaitingRoom with exclusive access"""
+        raise NotImplementedError
+
+    def admit(self, scope, ticket, limits):
+        now = time.time()
+        try:
+            with self.room(scope, limits, now) as waiting_room:
+                return waiting_room.admit(ticket, now)
+        except RoomBusy:
+            # Turn the request away rather than touch the room without the lock
+            return Decision(False, wait=1)
+
+
+class LocalAdmissionBackend(AdmissionBackend):
+    """Waiting rooms kept in the memory of the current process"""
+
+    def __init__(self):
+        self.rooms = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def room(self, scope, limits, now):
+        with self.lock:
+            if scope not in self.rooms:
+                self.rooms[scope] = WaitingRoom(now=now, **limits)
+            yield self.rooms[scope]
+
+
+class CacheAdmissionBackend(AdmissionBackend):
+    """Waiting rooms kept in the shared cache alias and shared by every worker"""
+
+    ROOM_KEY = 'admission:room:{scope}'
+    LOCK_KEY = 'admission:lock:{scope}'
+    LOCK_TIMEOUT = 5
+
+    @contextmanager
+    def room(self, scope, limits, now):
+        cache = caches['shared']
+        lock_key = self.LOCK_KEY.format(scope=scope)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        # cache.add is atomic on every backend, which makes it a usable mutex;
+        # a holder that died keeps the lock only until it expires
+        while not cache.add(lock_key, token, self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise RoomBusy(scope)
+            time.sleep(0.005)
+        try:
+            key = self.ROOM_KEY.format(scope=scope)
+            waiting_room = cache.get(key) or WaitingRoom(now=now, **limits)
+            yield waiting_room
+            cache.set(key, waiting_room, None)
+        finally:
+            # Once our lock has expired it may belong to someone else; only release our own
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.ADMISSION_BACKEND)()
+    return _backend
+
+
+def get_limits(scope):
+    """Limits for a scope, or None when it is not admission controlled"""
+    configured = getattr(settings, 'ADMISSION_CONTROL', {})
+    if scope not in configured:
+        return None
+    return {**DEFAULT_LIMITS, **configured[scope]}
+
+
+def waiting_room_response(request, decision, status):
+    context = {
+        'decision': decision,
+        'form_data': [
+            (name, value)
+            for name, values in request.POST.lists()
+            if name != 'csrfmiddlewaretoken'
+            for value in values
+        ],
+        'room_full': decision.ticket is None,
+    }
+    response = render(request, 'courses/waiting_room.html', context, status=status)
+    response['Retry-After'] = str(decision.retry_after)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def admission_control(scope):
+    """
+    Decorator limiting how fast requests reach a view.
+
+    Requests over the limit get a waiting room page (429) holding their
+    place in line, or a 503 when the line itself is full. A request that
+    still finds the database locked gets the same page rather than a 500.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            limits = get_limits(scope)
+            if limits is None:
+                return view(request, *args, **kwargs)
+
+            cookie = TICKET_COOKIE.format(scope=scope)
+            try:
+                ticket = int(request.get_signed_cookie(cookie, salt=scope, default=None) or 0) or None
+            except ValueError:
+                ticket = None
+
+            decision = get_backend().admit(scope, ticket, limits)
+            if not decision.admitted:
+                response = waiting_room_response(request, decision, 429 if decision.ticket else 503)
+                if decision.ticket:
+                    response.set_signed_cookie(cookie, str(decision.ticket), salt=scope,
+                                               max_age=TICKET_TIMEOUT, httponly=True, samesite='Lax')
+                return response
+
+            try:
+                response = view(request, *args, **kwargs)
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                # The database stayed locked past its timeout; ask the client to come back shortly
+                response = waiting_room_response(request, Decision(False, wait=limits['burst'] / limits['rate']), 503)
+            if ticket:
+                response.delete_cookie(cookie)
+            return response
+        return wrapped
+    return decorator
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.courses'
-    verbose_name = 'Course Management'
\ No newline at end of file
+    verbose_name = 'Course Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
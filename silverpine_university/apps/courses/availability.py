@@ -0,0 +1,64 @@
+"""
+Seat availability snapshots for the registration page.
+
+Every change to a section's seat counters bumps a shared seat version.
+Clients refresh seat counts with conditional GETs against an ETag built
+from that version, so an unchanged snapshot costs neither a query nor a
+response body. The version lives in the shared cache alias, which must be
+shared between processes when more than one serves registration.
+"""
+import json
+
+from django.core.cache import cache
+
+from .models import CourseSection
+from .versioning import bump_version, get_version
+
+
+SEAT_VERSION_KEY = 'seats:version'
+SNAPSHOT_KEY = 'seats:snapshot:{semester}:{version}'
+SNAPSHOT_TIMEOUT = 60 * 10
+
+
+def seat_version():
+    return get_version(SEAT_VERSION_KEY)
+
+
+def bump_seat_version():
+    """Mark every cached availability snapshot as stale"""
+    bump_version(SEAT_VERSION_KEY)
+
+
+def seat_etag(semester):
+    return f'"seats-{semester.replace(" ", "-")}-{seat_version()}"'
+
+
+def availability_snapshot(semester):
+    """
+    JSON document of seat counts for every open section in a semester,
+    built with one query and cached per seat version.
+    """
+    version = seat_version()
+    key = SNAPSHOT_KEY.format(semester=semester.replace(' ', '-'), version=version)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        sections = CourseSection.objects.filter(
+            semester=semester,
+            is_active=True,
+            registration_open=True,
+        ).values_list('section_id', 'enrolled_count', 'max_capacity', 'waitlist_count')
+        snapshot = json.dumps({
+            'semester': semester,
+            'version': version,
+            'sections': {
+                section_id: {
+                    'enrolled': enrolled,
+                    'capacity': capacity,
+                    'available': max(capacity - enrolled, 0),
+                    'waitlist': waitlist,
+                }
+                for section_id, enrolled, capacity, waitlist in sections
+            },
+        })
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
@@ -0,0 +1,147 @@
+"""
+Registration cart kept outside the database session.
+
+The cart is stored in the shared cache as a comma-separated string of
+section ids, keyed by student, so adding and removing items never writes
+to the database. Only ids of existing sections are accepted, and a cart
+holds at most CART_MAX_ITEMS of them.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import CourseSection
+from apps.grades.models import Enrollment
+
+
+CART_KEY = 'cart:{student_id}'
+
+# Cart item states reported by validate_cart
+OPEN = 'open'
+FULL = 'full'
+ENROLLED = 'enrolled'
+WAITLISTED = 'waitlisted'
+CLOSED = 'closed'
+MISSING = 'missing'
+
+
+class CartError(ValueError):
+    """A section that cannot be added to the cart"""
+
+
+class CourseCart:
+    """A student's registration cart"""
+
+    def __init__(self, student_id):
+        self.key = CART_KEY.format(student_id=student_id)
+        self.cache = caches['shared']
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            stored = self.cache.get(self.key)
+            self._items = stored.split(',') if stored else []
+        return self._items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, section_id):
+        return section_id in self.items
+
+    def add(self, section_id):
+        """
+        Add a section; returns False when it was already in the cart. Raises
+        CartError for an unknown section or a full cart.
+        """
+        section_id = (section_id or '').strip()
+        max_length = CourseSection._meta.pk.max_length
+        if (
+            not section_id or ',' in section_id or len(section_id) > max_length
+            or not CourseSection.objects.filter(pk=section_id).exists()
+        ):
+            raise CartError('That section does not exist.')
+        if section_id in self.items:
+            return False
+        if len(self.items) >= settings.CART_MAX_ITEMS:
+            raise CartError(f'Your cart already holds {settings.CART_MAX_ITEMS} sections.')
+        self.items.append(section_id)
+        self.save()
+        return True
+
+    def remove(self, section_id):
+        """Remove a section; returns False when it was not in the cart"""
+        if section_id not in self.items:
+            return False
+        self.items.remove(section_id)
+        self.save()
+        return True
+
+    def clear(self):
+        self._items = []
+        self.cache.delete(self.key)
+
+    def save(self):
+        if self.items:
+            self.cache.set(self.key, ','.join(self.items), settings.CART_TIMEOUT)
+        else:
+            self.cache.delete(self.key)
+
+
+@dataclass
+class CartItem:
+    """A cart entry together with its current registration state"""
+
+    section_id: str
+    state: str
+    section: CourseSection = None
+
+    @property
+    def can_enroll(self):
+        return self.state in (OPEN, FULL)
+
+
+def validate_cart(student, section_ids):
+    """
+    Report the state of every cart item, in cart order, using two queries:
+    one for the sections and one for the student's enrollments in them.
+    """
+    section_ids = list(section_ids)
+    if not section_ids:
+        return []
+
+    sections = (
+        CourseSection.objects
+        .select_related('course', 'professor')
+        .in_bulk(section_ids)
+    )
+    statuses = dict(
+        Enrollment.objects.filter(
+            student=student,
+            course_section_id__in=section_ids,
+            status__in=['Enrolled', 'Waitlisted'],
+        ).values_list('course_section_id', 'status')
+    )
+
+    items = []
+    for section_id in section_ids:
+        section = sections.get(section_id)
+        if section is None:
+            state = MISSING
+        elif statuses.get(section_id) == 'Enrolled':
+            state = ENROLLED
+        elif statuses.get(section_id) == 'Waitlisted':
+            state = WAITLISTED
+        elif not section.is_active or not section.registration_open:
+            state = CLOSED
+        elif section.is_full():
+            state = FULL
+        else:
+            state = OPEN
+        items.append(CartItem(section_id, state, section))
+    return items
@@ -0,0 +1,96 @@
+"""
+Course catalog browsing: keyset pagination, facet counts and page caching.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count
+
+from .versioning import bump_version, get_version
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def catalog_version():
+    """Current catalog generation; part of every cached page key"""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog page at once"""
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def page_cache_key(**filters):
+    """Cache key for one rendered catalog page and filter combination"""
+    raw = '|'.join(f'{name}={filters[name]}' for name in sorted(filters))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'catalog:page:{catalog_version()}:{digest}'
+
+
+def facet_counts(courses):
+    """
+    Count courses per department and per level with one grouped query.
+
+    Returns ``(department_counts, level_counts, combinations)``, where
+    ``combinations`` maps each (department, level) pair to its count so
+    that the size of any filtered result can be derived without another
+    COUNT query.
+    """
+    combinations = {
+        (row['department'], row['level']): row['total']
+        for row in courses.order_by().values('department', 'level').annotate(total=Count('pk'))
+    }
+    return split_facets(combinations)
+
+
+def split_facets(combinations):
+    """``(department_counts, level_counts, combinations)`` from per (department, level) counts"""
+    department_counts = {}
+    level_counts = {}
+    for (department, level), total in combinations.items():
+        department_counts[department] = department_counts.get(department, 0) + total
+        level_counts[level] = level_counts.get(level, 0) + total
+    return department_counts, level_counts, combinations
+
+
+def keyset_page(courses, after='', before='', size=None):
+    """
+    Fetch one page of courses ordered by course code.
+
+    Pages are addressed by the code of the last course on the previous
+    page (``after``) or the first course on the next page (``before``),
+    so deep pages cost the same as the first one.
+    Returns ``(courses, has_previous, has_next)``.
+    """
+    size = size or settings.CATALOG_PAGE_SIZE
+    if before:
+        rows = list(courses.filter(course_code__lt=before).order_by('-course_code')[:size + 1])
+        return rows[:size][::-1], len(rows) > size, True
+
+    if after:
+        courses = courses.filter(course_code__gt=after)
+    rows = list(courses.order_by('course_code')[:size + 1])
+    return rows[:size], bool(after), len(rows) > size
+
+
+def ranked_page(courses, ranked_codes, after='', before='', size=None):
+    """
+    Fetch one page of search results, keeping their relevance order.
+
+    Uses the same ``after``/``before`` cursors as keyset_page.
+    """
+    size = size or settings.CATALOG_PAGE_SIZE
+    positions = {code: position for position, code in enumerate(ranked_codes)}
+    if before in positions:
+        start = max(positions[before] - size, 0)
+    elif after in positions:
+        start = positions[after] + 1
+    else:
+        start = 0
+    end = start + size
+
+    page = courses.in_bulk(ranked_codes[start:end])
+    rows = [page[code] for code in ranked_codes[start:end] if code in page]
+    return rows, start > 0, end < len(ranked_codes)
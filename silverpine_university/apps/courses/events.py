@@ -0,0 +1,106 @@
+"""
+Publish/subscribe of live seat-count changes.
+
+Enrollment services publish the new counters of every section they touch
+once their transaction commits, and the server-sent events endpoint
+relays them to connected students. The broker is chosen with the
+SEAT_EVENTS_BACKEND setting. LocalSeatEventBroker delivers within the
+current process only; deployments running several ASGI workers should
+point the setting at a broker backed by a shared message bus.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class SeatEventBroker:
+    """Interface every seat event backend implements"""
+
+    def publish(self, event):
+        """Send an event to every subscriber; safe to call from any thread"""
+        raise NotImplementedError
+
+    def subscribe(self):
+        """Return a Subscription whose ``get()`` awaits the next event"""
+        raise NotImplementedError
+
+
+class Subscription:
+    """One subscriber's queue of pending events"""
+
+    def __init__(self, broker, maxsize):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client skips deltas; the next one carries current counts
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalSeatEventBroker(SeatEventBroker):
+    """In-process broker that needs no external services"""
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop has already shut down
+                self.unsubscribe(subscription)
+
+    def subscribe(self):
+        subscription = Subscription(self, self.maxsize)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.SEAT_EVENTS_BACKEND)()
+    return _broker
+
+
+def publish_seat_counts(sections):
+    """Publish the current seat counters of the given sections"""
+    if not sections:
+        return
+    get_broker().publish({
+        section.section_id: {
+            'enrolled': section.enrolled_count,
+            'capacity': section.max_capacity,
+            'available': max(section.max_capacity - section.enrolled_count, 0),
+            'waitlist': section.waitlist_count,
+        }
+        for section in sections
+    })
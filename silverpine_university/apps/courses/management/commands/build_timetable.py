@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.courses import catalog
+from apps.courses.availability import bump_seat_version
+from apps.courses.models import CourseSection
+from apps.courses.rooms import bump_room_version
+from apps.courses.timetabling import RoomSpec, load_problem, solve
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from queue import Empty
+import csv
+
+
+UNASSIGNED_BUILDING = 'TBA'
+
+
+def run_start(problem, seed, time_limit, queue):
+    """One solver start inside a worker process, streaming progress back through ``queue``"""
+    return solve(problem, seed, time_limit, progress=queue.put)
+
+
+class Command(BaseCommand):
+    help = 'Assign meeting times and rooms to a semester\'s sections with a heuristic timetabling solver'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', default='Fall 2026', help='Semester to timetable')
+        parser.add_argument('--time-limit', type=float, default=30.0, help='Seconds of local search per start')
+        parser.add_argument('--starts', type=int, default=1, help='Independent randomised starts')
+        parser.add_argument('--workers', type=int, default=1, help='Processes to run starts in parallel')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the first start')
+        parser.add_argument('--rooms', help='CSV of building,room,capacity to use instead of rooms seen in existing sections')
+        parser.add_argument('--include-enrolled', action='store_true', help='Also move sections that already have students')
+        parser.add_argument('--apply', action='store_true', help='Save the best timetable (default is a dry run)')
+
+    def handle(self, *args, **options):
+        rooms = self.read_rooms(options['rooms']) if options['rooms'] else None
+        problem = load_problem(options['semester'], options['include_enrolled'], rooms)
+        if not problem.sections:
+            raise CommandError(f'No sections to timetable in {options["semester"]}.')
+        if not problem.rooms:
+            raise CommandError('No rooms known; pass --rooms.')
+        self.stdout.write(
+            f'Timetabling {len(problem.sections)} sections into {len(problem.rooms)} rooms '
+            f'({options["starts"]} start(s), {options["workers"]} worker(s), {options["time_limit"]:.0f}s each)'
+        )
+
+        seeds = range(options['seed'], options['seed'] + options['starts'])
+        if options['workers'] > 1:
+            solutions = self.run_parallel(problem, seeds, options)
+        else:
+            solutions = [solve(problem, seed, options['time_limit'], progress=self.show_progress) for seed in seeds]
+
+        best = min(solutions, key=lambda solution: solution.score)
+        self.stdout.write('')
+        self.stdout.write(f'Best start: seed {best.seed}')
+        for name, value in best.metrics.items():
+            self.stdout.write(f'  {name:<16}{value}')
+        if best.unplaced:
+            self.stdout.write(self.style.WARNING(
+                f'Could not place: {", ".join(best.unplaced[:20])}{" ..." if len(best.unplaced) > 20 else ""}'
+            ))
+
+        if options['apply']:
+            self.apply(best)
+            self.stdout.write(self.style.SUCCESS(f'Saved times and rooms for {len(best.assignments)} sections'))
+            if best.unplaced:
+                self.stdout.write(f'{len(best.unplaced)} unplaced section(s) are now in building {UNASSIGNED_BUILDING} with no room')
+        else:
+            self.stdout.write('Dry run; pass --apply to save this timetable.')
+
+    def read_rooms(self, path):
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                return [
+                    RoomSpec(row['building'].strip(), row['room'].strip(), int(row['capacity']))
+                    for row in csv.DictReader(stream)
+                ]
+        except (OSError, KeyError, ValueError) as exc:
+            raise CommandError(f'Cannot read rooms from {path}: {exc}')
+
+    def run_parallel(self, problem, seeds, options):
+        solutions = []
+        with Manager() as manager, ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            queue = manager.Queue()
+            futures = [pool.submit(run_start, problem, seed, options['time_limit'], queue) for seed in seeds]
+            pending = set(futures)
+            while pending:
+                try:
+                    self.show_progress(queue.get(timeout=0.5))
+                except Empty:
+                    pass
+                for future in [future for future in pending if future.done()]:
+                    pending.discard(future)
+            while not queue.empty():
+                self.show_progress(queue.get())
+            for future in as_completed(futures):
+                solutions.append(future.result())
+        return solutions
+
+    def show_progress(self, event):
+        extra = f'  iter {event["iteration"]}' if 'iteration' in event else ''
+        self.stdout.write(
+            f'[seed {event["seed"]}] {event["phase"]:<9} {event["elapsed"]:>7.1f}s  '
+            f'placed {event["placed"]}  unplaced {event["unplaced"]}  '
+            f'building misses {event["building_misses"]}  course overlaps {event["course_overlaps"]}  '
+            f'room fill {event["room_fill"]:.2f}  penalty {event["penalty"]:.1f}{extra}'
+        )
+
+    def apply(self, solution):
+        sections = CourseSection.objects.in_bulk(list(solution.assignments) + solution.unplaced)
+        for section_id, (days, start_time, end_time, building, room) in solution.assignments.items():
+            section = sections[section_id]
+            section.days, section.start_time, section.end_time = days, start_time, end_time
+            section.building, section.room_number = building, room
+        for section_id in solution.unplaced:
+            # Release whatever room an unplaced section held so it cannot clash with the new timetable
+            sections[section_id].building, sections[section_id].room_number = UNASSIGNED_BUILDING, ''
+        with transaction.atomic():
+            CourseSection.objects.bulk_update(
+                sections.values(),
+                ['days', 'start_time', 'end_time', 'building', 'room_number'],
+                batch_size=500,
+            )
+        # bulk_update skips the save signals that normally invalidate these
+        catalog.bump_catalog_version()
+        bump_seat_version()
+        bump_room_version()
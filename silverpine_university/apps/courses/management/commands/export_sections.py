@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.courses.section_io import FORMATS, export_sections
+import sys
+
+
+class Command(BaseCommand):
+    help = 'Stream course sections to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, or - for standard output')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else csv')
+        parser.add_argument('--semester', help='Only export sections of this semester')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+
+        if path == '-':
+            count = export_sections(sys.stdout, format, options['semester'])
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                count = export_sections(stream, format, options['semester'])
+            self.stdout.write(self.style.SUCCESS(f'Exported {count} sections to {path}'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.courses.section_io import DEFAULT_CHUNK_SIZE, FORMATS, SectionImporter, read_rows
+import time
+
+
+class Command(BaseCommand):
+    help = 'Create or update course sections from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON Lines file of sections')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else csv')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows written per statement')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        importer = SectionImporter(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+
+        started = time.perf_counter()
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                report = importer.run(read_rows(stream, format))
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run']:
+            for section_id, diff in report.changes:
+                if all(old is None for old, _ in diff.values()):
+                    self.stdout.write(f'+ {section_id}')
+                    continue
+                self.stdout.write(f'~ {section_id}')
+                for name, (old, new) in diff.items():
+                    self.stdout.write(f'    {name}: {old} -> {new}')
+
+        for line_number, message in report.errors:
+            self.stderr.write(f'line {line_number}: {message}')
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        summary = (
+            f'{verb} {report.created}, {"update" if options["dry_run"] else "updated"} {report.updated}, '
+            f'left {report.unchanged} unchanged, rejected {len(report.errors)} '
+            f'({report.rows} rows in {elapsed:.2f}s)'
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not report.errors else self.style.WARNING(summary))
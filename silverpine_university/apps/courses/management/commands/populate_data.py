@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import Department, Professor, Course, CourseSection
+from apps.courses.prerequisites import load_from_text
 from apps.students.models import Student
 from apps.calendar.models import Semester, AcademicEvent, UniversityHoliday
 from apps.financial_aid.models import FinancialAccount, FinancialAidPackage, Scholarship
@@ -264,6 +265,9 @@ class Command(BaseCommand):
             )
         
         self.stdout.write(f'Created {len(courses_data)} courses')
+        
+        edges = load_from_text(Course.objects.exclude(prerequisites=''))
+        self.stdout.write(f'Created {edges} prerequisite links')
 
     def create_course_sections(self):
         courses = Course.objects.all()
@@ -274,9 +278,9 @@ class Command(BaseCommand):
             (time(8, 0), time(9, 15)),
             (time(9, 30), time(10, 45)),
             (time(11, 0), time(12, 15)),
-            (time(12, 30), time(1, 45)),
-            (time(2, 0), time(3, 15)),
-            (time(3, 30), time(4, 45)),
+            (time(12, 30), time(13, 45)),
+            (time(14, 0), time(15, 15)),
+            (time(15, 30), time(16, 45)),
         ]
         
         buildings = [
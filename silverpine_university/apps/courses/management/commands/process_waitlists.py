@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.courses.services import process_waitlists
+
+
+class Command(BaseCommand):
+    help = 'Promote waitlisted students into every section with open seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('section_ids', nargs='*', help='Limit the pass to these sections')
+
+    def handle(self, *args, **options):
+        promoted = process_waitlists(options['section_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Promoted {promoted} waitlisted student(s)'))
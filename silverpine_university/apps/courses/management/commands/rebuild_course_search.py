@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.courses import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text course search index from the catalog'
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Full-text course search requires SQLite with FTS5.')
+        count = search.create_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} courses'))
@@ -0,0 +1,268 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.core.signals import got_request_exception
+from django.db import OperationalError, connection
+from django.db.models import Count, F, Q
+from apps.courses.models import CourseSection
+from apps.students.models import Student
+from apps.grades.models import Enrollment
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+import random
+import statistics
+import sys
+import threading
+import time
+
+
+STUDENT_ID_PREFIX = 'LT'
+STEPS = ['login', 'add_to_cart', 'enroll']
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that keeps the access log out of the report"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Simulate registration-day load against CourseRegistrationView and check for oversold seats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Number of simulated students')
+        parser.add_argument('--concurrency', type=int, default=50, help='Number of concurrent client threads')
+        parser.add_argument('--hot-sections', type=int, default=5, help='Size of the pool of contended sections')
+        parser.add_argument('--cart-size', type=int, default=3, help='Sections each student adds to their cart')
+        parser.add_argument('--semester', default='Spring 2026')
+        parser.add_argument('--port', type=int, default=0, help='Port for the local server (default: any free port)')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--keep', action='store_true', help='Keep the simulated students and their enrollments')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        cart_size = min(options['cart_size'], options['hot_sections'])
+
+        hot_sections = list(
+            CourseSection.objects.filter(
+                semester=options['semester'],
+                is_active=True,
+                registration_open=True,
+                enrolled_count__lt=F('max_capacity'),
+                # Simulated students have no transcript, so only courses without prerequisites
+                course__prerequisite_edges__isnull=True,
+            ).order_by('?').values_list('section_id', flat=True)[:options['hot_sections']]
+        )
+        if len(hot_sections) < cart_size:
+            raise CommandError('Not enough open sections to build carts. Run populate_data first.')
+
+        students = self.create_students(options['students'])
+        baseline = self.seat_snapshot(hot_sections)
+
+        self.lock_errors = 0
+        self.server_errors = 0
+        self.counter_lock = threading.Lock()
+        got_request_exception.connect(self.record_exception)
+
+        # Hand the SQLite file over to the server threads
+        connection.close()
+        server = ThreadedWSGIServer(('127.0.0.1', options['port']), QuietRequestHandler)
+        server.set_app(get_internal_wsgi_application())
+        server.daemon_threads = True
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+        self.stdout.write(
+            f'Simulating {len(students)} students ({options["concurrency"]} concurrent) '
+            f'against {len(hot_sections)} sections at {base_url}'
+        )
+
+        carts = [rng.sample(hot_sections, cart_size) for _ in students]
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                runs = list(pool.map(
+                    lambda args: self.simulate_student(base_url, *args),
+                    zip(students, carts),
+                ))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.shutdown()
+            server.server_close()
+            got_request_exception.disconnect(self.record_exception)
+
+        self.report(runs, elapsed)
+        self.check_seats(hot_sections, baseline)
+
+        if not options['keep']:
+            self.cleanup()
+
+    def create_students(self, count):
+        self.cleanup()
+        students = [
+            Student(
+                student_id=f'{STUDENT_ID_PREFIX}{n:06d}',
+                first_name='Load',
+                last_name=f'Tester{n:06d}',
+                email=f'load.tester{n:06d}@student.silverpine.edu',
+                major='Undeclared',
+                academic_year='Freshman',
+                enrollment_date=date(2025, 8, 15),
+                expected_graduation=date(2029, 5, 15),
+            )
+            for n in range(count)
+        ]
+        for student in students:
+            student.update_name_keys()
+        Student.objects.bulk_create(students, batch_size=500)
+        return students
+
+    def cleanup(self):
+        """Remove simulated students and hand their seats back"""
+        claims = (
+            Enrollment.objects.filter(
+                student__student_id__startswith=STUDENT_ID_PREFIX,
+                status__in=['Enrolled', 'Waitlisted'],
+            )
+            .values('course_section_id')
+            .annotate(
+                seats=Count('id', filter=Q(status='Enrolled')),
+                waiting=Count('id', filter=Q(status='Waitlisted')),
+            )
+        )
+        for row in claims:
+            CourseSection.objects.filter(section_id=row['course_section_id']).update(
+                enrolled_count=F('enrolled_count') - row['seats'],
+                waitlist_count=F('waitlist_count') - row['waiting'],
+            )
+        Student.objects.filter(student_id__startswith=STUDENT_ID_PREFIX).delete()
+
+    def seat_snapshot(self, section_ids):
+        """Map each section to (enrolled_count, max_capacity, enrollment rows)"""
+        sections = CourseSection.objects.filter(section_id__in=section_ids).annotate(
+            enrollment_rows=Count('enrollments', filter=Q(enrollments__status='Enrolled'))
+        )
+        return {
+            section.section_id: (section.enrolled_count, section.max_capacity, section.enrollment_rows)
+            for section in sections
+        }
+
+    def record_exception(self, sender, request=None, **kwargs):
+        exc = sys.exc_info()[1]
+        with self.counter_lock:
+            if isinstance(exc, OperationalError) and 'locked' in str(exc):
+                self.lock_errors += 1
+            else:
+                self.server_errors += 1
+
+    def simulate_student(self, base_url, student, cart):
+        """Drive one student through login -> add_to_cart -> enroll"""
+        cookies = CookieJar()
+        opener = build_opener(HTTPCookieProcessor(cookies))
+        timings = {step: [] for step in STEPS}
+        failures = {}
+
+        def request(step, path, data=None):
+            headers = {}
+            csrf_token = next((c.value for c in cookies if c.name == 'csrftoken'), None)
+            if csrf_token:
+                headers['X-CSRFToken'] = csrf_token
+            body = urlencode(data).encode() if data is not None else None
+            started = time.perf_counter()
+            while True:
+                try:
+                    with opener.open(Request(base_url + path, data=body, headers=headers), timeout=60) as response:
+                        response.read()
+                    ok = True
+                except HTTPError as exc:
+                    if exc.code == 429:
+                        # Held in the admission waiting room; come back when our ticket is due
+                        failures['queued'] = failures.get('queued', 0) + 1
+                        time.sleep(int(exc.headers.get('Retry-After', 1)))
+                        continue
+                    failures[exc.code] = failures.get(exc.code, 0) + 1
+                    ok = False
+                except (URLError, OSError):
+                    failures['connection'] = failures.get('connection', 0) + 1
+                    ok = False
+                break
+            if step:
+                timings[step].append(time.perf_counter() - started)
+            return ok
+
+        if not request(None, '/students/login/'):
+            return timings, failures
+        if not request('login', '/students/login/', {
+            'first_name': student.first_name,
+            'last_name': student.last_name,
+        }):
+            return timings, failures
+        for section_id in cart:
+            request('add_to_cart', '/courses/registration/', {
+                'action': 'add_to_cart',
+                'section_id': section_id,
+            })
+        request('enroll', '/courses/registration/', {'action': 'enroll'})
+        return timings, failures
+
+    def report(self, runs, elapsed):
+        all_timings = []
+        failures = {}
+        self.stdout.write('')
+        self.stdout.write(f'{"step":<14}{"requests":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for step in STEPS:
+            samples = [sample for timings, _ in runs for sample in timings[step]]
+            all_timings.extend(samples)
+            self.stdout.write(f'{step:<14}{len(samples):>10}' + self.format_percentiles(samples))
+        self.stdout.write(f'{"all":<14}{len(all_timings):>10}' + self.format_percentiles(all_timings))
+
+        for _, run_failures in runs:
+            for key, count in run_failures.items():
+                failures[key] = failures.get(key, 0) + count
+
+        self.stdout.write('')
+        self.stdout.write(f'Elapsed: {elapsed:.2f}s')
+        self.stdout.write(f'Throughput: {len(all_timings) / elapsed:.1f} requests/s')
+        self.stdout.write(f'SQLite lock errors: {self.lock_errors}')
+        self.stdout.write(f'Other server errors: {self.server_errors}')
+        if failures:
+            summary = ', '.join(f'{key}: {count}' for key, count in sorted(failures.items(), key=str))
+            self.stdout.write(f'Failed requests: {summary}')
+
+    def format_percentiles(self, samples):
+        if len(samples) < 2:
+            return f'{"-":>10}{"-":>10}{"-":>10}'
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        return ''.join(f'{cuts[p - 1] * 1000:>10.1f}' for p in (50, 95, 99))
+
+    def check_seats(self, section_ids, baseline):
+        """Compare seat counters against the Enrollment rows actually written"""
+        after = self.seat_snapshot(section_ids)
+        problems = 0
+        self.stdout.write('')
+        for section_id in section_ids:
+            count_before, _, rows_before = baseline[section_id]
+            count_after, capacity, rows_after = after[section_id]
+            seats_taken = count_after - count_before
+            rows_written = rows_after - rows_before
+            status = 'ok'
+            if count_after > capacity:
+                status = 'OVERSOLD'
+            elif seats_taken != rows_written:
+                status = 'DRIFT'
+            if status != 'ok':
+                problems += 1
+            self.stdout.write(
+                f'{section_id:<14} enrolled {count_after}/{capacity}  '
+                f'+{seats_taken} seats, +{rows_written} enrollments  {status}'
+            )
+
+        if problems:
+            self.stdout.write(self.style.ERROR(f'{problems} section(s) oversold or out of sync'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No oversold sections'))
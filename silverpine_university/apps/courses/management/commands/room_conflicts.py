@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from apps.courses.rooms import build_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Report every pair of active sections booked into the same room at the same time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', help='Only check this semester')
+
+    def handle(self, *args, **options):
+        clashes = {}
+        for semester, building, room, day, section_id, other in build_occupancy().double_bookings(options['semester']):
+            clashes.setdefault((semester, building, room, section_id, other), []).append(day)
+
+        for (semester, building, room, section_id, other), days in clashes.items():
+            self.stdout.write(f'{semester}  {building} {room}: {section_id} and {other} on {"".join(days)}')
+
+        if clashes:
+            self.stdout.write(self.style.WARNING(f'Found {len(clashes)} double booking(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No double-booked rooms'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursesection',
+            name='waitlist_sequence',
+            field=models.IntegerField(default=0, editable=False, help_text='Last waitlist position handed out'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+# A copy of the FTS5 setup in apps.courses.search as it stood when this
+# migration was written, so later changes to that module cannot break it
+FTS_TABLE = 'courses_course_fts'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    course = apps.get_model('courses', 'Course')._meta.db_table
+    section = apps.get_model('courses', 'CourseSection')._meta.db_table
+    department = apps.get_model('courses', 'Department')._meta.db_table
+    professor = apps.get_model('courses', 'Professor')._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                course_code, title, description, department, professors,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f"""
+            INSERT INTO {FTS_TABLE} (course_code, title, description, department, professors)
+            SELECT c.course_code, c.title, c.description, d.name, COALESCE((
+                SELECT group_concat(DISTINCT p.first_name || ' ' || p.last_name)
+                FROM {section} s
+                JOIN {professor} p ON p.professor_id = s.professor_id
+                WHERE s.course_id = c.course_code
+            ), '')
+            FROM {course} c
+            JOIN {department} d ON d.code = c.department_id
+        """)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_coursesection_waitlist_sequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
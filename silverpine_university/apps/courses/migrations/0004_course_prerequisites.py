@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.PositiveSmallIntegerField(default=1, help_text='Edges in the same group are alternatives (OR)')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_edges', to='courses.course')),
+                ('required_course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='required_by_edges', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Prerequisite',
+                'verbose_name_plural': 'Course Prerequisites',
+                'ordering': ['course', 'group', 'required_course'],
+                'unique_together': {('course', 'required_course', 'group')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CoursePrerequisiteClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Prerequisite Closure',
+                'verbose_name_plural': 'Course Prerequisite Closure',
+                'indexes': [models.Index(fields=['ancestor', 'course'], name='prereq_closure_ancestor_idx')],
+                'unique_together': {('course', 'ancestor')},
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+import re
+
+from django.db import migrations
+
+
+# Copies of the parser and closure in apps.courses.prerequisites as they stood
+# when this migration was written, so later changes to that module cannot break it
+COURSE_CODE_PATTERN = re.compile(r'\b([A-Z]{2,4})\s*-?\s*(\d{3,4})\b')
+AND_SEPARATORS = re.compile(r',|;|\band\b', re.IGNORECASE)
+OR_SEPARATORS = re.compile(r'/|\bor\b', re.IGNORECASE)
+
+
+def parse_prerequisites(text):
+    groups = []
+    for clause in AND_SEPARATORS.split(text or ''):
+        group = []
+        for option in OR_SEPARATORS.split(clause):
+            for department, number in COURSE_CODE_PATTERN.findall(option.upper()):
+                code = f'{department} {number}'
+                if code not in group:
+                    group.append(code)
+        if group:
+            groups.append(group)
+    return groups
+
+
+def transitive_closure(requirements):
+    closure = {}
+
+    def visit(course, path):
+        if course in closure:
+            return closure[course]
+        reachable = set()
+        for required in requirements.get(course, ()):
+            if required in path:
+                continue
+            reachable.add(required)
+            reachable |= visit(required, path | {required})
+        closure[course] = reachable
+        return reachable
+
+    for course in requirements:
+        visit(course, {course})
+    return closure
+
+
+def convert_prerequisites(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CoursePrerequisite = apps.get_model('courses', 'CoursePrerequisite')
+    CoursePrerequisiteClosure = apps.get_model('courses', 'CoursePrerequisiteClosure')
+
+    courses = dict(Course.objects.exclude(prerequisites='').values_list('course_code', 'prerequisites'))
+    known = set(Course.objects.values_list('course_code', flat=True))
+
+    edges = []
+    requirements = {}
+    for course, text in courses.items():
+        for group, options in enumerate(parse_prerequisites(text), start=1):
+            for required in options:
+                # Unknown codes and self-references cannot become edges
+                if required not in known or required == course:
+                    continue
+                edges.append(CoursePrerequisite(course_id=course, required_course_id=required, group=group))
+                requirements.setdefault(course, set()).add(required)
+    CoursePrerequisite.objects.bulk_create(edges, batch_size=500, ignore_conflicts=True)
+
+    closure = transitive_closure(requirements)
+    CoursePrerequisiteClosure.objects.bulk_create(
+        [
+            CoursePrerequisiteClosure(course_id=course, ancestor_id=ancestor)
+            for course, ancestors in closure.items()
+            for ancestor in ancestors
+            if ancestor != course
+        ],
+        batch_size=500,
+    )
+
+
+def clear_prerequisites(apps, schema_editor):
+    apps.get_model('courses', 'CoursePrerequisiteClosure').objects.all().delete()
+    apps.get_model('courses', 'CoursePrerequisite').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_prerequisites'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_prerequisites, clear_prerequisites),
+    ]
@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from . import scheduling
 
 
 class Department(models.Model):
@@ -75,6 +77,51 @@ class Course(models.Model):
         return f"{self.course_code} - {self.title}"
 
 
+class CoursePrerequisite(models.Model):
+    """
+    One edge of the prerequisite graph: ``course`` requires ``required_course``.
+    
+    Edges of a course that share a group are alternatives (any one satisfies
+    the group); every group of a course must be satisfied.
+    """
+    
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_edges')
+    required_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='required_by_edges')
+    group = models.PositiveSmallIntegerField(default=1, help_text="Edges in the same group are alternatives (OR)")
+    
+    class Meta:
+        unique_together = ['course', 'required_course', 'group']
+        ordering = ['course', 'group', 'required_course']
+        verbose_name = 'Course Prerequisite'
+        verbose_name_plural = 'Course Prerequisites'
+    
+    def __str__(self):
+        return f"{self.course_id} requires {self.required_course_id} (group {self.group})"
+    
+    def clean(self):
+        from .prerequisites import would_create_cycle
+        if self.course_id and self.required_course_id and would_create_cycle(self.course_id, self.required_course_id):
+            raise ValidationError({'required_course': 'This prerequisite would create a cycle.'})
+
+
+class CoursePrerequisiteClosure(models.Model):
+    """Transitive closure of the prerequisite graph: ``ancestor`` is required, directly or not, by ``course``"""
+    
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    ancestor = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    
+    class Meta:
+        unique_together = ['course', 'ancestor']
+        indexes = [
+            models.Index(fields=['ancestor', 'course'], name='prereq_closure_ancestor_idx'),
+        ]
+        verbose_name = 'Course Prerequisite Closure'
+        verbose_name_plural = 'Course Prerequisite Closure'
+    
+    def __str__(self):
+        return f"{self.course_id} transitively requires {self.ancestor_id}"
+
+
 class CourseSection(models.Model):
     """Specific sections of courses with schedule and enrollment info"""
     
@@ -101,6 +148,7 @@ class CourseSection(models.Model):
     max_capacity = models.IntegerField(default=30)
     enrolled_count = models.IntegerField(default=0)
     waitlist_count = models.IntegerField(default=0)
+    waitlist_sequence = models.IntegerField(default=0, editable=False, help_text="Last waitlist position handed out")
     
     # Status
     is_active = models.BooleanField(default=True)
@@ -120,5 +168,10 @@ class CourseSection(models.Model):
     def is_full(self):
         return self.enrolled_count >= self.max_capacity
     
+    @property
+    def meeting_mask(self):
+        """Weekly meeting bitmask used for conflict detection"""
+        return scheduling.meeting_mask(self.days, self.start_time, self.end_time)
+    
     def get_schedule_display(self):
         return f"{self.days} {self.start_time.strftime('%I:%M %p')} - {self.end_time.strftime('%I:%M %p')}"
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Course prerequisite graph: parsing, transitive closure and eligibility.
+
+Prerequisites are stored as CoursePrerequisite edges grouped into AND-of-OR
+requirements. CoursePrerequisiteClosure holds every (course, ancestor)
+pair of the graph and is maintained incrementally as edges change. It is
+used to reject cycles and to list everything a course builds on.
+Eligibility checks go through an in-memory PrerequisiteIndex, so checking
+a whole cart costs one query for the student's completed courses.
+"""
+import re
+import threading
+
+from django.db import transaction
+
+from .models import Course, CoursePrerequisite, CoursePrerequisiteClosure
+from .versioning import bump_version, get_version
+
+
+COURSE_CODE_PATTERN = re.compile(r'\b([A-Z]{2,4})\s*-?\s*(\d{3,4})\b')
+AND_SEPARATORS = re.compile(r',|;|\band\b', re.IGNORECASE)
+OR_SEPARATORS = re.compile(r'/|\bor\b', re.IGNORECASE)
+
+# Grades that do not satisfy a prerequisite
+NON_PASSING_GRADES = ('F', 'W', 'I')
+
+INDEX_VERSION_KEY = 'prerequisites:version'
+
+
+def parse_prerequisites(text):
+    """
+    Parse free text such as ``"CSCI 1020, MATH 1010 or MATH 1020"`` into a
+    list of OR-groups of course codes, e.g. ``[['CSCI 1020'], ['MATH 1010', 'MATH 1020']]``.
+    """
+    groups = []
+    for clause in AND_SEPARATORS.split(text or ''):
+        group = []
+        for option in OR_SEPARATORS.split(clause):
+            for department, number in COURSE_CODE_PATTERN.findall(option.upper()):
+                code = f'{department} {number}'
+                if code not in group:
+                    group.append(code)
+        if group:
+            groups.append(group)
+    return groups
+
+
+def transitive_closure(requirements, courses=None):
+    """
+    Compute ``{course: set of every course it transitively requires}`` from
+    an adjacency map ``{course: iterable of directly required courses}``.
+    """
+    closure = {}
+
+    def visit(course, path):
+        if course in closure:
+            return closure[course]
+        reachable = set()
+        for required in requirements.get(course, ()):
+            if required in path:
+                continue
+            reachable.add(required)
+            reachable |= visit(required, path | {required})
+        closure[course] = reachable
+        return reachable
+
+    for course in (requirements if courses is None else courses):
+        visit(course, {course})
+    return closure
+
+
+def would_create_cycle(course_code, required_code):
+    """True if making ``course_code`` require ``required_code`` closes a loop"""
+    return course_code == required_code or CoursePrerequisiteClosure.objects.filter(
+        course_id=required_code, ancestor_id=course_code,
+    ).exists()
+
+
+def add_to_closure(course_code, required_code):
+    """Extend the closure for a new edge: everything depending on the course now also needs the requirement"""
+    ancestors = set(
+        CoursePrerequisiteClosure.objects.filter(course_id=required_code).values_list('ancestor_id', flat=True)
+    )
+    ancestors.add(required_code)
+    descendants = set(
+        CoursePrerequisiteClosure.objects.filter(ancestor_id=course_code).values_list('course_id', flat=True)
+    )
+    descendants.add(course_code)
+    CoursePrerequisiteClosure.objects.bulk_create(
+        [
+            CoursePrerequisiteClosure(course_id=descendant, ancestor_id=ancestor)
+            for descendant in descendants
+            for ancestor in ancestors
+            if descendant != ancestor
+        ],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+
+
+def rebuild_closure(course_codes=None):
+    """
+    Recompute the closure rows of the given courses and of every course
+    that depends on them, or of the whole graph when no courses are given.
+    """
+    requirements = {}
+    for course, required in CoursePrerequisite.objects.values_list('course_id', 'required_course_id'):
+        requirements.setdefault(course, set()).add(required)
+
+    with transaction.atomic():
+        rows = CoursePrerequisiteClosure.objects.all()
+        if course_codes is None:
+            affected = set(requirements)
+        else:
+            affected = set(course_codes) | set(
+                CoursePrerequisiteClosure.objects.filter(ancestor_id__in=list(course_codes))
+                .values_list('course_id', flat=True)
+            )
+            rows = rows.filter(course_id__in=affected)
+        rows.delete()
+
+        closure = transitive_closure(requirements, affected)
+        CoursePrerequisiteClosure.objects.bulk_create(
+            [
+                CoursePrerequisiteClosure(course_id=course, ancestor_id=ancestor)
+                for course in affected
+                for ancestor in closure.get(course, ())
+            ],
+            batch_size=500,
+        )
+
+
+class PrerequisiteIndex:
+    """In-memory AND-of-OR requirements for every course"""
+
+    def __init__(self, edges):
+        groups = {}
+        for course, group, required in edges:
+            groups.setdefault(course, {}).setdefault(group, set()).add(required)
+        self.requirements = {
+            course: tuple(frozenset(options) for _, options in sorted(course_groups.items()))
+            for course, course_groups in groups.items()
+        }
+
+    def missing(self, course_code, completed):
+        """The requirement groups of a course that ``completed`` does not satisfy"""
+        return [
+            group for group in self.requirements.get(course_code, ())
+            if group.isdisjoint(completed)
+        ]
+
+    def is_eligible(self, course_code, completed):
+        return not self.missing(course_code, completed)
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def index_version():
+    return get_version(INDEX_VERSION_KEY)
+
+
+def invalidate_index():
+    """Make every process rebuild its PrerequisiteIndex on next use"""
+    bump_version(INDEX_VERSION_KEY)
+
+
+def get_index():
+    """The process-wide PrerequisiteIndex, rebuilt with one query when edges change"""
+    global _index, _index_version
+    version = index_version()
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = PrerequisiteIndex(
+                    CoursePrerequisite.objects.values_list('course_id', 'group', 'required_course_id')
+                )
+                _index_version = version
+    return _index
+
+
+def completed_courses(student):
+    """Codes of every course the student has passed"""
+    from apps.grades.models import Enrollment
+    return set(
+        Enrollment.objects.filter(student=student, status='Completed')
+        .exclude(grade__isnull=True)
+        .exclude(grade__in=NON_PASSING_GRADES)
+        .values_list('course_section__course_id', flat=True)
+    )
+
+
+def load_from_text(courses):
+    """Create prerequisite edges for courses from their free-text ``prerequisites`` field"""
+    known = set(Course.objects.values_list('course_code', flat=True))
+    edges = []
+    for course in courses:
+        for group, options in enumerate(parse_prerequisites(course.prerequisites), start=1):
+            edges.extend(
+                CoursePrerequisite(course_id=course.course_code, required_course_id=required, group=group)
+                for required in options
+                if required in known and required != course.course_code
+            )
+    CoursePrerequisite.objects.bulk_create(edges, batch_size=500, ignore_conflicts=True)
+    rebuild_closure()
+    invalidate_index()
+    return len(edges)
@@ -0,0 +1,176 @@
+"""
+Room occupancy: double-booking checks and free-room search.
+
+RoomOccupancy holds every active section's meetings in sorted per-day
+interval lists for each (semester, building, room). Alongside the start
+times it keeps a running maximum of end times, so "does anything in this
+room overlap 14:00-15:15 on Tuesday" is one binary search. The index is
+built from a single query and cached per process. Every CourseSection
+save bumps a shared version so that processes rebuild it on next use.
+"""
+import heapq
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from .models import CourseSection
+from .scheduling import DAY_CODES
+from .versioning import bump_version, get_version
+
+
+ROOM_VERSION_KEY = 'rooms:version'
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def meeting_days(days):
+    return [code for code in dict.fromkeys(days.upper()) if code in DAY_CODES]
+
+
+@dataclass
+class DaySchedule:
+    """One room's meetings on one weekday, sorted by start time"""
+
+    meetings: list = field(default_factory=list)   # (start, end, section_id)
+    starts: list = field(default_factory=list)
+    max_ends: list = field(default_factory=list)   # latest end among meetings[0..i]
+    ready: bool = True
+
+    def add(self, start, end, section_id):
+        self.meetings.append((start, end, section_id))
+        self.ready = False
+
+    def prepare(self):
+        if self.ready:
+            return
+        self.meetings.sort()
+        self.starts = [meeting[0] for meeting in self.meetings]
+        self.max_ends = []
+        latest = 0
+        for _, end, _ in self.meetings:
+            latest = max(latest, end)
+            self.max_ends.append(latest)
+        self.ready = True
+
+    def overlapping(self, start, end, exclude=None):
+        """Section ids meeting during [start, end), found with one bisect"""
+        self.prepare()
+        # Only meetings that start before ``end`` can overlap
+        index = bisect_left(self.starts, end) - 1
+        found = []
+        while index >= 0 and self.max_ends[index] > start:
+            meeting_start, meeting_end, section_id = self.meetings[index]
+            if meeting_end > start and section_id != exclude:
+                found.append(section_id)
+            index -= 1
+        return found
+
+    def is_free(self, start, end, exclude=None):
+        return not self.overlapping(start, end, exclude)
+
+
+class RoomOccupancy:
+    """Per-room, per-day interval index of section meetings"""
+
+    def __init__(self, rows=()):
+        self.rooms = {}  # (semester, building, room) -> {day code: DaySchedule}
+        self.buildings = {}  # building -> set of room numbers seen in any semester
+        for row in rows:
+            self.add(*row)
+        # Sort up front so that lookups never mutate a shared index
+        for schedule in self.rooms.values():
+            for day_schedule in schedule.values():
+                day_schedule.prepare()
+
+    def add(self, section_id, semester, building, room, days, start_time, end_time):
+        if not building or not room:
+            return
+        self.buildings.setdefault(building, set()).add(room)
+        start, end = minutes(start_time), minutes(end_time)
+        if end <= start:
+            return
+        schedule = self.rooms.setdefault((semester, building, room), {})
+        for day in meeting_days(days):
+            schedule.setdefault(day, DaySchedule()).add(start, end, section_id)
+
+    def conflicts(self, semester, building, room, days, start_time, end_time, exclude=None):
+        """Ids of sections already in the room at any of the given meeting times"""
+        schedule = self.rooms.get((semester, building, room))
+        if not schedule:
+            return []
+        start, end = minutes(start_time), minutes(end_time)
+        found = []
+        for day in meeting_days(days):
+            if day in schedule:
+                found.extend(schedule[day].overlapping(start, end, exclude))
+        return list(dict.fromkeys(found))
+
+    def free_rooms(self, semester, building, days, start_time, end_time):
+        """Room numbers of a building with nothing scheduled at the given times"""
+        start, end = minutes(start_time), minutes(end_time)
+        free = []
+        for room in sorted(self.buildings.get(building, ())):
+            schedule = self.rooms.get((semester, building, room), {})
+            if all(day not in schedule or schedule[day].is_free(start, end) for day in meeting_days(days)):
+                free.append(room)
+        return free
+
+    def double_bookings(self, semester=None):
+        """
+        Every pair of sections sharing a room at the same time, as
+        ``(semester, building, room, day, section_id, other_section_id)``.
+
+        Each day is swept once in start order with a heap of meetings still
+        in progress, so the cost is O(n log n) plus the number of clashes.
+        """
+        for (room_semester, building, room), schedule in sorted(self.rooms.items()):
+            if semester and room_semester != semester:
+                continue
+            for day in DAY_CODES:
+                if day not in schedule:
+                    continue
+                active = []
+                schedule[day].prepare()
+                for start, end, section_id in schedule[day].meetings:
+                    while active and active[0][0] <= start:
+                        heapq.heappop(active)
+                    for _, other in active:
+                        yield room_semester, building, room, day, other, section_id
+                    heapq.heappush(active, (end, section_id))
+
+
+def build_occupancy():
+    """Load every active section's meetings with one query"""
+    return RoomOccupancy(
+        CourseSection.objects.filter(is_active=True).values_list(
+            'section_id', 'semester', 'building', 'room_number', 'days', 'start_time', 'end_time',
+        ).order_by()
+    )
+
+
+_occupancy = None
+_occupancy_version = None
+_occupancy_lock = threading.Lock()
+
+
+def room_version():
+    return get_version(ROOM_VERSION_KEY)
+
+
+def bump_room_version():
+    """Make every process rebuild its occupancy index on next use"""
+    bump_version(ROOM_VERSION_KEY)
+
+
+def get_occupancy():
+    """The process-wide RoomOccupancy, rebuilt when any section has changed"""
+    global _occupancy, _occupancy_version
+    version = room_version()
+    if _occupancy is None or _occupancy_version != version:
+        with _occupancy_lock:
+            if _occupancy is None or _occupancy_version != version:
+                _occupancy = build_occupancy()
+                _occupancy_version = version
+    return _occupancy
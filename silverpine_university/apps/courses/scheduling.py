@@ -0,0 +1,111 @@
+"""
+Weekly meeting bitmasks for schedule conflict detection.
+
+Each section's meetings are encoded as one integer with a bit for every
+five-minute slot of the week, so two sections conflict exactly when the
+bitwise AND of their masks is non-zero.
+"""
+import re
+from datetime import time
+from functools import lru_cache
+
+
+# Day letters as used in CourseSection.days (R is Thursday)
+DAY_CODES = 'MTWRFSU'
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+@lru_cache(maxsize=4096)
+def meeting_mask(days, start_time, end_time):
+    """Encode a weekly meeting pattern such as ('MWF', 9:30, 10:45) as a bitmask"""
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    if not days or end <= start:
+        return 0
+
+    first_slot = start // SLOT_MINUTES
+    last_slot = -(-end // SLOT_MINUTES)
+    day_bits = ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+    mask = 0
+    for code in days.upper():
+        day = DAY_CODES.find(code)
+        if day >= 0:
+            mask |= day_bits << (day * SLOTS_PER_DAY)
+    return mask
+
+
+def combine_masks(masks):
+    """OR several meeting masks into one weekly schedule"""
+    combined = 0
+    for mask in masks:
+        combined |= mask
+    return combined
+
+
+def schedule_mask(sections):
+    """Combine the meeting masks of several sections"""
+    return combine_masks(section.meeting_mask for section in sections)
+
+
+def find_conflicts(sections, busy=0):
+    """
+    Return the ids of sections that clash with ``busy`` or with an
+    earlier section in ``sections``.
+    """
+    conflicts = set()
+    for section in sections:
+        mask = section.meeting_mask
+        if mask & busy:
+            conflicts.add(section.section_id)
+        else:
+            busy |= mask
+    return conflicts
+
+
+# Day names as written in Professor.office_hours, by their first three letters
+OFFICE_HOURS_DAYS = {'mon': 'M', 'tue': 'T', 'wed': 'W', 'thu': 'R', 'fri': 'F', 'sat': 'S', 'sun': 'U'}
+OFFICE_HOURS_PATTERN = re.compile(
+    r'(?P<days>[A-Za-z/,& ]+?)\s*'
+    r'(?P<start>\d{1,2})(?::(?P<start_minute>\d{2}))?\s*(?P<start_suffix>am|pm)?\s*-\s*'
+    r'(?P<end>\d{1,2})(?::(?P<end_minute>\d{2}))?\s*(?P<end_suffix>am|pm)?',
+    re.IGNORECASE,
+)
+
+
+def _to_24_hour(hour, suffix):
+    if suffix == 'pm' and hour != 12:
+        return hour + 12
+    if suffix == 'am' and hour == 12:
+        return 0
+    return hour
+
+
+def office_hours_mask(text):
+    """
+    Weekly mask of free-text office hours such as "Mon/Wed 2-4pm" or
+    "Tue/Thu 10-12pm". Text that cannot be read yields an empty mask.
+    """
+    mask = 0
+    for match in OFFICE_HOURS_PATTERN.finditer(text or ''):
+        days = ''.join(
+            OFFICE_HOURS_DAYS.get(token.lower()[:3], '')
+            for token in re.split(r'[/,& ]+', match['days'].strip())
+        )
+        end_suffix = (match['end_suffix'] or '').lower()
+        start_suffix = (match['start_suffix'] or '').lower()
+        end_hour = _to_24_hour(int(match['end']), end_suffix)
+        start_hour = int(match['start'])
+        if start_suffix:
+            start_hour = _to_24_hour(start_hour, start_suffix)
+        elif end_suffix == 'pm' and start_hour != 12 and start_hour + 12 <= end_hour:
+            # "2-4pm": the suffix covers both ends
+            start_hour += 12
+        try:
+            start_time = time(start_hour, int(match['start_minute'] or 0))
+            end_time = time(end_hour, int(match['end_minute'] or 0))
+        except ValueError:
+            continue
+        mask |= meeting_mask(days, start_time, end_time)
+    return mask
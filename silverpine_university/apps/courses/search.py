@@ -0,0 +1,154 @@
+"""
+SQLite FTS5 full-text index for the course catalog.
+
+The index mirrors every Course together with its department name and the
+names of the professors teaching its sections. It is kept in sync by the
+signal handlers in apps.courses.signals and can be rebuilt in bulk with
+the rebuild_course_search management command. On databases other than
+SQLite the catalog falls back to plain ``icontains`` filtering.
+"""
+import re
+
+from django.db import DatabaseError, connection
+
+from .models import Course, CourseSection, Department, Professor
+
+
+FTS_TABLE = 'courses_course_fts'
+
+# Ranked matches returned for one search
+SEARCH_RESULT_LIMIT = 500
+
+# bm25() column weights: course_code, title, description, department, professors
+RANK_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 2.0)
+
+CREATE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        course_code, title, description, department, professors,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+DROP_SQL = f'DROP TABLE IF EXISTS {FTS_TABLE}'
+
+DOCUMENT_SQL = f"""
+    INSERT INTO {FTS_TABLE} (course_code, title, description, department, professors)
+    SELECT c.course_code, c.title, c.description, d.name, COALESCE((
+        SELECT group_concat(DISTINCT p.first_name || ' ' || p.last_name)
+        FROM {CourseSection._meta.db_table} s
+        JOIN {Professor._meta.db_table} p ON p.professor_id = s.professor_id
+        WHERE s.course_id = c.course_code
+    ), '')
+    FROM {Course._meta.db_table} c
+    JOIN {Department._meta.db_table} d ON d.code = c.department_id
+"""
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def create_index(using=connection):
+    """Create the FTS5 table and fill it from the current catalog"""
+    with using.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+    return rebuild_index(using)
+
+
+def drop_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(DROP_SQL)
+
+
+def rebuild_index(using=connection):
+    """Reindex the whole catalog with one INSERT ... SELECT"""
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(DOCUMENT_SQL)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def index_courses(course_codes):
+    """Refresh the index entries of the given courses"""
+    course_codes = list(course_codes)
+    if not course_codes or not is_supported():
+        return
+    placeholders = ', '.join(['%s'] * len(course_codes))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE course_code IN ({placeholders})', course_codes)
+        cursor.execute(f'{DOCUMENT_SQL} WHERE c.course_code IN ({placeholders})', course_codes)
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 query where every word is a prefix term"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def match_filters(department='', level=''):
+    """SQL conditions and parameters narrowing matches to a department and level"""
+    conditions = []
+    params = []
+    if department:
+        conditions.append('c.department_id = %s')
+        params.append(department)
+    if level:
+        conditions.append('c.level = %s')
+        params.append(level)
+    return ''.join(f' AND {condition}' for condition in conditions), params
+
+
+def search_courses(query, department='', level='', limit=SEARCH_RESULT_LIMIT):
+    """
+    Return the codes of courses matching ``query``, best match first.
+
+    Department and level are applied inside the MATCH query, so the
+    ``limit`` best matches are taken from the filtered results. Returns
+    None when full-text search is unavailable so the caller can fall back
+    to a plain filter.
+    """
+    if not is_supported():
+        return None
+    expression = build_match_expression(query)
+    if not expression:
+        return []
+
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    conditions, params = match_filters(department, level)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT f.course_code FROM {FTS_TABLE} f '
+                f'JOIN {Course._meta.db_table} c ON c.course_code = f.course_code '
+                f'WHERE {FTS_TABLE} MATCH %s{conditions} '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [expression, *params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+
+
+def match_counts(query):
+    """
+    ``{(department, level): matches}`` over every course matching ``query``,
+    however many there are, or None when full-text search is unavailable
+    """
+    if not is_supported():
+        return None
+    expression = build_match_expression(query)
+    if not expression:
+        return {}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT c.department_id, c.level, count(*) FROM {FTS_TABLE} f '
+                f'JOIN {Course._meta.db_table} c ON c.course_code = f.course_code '
+                f'WHERE {FTS_TABLE} MATCH %s GROUP BY c.department_id, c.level',
+                [expression],
+            )
+            return {(department, level): total for department, level, total in cursor.fetchall()}
+    except DatabaseError:
+        return None
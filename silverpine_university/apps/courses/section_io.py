@@ -0,0 +1,297 @@
+"""
+Streaming import and export of course sections as CSV or JSON Lines.
+
+Files are read and written one row at a time. Imports validate each row
+against Course and Professor lookups that are loaded once, then upsert
+rows in chunks with bulk_create so that a full term loads in a handful
+of statements. The seat counters (enrolled_count, waitlist_count) belong
+to registration and are exported for reference but never imported.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import time
+
+from django.db import transaction
+
+from . import catalog, search
+from .availability import bump_seat_version
+from .models import Course, CourseSection, Professor
+from .rooms import bump_room_version
+from .scheduling import DAY_CODES
+from .services import process_waitlists
+
+
+FORMATS = ('csv', 'jsonl')
+
+IMPORT_FIELDS = [
+    'section_id', 'course', 'professor', 'semester', 'days', 'start_time', 'end_time',
+    'building', 'room_number', 'max_capacity', 'is_active', 'registration_open',
+]
+EXPORT_FIELDS = IMPORT_FIELDS + ['enrolled_count', 'waitlist_count']
+
+# Columns written back when an imported section already exists
+UPDATE_FIELDS = [
+    'course', 'professor', 'semester', 'days', 'start_time', 'end_time',
+    'building', 'room_number', 'max_capacity', 'is_active', 'registration_open',
+]
+
+SEMESTERS = {value for value, _ in CourseSection._meta.get_field('semester').choices}
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class RowError(ValueError):
+    """A row that cannot be imported"""
+
+
+def read_rows(stream, format):
+    """Yield ``(line_number, row dict)`` from a CSV or JSON Lines stream"""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, RowError(f'invalid JSON: {exc.msg}')
+                continue
+            if not isinstance(row, dict):
+                yield line_number, RowError(f'expected a JSON object, got {type(row).__name__}')
+                continue
+            yield line_number, row
+
+
+def write_rows(stream, rows, format):
+    """Write section rows (sequences in EXPORT_FIELDS order) to a stream; returns the count"""
+    count = 0
+    if format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n')
+            count += 1
+    return count
+
+
+def export_sections(stream, format, semester=None, chunk_size=2000):
+    """Stream every section, optionally of one semester, to ``stream``"""
+    sections = CourseSection.objects.order_by('section_id')
+    if semester:
+        sections = sections.filter(semester=semester)
+    rows = sections.values_list(
+        *[f'{name}_id' if name in ('course', 'professor') else name for name in EXPORT_FIELDS]
+    ).iterator(chunk_size=chunk_size)
+    rows = (
+        [value.strftime('%H:%M') if isinstance(value, time) else value for value in row]
+        for row in rows
+    )
+    return write_rows(stream, rows, format)
+
+
+def parse_time(value):
+    try:
+        hours, minutes = str(value).strip().split(':')[:2]
+        return time(int(hours), int(minutes))
+    except ValueError:
+        raise RowError(f'invalid time {value!r}')
+
+
+def parse_bool(value, default):
+    if isinstance(value, bool):
+        return value
+    text = str(value if value is not None else '').strip().lower()
+    if not text:
+        return default
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f'invalid boolean {value!r}')
+
+
+@dataclass
+class ImportReport:
+    """Counts and problems collected while importing"""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list = field(default_factory=list)
+    changes: list = field(default_factory=list)
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.unchanged + len(self.errors)
+
+
+class SectionImporter:
+    """
+    Validates rows and upserts them in chunks.
+
+    With ``dry_run`` nothing is written and ``report.changes`` lists what
+    would have happened as ``(section_id, {field: (old, new)})`` pairs,
+    with ``None`` for the old values of new sections.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.report = ImportReport()
+        self.courses = set(Course.objects.values_list('course_code', flat=True))
+        self.professors = set(Professor.objects.values_list('professor_id', flat=True))
+        self.seen = set()
+        self.touched_courses = set()
+        self.grown_sections = []
+
+    def run(self, rows):
+        chunk = []
+        for line_number, row in rows:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                section = self.build(row)
+            except RowError as exc:
+                self.report.errors.append((line_number, str(exc)))
+                continue
+            chunk.append((line_number, section))
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.write_chunk(chunk)
+        if not self.dry_run:
+            self.finish()
+        return self.report
+
+    def build(self, row):
+        """Turn one input row into an unsaved CourseSection, or raise RowError"""
+        section_id = str(row.get('section_id') or '').strip()
+        if not section_id:
+            raise RowError('missing section_id')
+        if len(section_id) > 20:
+            raise RowError(f'section_id {section_id!r} is longer than 20 characters')
+        if section_id in self.seen:
+            raise RowError(f'duplicate section_id {section_id!r}')
+
+        course = str(row.get('course') or '').strip()
+        if course not in self.courses:
+            raise RowError(f'unknown course {course!r}')
+        professor = str(row.get('professor') or '').strip() or None
+        if professor is not None and professor not in self.professors:
+            raise RowError(f'unknown professor {professor!r}')
+        semester = str(row.get('semester') or '').strip()
+        if semester not in SEMESTERS:
+            raise RowError(f'unknown semester {semester!r}')
+
+        days = str(row.get('days') or '').strip().upper()
+        if not days or len(days) > 10 or set(days) - set(DAY_CODES):
+            raise RowError(f'invalid days {days!r}')
+        start_time = parse_time(row.get('start_time'))
+        end_time = parse_time(row.get('end_time'))
+        if end_time <= start_time:
+            raise RowError('end_time must be after start_time')
+
+        try:
+            # Only a blank cell means the default; an explicit 0 is kept
+            max_capacity = 30 if row.get('max_capacity') in (None, '') else int(row['max_capacity'])
+        except (TypeError, ValueError):
+            raise RowError(f'invalid max_capacity {row.get("max_capacity")!r}')
+        if max_capacity < 0:
+            raise RowError('max_capacity cannot be negative')
+
+        self.seen.add(section_id)
+        return CourseSection(
+            section_id=section_id,
+            course_id=course,
+            professor_id=professor,
+            semester=semester,
+            days=days,
+            start_time=start_time,
+            end_time=end_time,
+            building=str(row.get('building') or '').strip(),
+            room_number=str(row.get('room_number') or '').strip(),
+            max_capacity=max_capacity,
+            is_active=parse_bool(row.get('is_active'), True),
+            registration_open=parse_bool(row.get('registration_open'), True),
+        )
+
+    def write_chunk(self, chunk):
+        existing = {
+            values['section_id']: values
+            for values in CourseSection.objects.filter(
+                section_id__in=[section.section_id for _, section in chunk],
+            ).values('section_id', 'enrolled_count', *[
+                f'{name}_id' if name in ('course', 'professor') else name for name in UPDATE_FIELDS
+            ])
+        }
+
+        changed = []
+        for line_number, section in chunk:
+            current = existing.get(section.section_id)
+            if current is None:
+                self.report.created += 1
+                diff = {name: (None, getattr(section, self.attname(name))) for name in UPDATE_FIELDS}
+            else:
+                diff = {
+                    name: (current[self.attname(name)], getattr(section, self.attname(name)))
+                    for name in UPDATE_FIELDS
+                    if current[self.attname(name)] != getattr(section, self.attname(name))
+                }
+                if not diff:
+                    self.report.unchanged += 1
+                    continue
+                if section.max_capacity < current['enrolled_count']:
+                    self.report.errors.append((
+                        line_number,
+                        f'max_capacity {section.max_capacity} is below the '
+                        f'{current["enrolled_count"]} students already enrolled',
+                    ))
+                    continue
+                self.report.updated += 1
+                if section.max_capacity > current['max_capacity']:
+                    self.grown_sections.append(section.section_id)
+            changed.append(section)
+            if self.dry_run:
+                self.report.changes.append((section.section_id, diff))
+
+        if changed and not self.dry_run:
+            with transaction.atomic():
+                CourseSection.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['section_id'],
+                    update_fields=UPDATE_FIELDS,
+                )
+            self.touched_courses.update(section.course_id for section in changed)
+            self.touched_courses.update(
+                existing[section.section_id]['course_id']
+                for section in changed
+                if section.section_id in existing
+            )
+
+    @staticmethod
+    def attname(name):
+        return f'{name}_id' if name in ('course', 'professor') else name
+
+    def finish(self):
+        """Do what the per-row save signals would have done, once for the whole import"""
+        if not self.touched_courses:
+            return
+        search.index_courses(list(self.touched_courses))
+        catalog.bump_catalog_version()
+        bump_seat_version()
+        bump_room_version()
+        if self.grown_sections:
+            # Raised capacity opens seats for anyone on those waitlists
+            process_waitlists(self.grown_sections)
@@ -0,0 +1,354 @@
+"""
+Enrollment services for Silver Pine State University course registration.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .availability import bump_seat_version
+from .events import publish_seat_counts
+from .models import CourseSection
+from .prerequisites import completed_courses, get_index
+from .scheduling import meeting_mask
+from apps.grades.models import Enrollment
+
+
+# Per-section outcomes of an enrollment request
+ENROLLED = 'enrolled'
+WAITLISTED = 'waitlisted'
+ALREADY_ENROLLED = 'already_enrolled'
+ALREADY_WAITLISTED = 'already_waitlisted'
+CONFLICT = 'conflict'
+PREREQUISITES = 'prerequisites'
+FULL = 'full'
+CLOSED = 'closed'
+NOT_FOUND = 'not_found'
+RETRY = 'retry'
+
+# Enrollment statuses that release their claim on a section
+INACTIVE_STATUSES = ('Dropped', 'Withdrawn')
+
+MAX_ENROLLMENT_ATTEMPTS = 3
+
+
+class SeatReservationConflict(Exception):
+    """Raised when the guarded seat update touched fewer rows than expected"""
+
+    def __init__(self, full=()):
+        super().__init__()
+        self.full = set(full)  # Sections the update found at capacity
+
+
+@dataclass
+class EnrollmentResult:
+    """Outcome of enrolling a student in a single section"""
+
+    section_id: str
+    status: str
+    section: CourseSection = None
+    waitlist_position: int = None
+
+    @property
+    def succeeded(self):
+        return self.status in (ENROLLED, WAITLISTED)
+
+
+def enroll_cart(student, section_ids, waitlist=True):
+    """
+    Enroll a student in every section of their cart in one transaction.
+
+    Seats are reserved with a single capacity-guarded UPDATE and the
+    enrollment rows are bulk-created, so the number of queries does not
+    grow with the size of the cart. Sections that are full put the
+    student on the waitlist instead, unless ``waitlist`` is False, and
+    sections that clash with the student's schedule or with an earlier
+    cart item are rejected, as are courses whose prerequisites the
+    student has not completed. Returns one EnrollmentResult per section, in cart order.
+
+    When seat counts keep changing under the request, only the sections
+    the guarded UPDATE found at capacity are reported FULL; the rest of
+    the cart comes back as RETRY.
+    """
+    section_ids = list(dict.fromkeys(section_ids))
+    if not section_ids:
+        return []
+
+    full = set()
+    for _ in range(MAX_ENROLLMENT_ATTEMPTS):
+        try:
+            return _enroll_cart(student, section_ids, waitlist)
+        except SeatReservationConflict as exc:
+            # Another registration changed seat counts under us; start over
+            full = exc.full
+            continue
+
+    sections = CourseSection.objects.select_related('course').in_bulk(section_ids)
+    return [
+        EnrollmentResult(section_id, FULL if section_id in full else RETRY, sections[section_id])
+        if section_id in sections else EnrollmentResult(section_id, NOT_FOUND)
+        for section_id in section_ids
+    ]
+
+
+def _enroll_cart(student, section_ids, waitlist):
+    with transaction.atomic():
+        sections = (
+            CourseSection.objects
+            .select_for_update(of=('self',))
+            .select_related('course')
+            .in_bulk(section_ids)
+        )
+        existing = {
+            enrollment.course_section_id: enrollment
+            for enrollment in Enrollment.objects.filter(
+                student=student,
+                course_section_id__in=section_ids,
+            )
+        }
+
+        # Weekly schedule already taken, per semester
+        busy = {}
+        for semester, days, start_time, end_time in Enrollment.objects.filter(
+            student=student,
+            status='Enrolled',
+        ).values_list('semester', 'course_section__days', 'course_section__start_time', 'course_section__end_time'):
+            busy[semester] = busy.get(semester, 0) | meeting_mask(days, start_time, end_time)
+
+        # Prerequisites are checked in memory against one query of passed courses
+        index = get_index()
+        completed = None
+        if any(section.course_id in index.requirements for section in sections.values()):
+            completed = completed_courses(student)
+
+        results = []
+        seats = []
+        waitlists = []
+        for section_id in section_ids:
+            section = sections.get(section_id)
+            enrollment = existing.get(section_id)
+            if section is None:
+                results.append(EnrollmentResult(section_id, NOT_FOUND))
+            elif not section.is_active or not section.registration_open:
+                results.append(EnrollmentResult(section_id, CLOSED, section))
+            elif enrollment and enrollment.status == 'Waitlisted':
+                results.append(EnrollmentResult(
+                    section_id, ALREADY_WAITLISTED, section, enrollment.waitlist_position
+                ))
+            elif enrollment and enrollment.status not in INACTIVE_STATUSES:
+                results.append(EnrollmentResult(section_id, ALREADY_ENROLLED, section))
+            elif completed is not None and not index.is_eligible(section.course_id, completed):
+                results.append(EnrollmentResult(section_id, PREREQUISITES, section))
+            elif section.meeting_mask & busy.get(section.semester, 0):
+                results.append(EnrollmentResult(section_id, CONFLICT, section))
+            elif not section.is_full():
+                results.append(EnrollmentResult(section_id, ENROLLED, section))
+                seats.append(section)
+                busy[section.semester] = busy.get(section.semester, 0) | section.meeting_mask
+            elif waitlist:
+                position = section.waitlist_sequence + 1
+                results.append(EnrollmentResult(section_id, WAITLISTED, section, position))
+                waitlists.append(section)
+            else:
+                results.append(EnrollmentResult(section_id, FULL, section))
+
+        if seats:
+            # Take one seat in every open section, never past capacity
+            seat_ids = [section.section_id for section in seats]
+            try:
+                with transaction.atomic():
+                    updated = CourseSection.objects.filter(
+                        section_id__in=seat_ids,
+                        enrolled_count__lt=F('max_capacity'),
+                    ).update(enrolled_count=F('enrolled_count') + 1)
+                    if updated != len(seats):
+                        raise SeatReservationConflict()
+            except SeatReservationConflict:
+                # With the update rolled back, the sections it skipped are the full ones
+                raise SeatReservationConflict(
+                    CourseSection.objects.filter(
+                        section_id__in=seat_ids,
+                        enrolled_count__gte=F('max_capacity'),
+                    ).values_list('section_id', flat=True)
+                )
+
+        if waitlists:
+            # Hand out the next ticket in every full section's queue
+            CourseSection.objects.filter(
+                section_id__in=[section.section_id for section in waitlists],
+            ).update(
+                waitlist_count=F('waitlist_count') + 1,
+                waitlist_sequence=F('waitlist_sequence') + 1,
+            )
+
+        new_enrollments = []
+        revived_enrollments = []
+        for section, status, position in (
+            [(section, 'Enrolled', None) for section in seats]
+            + [(section, 'Waitlisted', section.waitlist_sequence + 1) for section in waitlists]
+        ):
+            enrollment = existing.get(section.section_id)
+            if enrollment is None:
+                new_enrollments.append(Enrollment(
+                    student=student,
+                    course_section=section,
+                    semester=section.semester,
+                    status=status,
+                    waitlist_position=position,
+                ))
+            else:
+                # Re-registering after a drop reuses the original row
+                enrollment.status = status
+                enrollment.waitlist_position = position
+                enrollment.updated_at = timezone.now()
+                revived_enrollments.append(enrollment)
+
+        Enrollment.objects.bulk_create(new_enrollments)
+        if revived_enrollments:
+            Enrollment.objects.bulk_update(revived_enrollments, ['status', 'waitlist_position', 'updated_at'])
+
+        for section in seats:
+            section.enrolled_count += 1
+        for section in waitlists:
+            section.waitlist_count += 1
+            section.waitlist_sequence += 1
+        _seats_changed(seats + waitlists)
+
+    return results
+
+
+def drop_enrollment(student, section_id):
+    """
+    Drop a student's enrollment or waitlist spot in a section.
+
+    Dropping an enrolled seat promotes the head of the section's waitlist
+    in the same transaction, so the seat never appears free in between.
+    Returns a ``(dropped, promoted)`` pair of Enrollment instances, where
+    ``dropped`` is None if there was nothing to drop and ``promoted`` is
+    None if nobody was waiting.
+    """
+    with transaction.atomic():
+        enrollment = (
+            Enrollment.objects
+            .select_for_update(of=('self',))
+            .select_related('course_section', 'course_section__course')
+            .filter(student=student, course_section_id=section_id, status__in=['Enrolled', 'Waitlisted'])
+            .first()
+        )
+        if enrollment is None:
+            return None, None
+
+        was_waitlisted = enrollment.status == 'Waitlisted'
+        enrollment.status = 'Dropped'
+        enrollment.waitlist_position = None
+        enrollment.save(update_fields=['status', 'waitlist_position', 'updated_at'])
+
+        section = enrollment.course_section
+        sections = CourseSection.objects.filter(section_id=section_id)
+        promoted = None
+        if was_waitlisted:
+            sections.update(waitlist_count=F('waitlist_count') - 1)
+            section.waitlist_count -= 1
+        else:
+            promoted = promote_next(section)
+            if promoted is None:
+                sections.update(enrolled_count=F('enrolled_count') - 1)
+                section.enrolled_count -= 1
+            else:
+                sections.update(waitlist_count=F('waitlist_count') - 1)
+                section.waitlist_count -= 1
+        _seats_changed([section])
+
+    return enrollment, promoted
+
+
+def promote_next(section):
+    """
+    Move the head of a section's waitlist into the section.
+
+    The head is found with a single seek on the waitlist index, so the
+    work is the same no matter how long the queue is. Seat counters are
+    left to the caller. Must run inside a transaction.
+    """
+    promoted = (
+        Enrollment.objects
+        .select_for_update(of=('self',))
+        .filter(course_section=section, status='Waitlisted')
+        .order_by('waitlist_position')
+        .first()
+    )
+    if promoted is not None:
+        promoted.status = 'Enrolled'
+        promoted.waitlist_position = None
+        promoted.save(update_fields=['status', 'waitlist_position', 'updated_at'])
+    return promoted
+
+
+def process_waitlists(section_ids=None):
+    """
+    Promote waitlisted students into every section that has open seats.
+
+    Used after capacity is raised in the admin. The students to promote
+    are picked with one windowed query and written back with bulk
+    updates, so the pass costs a fixed number of queries however many
+    sections it touches. Returns the number of students promoted.
+    """
+    with transaction.atomic():
+        sections = CourseSection.objects.select_for_update().filter(
+            enrolled_count__lt=F('max_capacity'),
+            waitlist_count__gt=0,
+        )
+        if section_ids is not None:
+            sections = sections.filter(section_id__in=section_ids)
+        sections = sections.in_bulk()
+        if not sections:
+            return 0
+
+        queue = (
+            Enrollment.objects
+            .filter(course_section_id__in=list(sections), status='Waitlisted')
+            .annotate(place=Window(
+                RowNumber(),
+                partition_by=F('course_section'),
+                order_by=F('waitlist_position').asc(),
+            ))
+            .filter(place__lte=max(section.seats_available() for section in sections.values()))
+            .order_by('course_section_id', 'waitlist_position')
+        )
+
+        promoted = []
+        for enrollment in queue:
+            section = sections[enrollment.course_section_id]
+            if enrollment.place > section.seats_available():
+                continue
+            enrollment.status = 'Enrolled'
+            enrollment.waitlist_position = None
+            enrollment.updated_at = timezone.now()
+            promoted.append(enrollment)
+
+        touched = {}
+        for enrollment in promoted:
+            touched[enrollment.course_section_id] = touched.get(enrollment.course_section_id, 0) + 1
+        for section_id, count in touched.items():
+            section = sections[section_id]
+            section.enrolled_count += count
+            section.waitlist_count -= count
+
+        Enrollment.objects.bulk_update(promoted, ['status', 'waitlist_position', 'updated_at'])
+        CourseSection.objects.bulk_update(
+            [sections[section_id] for section_id in touched],
+            ['enrolled_count', 'waitlist_count'],
+        )
+        _seats_changed([sections[section_id] for section_id in touched])
+
+    return len(promoted)
+
+
+def _seats_changed(sections):
+    """Announce new seat counters once the surrounding transaction commits"""
+    if not sections:
+        return
+    transaction.on_commit(bump_seat_version)
+    transaction.on_commit(lambda: publish_seat_counts(sections))
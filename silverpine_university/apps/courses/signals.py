@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Course, CoursePrerequisite, CourseSection, Department, Professor
+from . import catalog, prerequisites, search
+from .rooms import bump_room_version
+from .availability import bump_seat_version
+from .events import publish_seat_counts
+
+
+@receiver(post_save, sender=Course)
+def index_saved_course(sender, instance, **kwargs):
+    search.index_courses([instance.course_code])
+    catalog.bump_catalog_version()
+
+
+@receiver(post_delete, sender=Course)
+def unindex_deleted_course(sender, instance, **kwargs):
+    search.index_courses([instance.course_code])
+    catalog.bump_catalog_version()
+
+
+@receiver(post_save, sender=Department)
+def index_department_courses(sender, instance, created, **kwargs):
+    if not created:
+        search.index_courses(instance.courses.values_list('course_code', flat=True))
+    catalog.bump_catalog_version()
+
+
+@receiver(post_delete, sender=Department)
+def invalidate_deleted_department(sender, instance, **kwargs):
+    catalog.bump_catalog_version()
+
+
+@receiver(post_save, sender=Professor)
+def index_professor_courses(sender, instance, created, **kwargs):
+    if not created:
+        search.index_courses(instance.sections.values_list('course_id', flat=True).distinct())
+        catalog.bump_catalog_version()
+
+
+@receiver([post_save, post_delete], sender=CourseSection)
+def index_section_course(sender, instance, **kwargs):
+    search.index_courses([instance.course_id])
+    catalog.bump_catalog_version()
+    bump_seat_version()
+    bump_room_version()
+
+
+@receiver(post_save, sender=CourseSection)
+def publish_section_seats(sender, instance, **kwargs):
+    transaction.on_commit(lambda: publish_seat_counts([instance]))
+
+
+@receiver(post_save, sender=CoursePrerequisite)
+def extend_prerequisite_closure(sender, instance, created, **kwargs):
+    if created:
+        prerequisites.add_to_closure(instance.course_id, instance.required_course_id)
+    else:
+        prerequisites.rebuild_closure([instance.course_id])
+    transaction.on_commit(prerequisites.invalidate_index)
+
+
+@receiver(post_delete, sender=CoursePrerequisite)
+def shrink_prerequisite_closure(sender, instance, **kwargs):
+    prerequisites.rebuild_closure([instance.course_id])
+    transaction.on_commit(prerequisites.invalidate_index)
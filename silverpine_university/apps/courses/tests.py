@@ -0,0 +1,180 @@
+from datetime import date, time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.grades.models import Enrollment
+from apps.students.models import Student
+from . import services
+from .cart import CartError, CourseCart
+from .models import Course, CourseSection, Department, Professor
+
+
+class RegistrationTestCase(TestCase):
+    """A department with one course per section, no prerequisites and no clashes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(
+            code='CSCI', name='Computer Science', description='', building='Hall', phone='555', email='cs@example.com',
+        )
+        cls.professor = Professor.objects.create(
+            professor_id='P1', first_name='Ada', last_name='Byron', title='Professor', department=department,
+            email='ada@example.com', office_location='Hall 1', office_hours='MWF',
+        )
+        cls.courses = [
+            Course.objects.create(
+                course_code=f'CSCI10{number}0', title=f'Course {number}', department=department, description='',
+                level='Undergraduate',
+            )
+            for number in range(3)
+        ]
+
+    def add_section(self, number, max_capacity=30):
+        return CourseSection.objects.create(
+            section_id=f'CSCI10{number}0-A', course=self.courses[number], professor=self.professor,
+            semester='Spring 2026', days='MWF', start_time=time(8 + 2 * number), end_time=time(9 + 2 * number),
+            building='Hall', room_number=str(number), max_capacity=max_capacity,
+        )
+
+    def add_student(self, number):
+        return Student.objects.create(
+            student_id=f'S{number:04d}', first_name='Student', last_name=f'Number{number}',
+            email=f'student{number}@example.com', major='Computer Science', academic_year='Freshman',
+            enrollment_date=date(2025, 8, 25), expected_graduation=date(2029, 5, 15),
+        )
+
+
+class EnrollCartTests(RegistrationTestCase):
+
+    def test_enrolls_every_open_section_in_cart_order(self):
+        sections = [self.add_section(number) for number in range(2)]
+        student = self.add_student(0)
+
+        results = services.enroll_cart(student, [section.pk for section in reversed(sections)])
+
+        self.assertEqual([(result.section_id, result.status) for result in results], [
+            (sections[1].pk, services.ENROLLED), (sections[0].pk, services.ENROLLED),
+        ])
+        for section in sections:
+            section.refresh_from_db()
+            self.assertEqual(section.enrolled_count, 1)
+        self.assertEqual(Enrollment.objects.filter(student=student, status='Enrolled').count(), 2)
+
+    def test_full_section_without_waitlist(self):
+        section = self.add_section(0, max_capacity=1)
+        services.enroll_cart(self.add_student(0), [section.pk])
+
+        results = services.enroll_cart(self.add_student(1), [section.pk], waitlist=False)
+
+        self.assertEqual(results[0].status, services.FULL)
+        section.refresh_from_db()
+        self.assertEqual(section.enrolled_count, 1)
+
+    def test_guarded_update_never_oversells(self):
+        # A stale read that still sees a seat must not take one past capacity
+        full = self.add_section(0, max_capacity=1)
+        open_section = self.add_section(1)
+        services.enroll_cart(self.add_student(0), [full.pk])
+        student = self.add_student(1)
+
+        with mock.patch.object(CourseSection, 'is_full', return_value=False):
+            results = services.enroll_cart(student, [open_section.pk, full.pk, 'NOPE-1'])
+
+        full.refresh_from_db()
+        open_section.refresh_from_db()
+        self.assertEqual(full.enrolled_count, 1)
+        self.assertEqual(open_section.enrolled_count, 0)
+        self.assertFalse(Enrollment.objects.filter(student=student).exists())
+        # Only the section the guard refused is full; the rest can be tried again
+        self.assertEqual([(result.section_id, result.status) for result in results], [
+            (open_section.pk, services.RETRY), (full.pk, services.FULL), ('NOPE-1', services.NOT_FOUND),
+        ])
+        self.assertEqual(results[0].section, open_section)
+
+
+class WaitlistTests(RegistrationTestCase):
+
+    def setUp(self):
+        self.section = self.add_section(0, max_capacity=1)
+        self.students = [self.add_student(number) for number in range(4)]
+        for student in self.students:
+            services.enroll_cart(student, [self.section.pk])
+
+    def enrollment(self, student):
+        return Enrollment.objects.get(student=student, course_section=self.section)
+
+    def test_full_section_hands_out_waitlist_positions_in_order(self):
+        self.assertEqual(self.enrollment(self.students[0]).status, 'Enrolled')
+        self.assertEqual(
+            [(self.enrollment(student).status, self.enrollment(student).waitlist_position) for student in self.students[1:]],
+            [('Waitlisted', 1), ('Waitlisted', 2), ('Waitlisted', 3)],
+        )
+        self.section.refresh_from_db()
+        self.assertEqual((self.section.enrolled_count, self.section.waitlist_count), (1, 3))
+
+    def test_dropping_a_seat_promotes_the_head_of_the_waitlist(self):
+        dropped, promoted = services.drop_enrollment(self.students[0], self.section.pk)
+
+        self.assertEqual(dropped.status, 'Dropped')
+        self.assertEqual(promoted.student_id, self.students[1].pk)
+        enrollment = self.enrollment(self.students[1])
+        self.assertEqual((enrollment.status, enrollment.waitlist_position), ('Enrolled', None))
+        self.section.refresh_from_db()
+        self.assertEqual((self.section.enrolled_count, self.section.waitlist_count), (1, 2))
+
+    def test_dropping_a_waitlist_spot_promotes_nobody(self):
+        dropped, promoted = services.drop_enrollment(self.students[2], self.section.pk)
+
+        self.assertEqual(dropped.status, 'Dropped')
+        self.assertIsNone(promoted)
+        self.section.refresh_from_db()
+        self.assertEqual((self.section.enrolled_count, self.section.waitlist_count), (1, 2))
+        # The next new arrival still queues behind everyone already handed a position
+        results = services.enroll_cart(self.add_student(9), [self.section.pk])
+        self.assertEqual((results[0].status, results[0].waitlist_position), (services.WAITLISTED, 4))
+
+    def test_raising_capacity_promotes_waitlisted_students_in_order(self):
+        CourseSection.objects.filter(pk=self.section.pk).update(max_capacity=3)
+
+        self.assertEqual(services.process_waitlists([self.section.pk]), 2)
+
+        self.assertEqual(
+            [self.enrollment(student).status for student in self.students],
+            ['Enrolled', 'Enrolled', 'Enrolled', 'Waitlisted'],
+        )
+        self.section.refresh_from_db()
+        self.assertEqual((self.section.enrolled_count, self.section.waitlist_count), (3, 1))
+
+
+class CourseCartTests(RegistrationTestCase):
+
+    def setUp(self):
+        self.sections = [self.add_section(number) for number in range(3)]
+        self.cart = CourseCart('S0000')
+        self.cart.clear()
+
+    def test_add_and_remove_persist_in_the_cache(self):
+        self.assertTrue(self.cart.add(self.sections[0].pk))
+        self.assertFalse(self.cart.add(self.sections[0].pk))
+        self.assertTrue(self.cart.add(self.sections[1].pk))
+        self.assertTrue(self.cart.remove(self.sections[0].pk))
+
+        self.assertEqual(list(CourseCart('S0000')), [self.sections[1].pk])
+
+    def test_unknown_or_malformed_section_ids_are_rejected(self):
+        for section_id in ['NOPE-1', f'{self.sections[0].pk},{self.sections[1].pk}', 'X' * 50, '', None]:
+            with self.subTest(section_id=section_id), self.assertRaises(CartError):
+                self.cart.add(section_id)
+        self.assertEqual(list(CourseCart('S0000')), [])
+
+    @override_settings(CART_MAX_ITEMS=2)
+    def test_cart_size_is_capped(self):
+        self.cart.add(self.sections[0].pk)
+        self.cart.add(self.sections[1].pk)
+
+        with self.assertRaises(CartError):
+            self.cart.add(self.sections[2].pk)
+        # Re-adding an item already in a full cart is not an error
+        self.assertFalse(self.cart.add(self.sections[0].pk))
+        self.assertEqual(len(CourseCart('S0000')), 2)
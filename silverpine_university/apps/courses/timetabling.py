@@ -0,0 +1,451 @@
+"""
+Section timetabling: choose meeting times and rooms for a term.
+
+Every section gets one standard meeting pattern (days and start time,
+chosen by its credit hours) and one room. Hard constraints: no room or
+professor is booked twice at once, professors are not scheduled over
+their office hours, and rooms are big enough for the section's
+max_capacity. Soft goals: teach in the department's own building, keep
+sections of the same course at different times, avoid oversized rooms,
+and spread sections across the day.
+
+The solver builds a greedy timetable, hardest sections first, then
+improves it with simulated annealing. Busy times are weekly bitmasks
+(see scheduling.py), so every feasibility check is one AND. A Problem is
+plain data, which lets several randomised starts run in separate
+processes; the best result wins.
+"""
+import math
+import random
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+from .scheduling import meeting_mask, office_hours_mask
+
+
+HOURLY_STARTS = [time(hour, 0) for hour in range(8, 17)]
+BLOCK_STARTS = [time(8, 0), time(9, 30), time(11, 0), time(12, 30), time(14, 0), time(15, 30)]
+
+# (days, minutes per meeting, start times) by credit hours
+MEETING_PATTERNS = {
+    3: [('MWF', 50, HOURLY_STARTS), ('TR', 75, BLOCK_STARTS), ('MW', 75, BLOCK_STARTS)],
+    4: [('MTWR', 50, HOURLY_STARTS), ('MWF', 75, BLOCK_STARTS)],
+}
+DEFAULT_CREDITS = 3
+
+# Soft constraint weights
+BUILDING_PENALTY = 3.0
+COURSE_OVERLAP_PENALTY = 2.0
+ROOM_WASTE_PENALTY = 1.0
+SLOT_LOAD_PENALTY = 0.02
+
+
+@dataclass
+class SectionSpec:
+    section_id: str
+    course_id: str
+    professor_id: str
+    building: str      # preferred (department) building
+    capacity: int
+    credits: int
+
+
+@dataclass
+class RoomSpec:
+    building: str
+    room: str
+    capacity: int
+
+
+@dataclass
+class Problem:
+    """Everything the solver needs, as picklable plain data"""
+
+    sections: list
+    rooms: list
+    professor_busy: dict = field(default_factory=dict)  # professor_id -> weekly mask
+    room_busy: dict = field(default_factory=dict)       # (building, room) -> weekly mask
+
+
+@dataclass
+class Solution:
+    seed: int
+    assignments: dict   # section_id -> (days, start_time, end_time, building, room)
+    unplaced: list
+    metrics: dict
+
+    @property
+    def score(self):
+        return (len(self.unplaced), self.metrics['penalty'])
+
+
+def build_patterns():
+    """All meeting patterns as (days, start, end, mask) and their indexes per credit value"""
+    patterns = []
+    by_credits = {}
+    for credits, options in MEETING_PATTERNS.items():
+        for days, length, starts in options:
+            for start in starts:
+                end = (datetime.combine(datetime.min, start) + timedelta(minutes=length)).time()
+                key = (days, start, end)
+                if key not in [pattern[:3] for pattern in patterns]:
+                    patterns.append((days, start, end, meeting_mask(days, start, end)))
+                by_credits.setdefault(credits, []).append(
+                    next(index for index, pattern in enumerate(patterns) if pattern[:3] == key)
+                )
+    return patterns, by_credits
+
+
+class Timetabler:
+    """One randomised greedy + annealing run over a Problem"""
+
+    def __init__(self, problem, seed=0, progress=None):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.progress = progress
+        self.sections = problem.sections
+        self.patterns, by_credits = build_patterns()
+        self.pattern_masks = [pattern[3] for pattern in self.patterns]
+        self.overlaps = [[bool(a & b) for b in self.pattern_masks] for a in self.pattern_masks]
+        self.section_patterns = [
+            by_credits.get(section.credits, by_credits[DEFAULT_CREDITS]) for section in self.sections
+        ]
+
+        self.rooms = sorted(problem.rooms, key=lambda room: (room.capacity, room.building, room.room))
+        self.room_capacities = [room.capacity for room in self.rooms]
+        self.rooms_by_building = {}
+        for index, room in enumerate(self.rooms):
+            self.rooms_by_building.setdefault(room.building, []).append(index)
+
+        self.room_busy = [problem.room_busy.get((room.building, room.room), 0) for room in self.rooms]
+        # Bit r of free_bits[p] is set while room r can take pattern p; the lowest
+        # set bit above a capacity cut-off is then the smallest room that fits
+        self.pattern_neighbours = [
+            [other for other, overlaps in enumerate(row) if overlaps] for row in self.overlaps
+        ]
+        self.free_bits = [
+            sum(1 << room for room, busy in enumerate(self.room_busy) if not busy & mask)
+            for mask in self.pattern_masks
+        ]
+        self.building_bits = {
+            building: sum(1 << room for room in rooms) for building, rooms in self.rooms_by_building.items()
+        }
+        # Rooms are sorted by size, so the rooms big enough for a section are all bits from a cut-off up
+        self.fit_bits = [
+            ~((1 << bisect_left(self.room_capacities, section.capacity)) - 1) for section in self.sections
+        ]
+        self.room_sections = [set() for _ in self.rooms]
+        self.professor_busy = dict(problem.professor_busy)
+        self.course_patterns = {}
+        self.slot_load = [0] * len(self.patterns)
+        self.assignment = [None] * len(self.sections)
+
+    # --- bookkeeping ---
+
+    def place(self, index, pattern, room):
+        section = self.sections[index]
+        mask = self.pattern_masks[pattern]
+        self.assignment[index] = (pattern, room)
+        self.room_busy[room] |= mask
+        self.room_sections[room].add(index)
+        for other in self.pattern_neighbours[pattern]:
+            self.free_bits[other] &= ~(1 << room)
+        if section.professor_id:
+            self.professor_busy[section.professor_id] = self.professor_busy.get(section.professor_id, 0) | mask
+        counts = self.course_patterns.setdefault(section.course_id, {})
+        counts[pattern] = counts.get(pattern, 0) + 1
+        self.slot_load[pattern] += 1
+
+    def remove(self, index):
+        pattern, room = self.assignment[index]
+        section = self.sections[index]
+        mask = self.pattern_masks[pattern]
+        # Bookings never overlap, so clearing this meeting's bits frees exactly its time
+        self.assignment[index] = None
+        self.room_busy[room] &= ~mask
+        self.room_sections[room].discard(index)
+        for other in self.pattern_neighbours[pattern]:
+            if not self.room_busy[room] & self.pattern_masks[other]:
+                self.free_bits[other] |= 1 << room
+        if section.professor_id:
+            self.professor_busy[section.professor_id] &= ~mask
+        self.course_patterns[section.course_id][pattern] -= 1
+        self.slot_load[pattern] -= 1
+        return pattern, room
+
+    # --- evaluation ---
+
+    def cost(self, index, pattern, room):
+        """Soft cost of putting a section at a pattern and room, given everything else"""
+        section = self.sections[index]
+        candidate = self.rooms[room]
+        cost = 0.0
+        if section.building and candidate.building != section.building:
+            cost += BUILDING_PENALTY
+        cost += COURSE_OVERLAP_PENALTY * sum(
+            count for other, count in self.course_patterns.get(section.course_id, {}).items()
+            if count and self.overlaps[pattern][other]
+        )
+        cost += ROOM_WASTE_PENALTY * (candidate.capacity - section.capacity) / max(candidate.capacity, 1)
+        cost += SLOT_LOAD_PENALTY * self.slot_load[pattern]
+        return cost
+
+    def professor_free(self, index, pattern):
+        professor = self.sections[index].professor_id
+        return not professor or not self.professor_busy.get(professor, 0) & self.pattern_masks[pattern]
+
+    def free_rooms(self, index, pattern):
+        """The smallest free room that fits in the preferred building, and overall"""
+        fits = self.free_bits[pattern] & self.fit_bits[index]
+        preferred = fits & self.building_bits.get(self.sections[index].building, 0)
+        if preferred:
+            yield (preferred & -preferred).bit_length() - 1
+        if fits and fits & -fits != preferred & -preferred:
+            yield (fits & -fits).bit_length() - 1
+
+    def best_move(self, index):
+        best = None
+        for pattern in self.section_patterns[index]:
+            if not self.professor_free(index, pattern):
+                continue
+            for room in self.free_rooms(index, pattern):
+                cost = self.cost(index, pattern, room)
+                if best is None or cost < best[0]:
+                    best = (cost, pattern, room)
+        return best
+
+    def random_move(self, index):
+        patterns = [pattern for pattern in self.section_patterns[index] if self.professor_free(index, pattern)]
+        self.rng.shuffle(patterns)
+        for pattern in patterns:
+            rooms = list(self.free_rooms(index, pattern))
+            if rooms:
+                room = self.rng.choice(rooms)
+                return self.cost(index, pattern, room), pattern, room
+        return None
+
+    def metrics(self):
+        placed = [(index, move) for index, move in enumerate(self.assignment) if move]
+        building_misses = sum(
+            1 for index, (_, room) in placed
+            if self.sections[index].building and self.rooms[room].building != self.sections[index].building
+        )
+        course_overlaps = 0
+        for counts in self.course_patterns.values():
+            items = [(pattern, count) for pattern, count in counts.items() if count]
+            for position, (pattern, count) in enumerate(items):
+                course_overlaps += count * (count - 1) // 2
+                course_overlaps += sum(
+                    count * other_count for other, other_count in items[position + 1:]
+                    if self.overlaps[pattern][other]
+                )
+        waste = sum(
+            (self.rooms[room].capacity - self.sections[index].capacity) / max(self.rooms[room].capacity, 1)
+            for index, (_, room) in placed
+        )
+        return {
+            'placed': len(placed),
+            'unplaced': len(self.sections) - len(placed),
+            'building_misses': building_misses,
+            'course_overlaps': course_overlaps,
+            'room_fill': round(1 - waste / len(placed), 3) if placed else 0,
+            'penalty': round(
+                BUILDING_PENALTY * building_misses
+                + COURSE_OVERLAP_PENALTY * course_overlaps
+                + ROOM_WASTE_PENALTY * waste, 2
+            ),
+        }
+
+    def report(self, phase, started, **extra):
+        if self.progress:
+            self.progress({
+                'seed': self.seed,
+                'phase': phase,
+                'elapsed': round(perf_counter() - started, 2),
+                **self.metrics(),
+                **extra,
+            })
+
+    # --- search ---
+
+    def construct(self):
+        """Greedy placement, most constrained sections first"""
+        professor_load = {}
+        for section in self.sections:
+            professor_load[section.professor_id] = professor_load.get(section.professor_id, 0) + 1
+        noise = 0.0 if self.seed == 0 else 0.3
+        order = sorted(
+            range(len(self.sections)),
+            key=lambda index: (
+                -self.sections[index].capacity * (1 + noise * self.rng.random()),
+                -professor_load[self.sections[index].professor_id],
+                self.rng.random(),
+            ),
+        )
+        for index in order:
+            move = self.best_move(index)
+            if move:
+                self.place(index, move[1], move[2])
+
+    def evict_into(self, index):
+        """Place an unplaced section by moving sections out of its way; keep the change only if nothing is lost"""
+        section = self.sections[index]
+        patterns = [pattern for pattern in self.section_patterns[index] if self.professor_free(index, pattern)]
+        start = bisect_left(self.room_capacities, section.capacity)
+        if not patterns or start == len(self.rooms):
+            return False
+        pattern = self.rng.choice(patterns)
+        room = self.rng.randrange(start, len(self.rooms))
+
+        evicted = [other for other in self.room_sections[room] if self.overlaps[pattern][self.assignment[other][0]]]
+        previous = {other: self.remove(other) for other in evicted}
+        if self.room_busy[room] & self.pattern_masks[pattern]:
+            # Fixed bookings from outside this run hold the room
+            for other, (old_pattern, old_room) in previous.items():
+                self.place(other, old_pattern, old_room)
+            return False
+
+        self.place(index, pattern, room)
+        lost = []
+        for other in evicted:
+            move = self.best_move(other)
+            if move:
+                self.place(other, move[1], move[2])
+            else:
+                lost.append(other)
+        if not lost or (len(lost) == 1 and self.rng.random() < 0.3):
+            return True
+
+        for other in evicted:
+            if self.assignment[other]:
+                self.remove(other)
+        self.remove(index)
+        for other, (old_pattern, old_room) in previous.items():
+            self.place(other, old_pattern, old_room)
+        return False
+
+    def improve(self, time_limit, started, report_every=2.0):
+        """Simulated annealing over single-section moves, plus evictions for unplaced sections"""
+        if not self.sections:
+            return
+        deadline = started + time_limit
+        temperature = 2.0
+        iteration = 0
+        next_report = perf_counter() + report_every
+        best_score = None
+        best_assignment = None
+
+        while True:
+            iteration += 1
+            if iteration % 256 == 0:
+                now = perf_counter()
+                if now >= deadline:
+                    break
+                # Cool from 2.0 towards 0.01 over the time limit
+                temperature = max(0.01, 2.0 * (1 - (now - started) / time_limit))
+                if iteration % 4096 == 0:
+                    metrics = self.metrics()
+                    score = (metrics['unplaced'], metrics['penalty'])
+                    if best_score is None or score < best_score:
+                        best_score, best_assignment = score, list(self.assignment)
+                if now >= next_report:
+                    self.report('improve', started, iteration=iteration)
+                    next_report = now + report_every
+
+            index = self.rng.randrange(len(self.sections))
+            if self.assignment[index] is None:
+                move = self.best_move(index)
+                if move:
+                    self.place(index, move[1], move[2])
+                else:
+                    self.evict_into(index)
+                continue
+
+            old_pattern, old_room = self.remove(index)
+            old_cost = self.cost(index, old_pattern, old_room)
+            move = self.random_move(index) if self.rng.random() < 0.5 else self.best_move(index)
+            if move and (move[0] <= old_cost or self.rng.random() < math.exp((old_cost - move[0]) / temperature)):
+                self.place(index, move[1], move[2])
+            else:
+                self.place(index, old_pattern, old_room)
+
+        metrics = self.metrics()
+        if best_score is not None and best_score < (metrics['unplaced'], metrics['penalty']):
+            self.restore(best_assignment)
+
+    def restore(self, assignment):
+        for index, move in enumerate(self.assignment):
+            if move:
+                self.remove(index)
+        for index, move in enumerate(assignment):
+            if move:
+                self.place(index, *move)
+
+    def solve(self, time_limit):
+        started = perf_counter()
+        self.construct()
+        self.report('construct', started)
+        self.improve(time_limit, started)
+        self.report('done', started)
+
+        assignments = {}
+        unplaced = []
+        for index, move in enumerate(self.assignment):
+            section = self.sections[index]
+            if move is None:
+                unplaced.append(section.section_id)
+                continue
+            pattern, room = move
+            days, start, end, _ = self.patterns[pattern]
+            assignments[section.section_id] = (days, start, end, self.rooms[room].building, self.rooms[room].room)
+        return Solution(self.seed, assignments, unplaced, self.metrics())
+
+
+def solve(problem, seed=0, time_limit=30.0, progress=None):
+    """Run one start; the entry point used by worker processes"""
+    return Timetabler(problem, seed, progress).solve(time_limit)
+
+
+def load_problem(semester, include_enrolled=False, rooms=None):
+    """
+    Build a Problem for a term from the database.
+
+    Sections that already have students keep their times unless
+    ``include_enrolled`` is set, and count as fixed bookings. Rooms default to
+    every (building, room) pair used by any section, sized by the largest
+    section ever held there; pass ``rooms`` as RoomSpecs to override.
+    """
+    from .models import CourseSection, Professor
+
+    sections = CourseSection.objects.filter(semester=semester, is_active=True).values_list(
+        'section_id', 'course_id', 'professor_id', 'course__department__building', 'max_capacity',
+        'course__credits', 'enrolled_count', 'waitlist_count', 'days', 'start_time', 'end_time',
+        'building', 'room_number',
+    )
+
+    specs = []
+    room_busy = {}
+    professor_busy = {
+        professor_id: office_hours_mask(office_hours)
+        for professor_id, office_hours in Professor.objects.values_list('professor_id', 'office_hours')
+    }
+    for (section_id, course_id, professor_id, building, capacity, credits,
+         enrolled, waitlisted, days, start_time, end_time, room_building, room) in sections:
+        if (enrolled or waitlisted) and not include_enrolled:
+            mask = meeting_mask(days, start_time, end_time)
+            room_busy[(room_building, room)] = room_busy.get((room_building, room), 0) | mask
+            if professor_id:
+                professor_busy[professor_id] = professor_busy.get(professor_id, 0) | mask
+            continue
+        specs.append(SectionSpec(section_id, course_id, professor_id, building or '', capacity, credits))
+
+    if rooms is None:
+        sizes = {}
+        for building, room, capacity in CourseSection.objects.values_list('building', 'room_number', 'max_capacity'):
+            if building and room:
+                sizes[(building, room)] = max(sizes.get((building, room), 0), capacity)
+        rooms = [RoomSpec(building, room, capacity) for (building, room), capacity in sizes.items()]
+
+    return Problem(specs, rooms, professor_busy, room_busy)
@@ -4,5 +4,8 @@ from . import views
 urlpatterns = [
     path('catalog/', views.CourseCatalogView.as_view(), name='course_catalog'),
     path('registration/', views.CourseRegistrationView.as_view(), name='course_registration'),
+    path('registration/availability/', views.SectionAvailabilityView.as_view(), name='section_availability'),
+    path('registration/events/', views.SeatEventsView.as_view(), name='seat_events'),
+    path('rooms/free/', views.FreeRoomsView.as_view(), name='free_rooms'),
     path('schedule/', views.CourseScheduleView.as_view(), name='course_schedule'),
 ]
\ No newline at end of file
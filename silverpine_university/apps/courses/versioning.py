@@ -0,0 +1,36 @@
+"""
+Version counters for cached data.
+
+Cached values built from some rows are stored under keys that include a
+version, and whatever changes those rows bumps the version, which makes
+every stale entry unreachable at once instead of deleting them one by
+one. The counters live in the shared cache alias, so a bump in one
+process is seen by all of them; the values they guard may stay in each
+process's own cache. A counter that has never been set reads as 1.
+"""
+from django.core.cache import caches
+
+
+def get_version(key):
+    """Current value of a version counter"""
+    versions = caches['shared']
+    version = versions.get(key)
+    if version is None:
+        versions.add(key, 1, timeout=None)
+        version = versions.get(key, 1)
+    return version
+
+
+def get_versions(keys):
+    """``{key: version}`` of several counters, read in one round trip"""
+    found = caches['shared'].get_many(list(keys))
+    return {key: found.get(key, 1) for key in keys}
+
+
+def bump_version(key):
+    """Advance a version counter, making everything cached under the old value stale"""
+    versions = caches['shared']
+    try:
+        versions.incr(key)
+    except ValueError:
+        versions.add(key, 2, timeout=None)
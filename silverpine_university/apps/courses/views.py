@@ -1,63 +1,125 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib import messages
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from urllib.parse import urlencode
+from datetime import datetime
+import asyncio
+import json
 from .models import Course, CourseSection, Department
-from apps.students.models import Student
+from apps.students.middleware import StudentRequiredMixin
 from apps.grades.models import Enrollment
+from . import availability, catalog, events, search, services
+from .admission import admission_control
+from .cart import CartError, CourseCart, validate_cart
+from .rooms import get_occupancy
+from .scheduling import combine_masks, meeting_mask
 
 
-class CourseCatalogView(View):
+class CourseCatalogView(StudentRequiredMixin, View):
     """Browse all available courses"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
         # Get filter parameters
-        department_filter = request.GET.get('department', '')
-        level_filter = request.GET.get('level', '')
-        search_query = request.GET.get('search', '')
+        filters = {
+            'department': request.GET.get('department', ''),
+            'level': request.GET.get('level', ''),
+            'search': request.GET.get('search', '').strip(),
+            'after': request.GET.get('after', ''),
+            'before': request.GET.get('before', ''),
+        }
+        
+        # Rendered pages are shared by every student browsing the same filters
+        cache_key = catalog.page_cache_key(**filters)
+        catalog_html = cache.get(cache_key)
+        if catalog_html is None:
+            catalog_html = render_to_string('courses/partials/catalog_results.html', self.get_catalog_context(filters))
+            cache.set(cache_key, catalog_html, settings.CATALOG_CACHE_TIMEOUT)
+        
+        context = {
+            'catalog_html': catalog_html,
+        }
+        return render(request, 'courses/catalog.html', context)
+    
+    def get_catalog_context(self, filters):
+        department_filter = filters['department']
+        level_filter = filters['level']
+        search_query = filters['search']
         
         # Base queryset
-        courses = Course.objects.all()
+        courses = Course.objects.select_related('department')
+        
+        ranked_codes = None
+        combinations = None
+        if search_query:
+            ranked_codes = search.search_courses(search_query, department_filter, level_filter)
+            if ranked_codes is not None:
+                combinations = search.match_counts(search_query)
+            if combinations is None:
+                ranked_codes = None
+                courses = courses.filter(
+                    Q(course_code__icontains=search_query) |
+                    Q(title__icontains=search_query) |
+                    Q(description__icontains=search_query)
+                )
+        
+        # Facet counts cover the search but not the department/level filters
+        if combinations is None:
+            department_counts, level_counts, combinations = catalog.facet_counts(courses)
+        else:
+            department_counts, level_counts, combinations = catalog.split_facets(combinations)
+        total = sum(
+            count for (department, level), count in combinations.items()
+            if department_filter in ('', department) and level_filter in ('', level)
+        )
         
         # Apply filters
         if department_filter:
             courses = courses.filter(department__code=department_filter)
         if level_filter:
             courses = courses.filter(level=level_filter)
-        if search_query:
-            courses = courses.filter(
-                Q(course_code__icontains=search_query) |
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
         
-        departments = Department.objects.all()
+        if ranked_codes is None:
+            page, has_previous, has_next = catalog.keyset_page(courses, filters['after'], filters['before'])
+        else:
+            # Search results are already filtered and ranked, but capped at SEARCH_RESULT_LIMIT
+            page, has_previous, has_next = catalog.ranked_page(courses, ranked_codes, filters['after'], filters['before'])
         
-        context = {
-            'courses': courses,
+        departments = [
+            (department, department_counts.get(department.code, 0))
+            for department in Department.objects.all()
+        ]
+        
+        base_query = {name: filters[name] for name in ('search', 'department', 'level') if filters[name]}
+        return {
+            'courses': page,
+            'total_courses': total,
+            'shown_courses': len(ranked_codes) if ranked_codes is not None and len(ranked_codes) < total else None,
             'departments': departments,
+            'level_counts': level_counts,
             'selected_department': department_filter,
             'selected_level': level_filter,
             'search_query': search_query,
+            'previous_query': urlencode({**base_query, 'before': page[0].course_code}) if has_previous and page else '',
+            'next_query': urlencode({**base_query, 'after': page[-1].course_code}) if has_next and page else '',
         }
-        return render(request, 'courses/catalog.html', context)
 
 
-class CourseRegistrationView(View):
+@method_decorator(admission_control('course_registration'), name='post')
+class CourseRegistrationView(StudentRequiredMixin, View):
     """Register for course sections"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get available sections
         sections = CourseSection.objects.filter(
@@ -66,105 +128,213 @@ class CourseRegistrationView(View):
             semester='Spring 2026'  # Current registration period
         ).select_related('course', 'professor', 'course__department')
         
-        # Get student's current enrollments
-        enrolled_sections = Enrollment.objects.filter(
+        # Get student's current enrollments and waitlist spots
+        enrolled_sections = []
+        waitlisted_sections = []
+        enrolled_mask = 0
+        for section_id, status, days, start_time, end_time in Enrollment.objects.filter(
             student=student,
             semester='Spring 2026',
-            status='Enrolled'
-        ).values_list('course_section_id', flat=True)
+            status__in=['Enrolled', 'Waitlisted']
+        ).values_list(
+            'course_section_id', 'status',
+            'course_section__days', 'course_section__start_time', 'course_section__end_time'
+        ):
+            if status == 'Enrolled':
+                enrolled_sections.append(section_id)
+                enrolled_mask |= meeting_mask(days, start_time, end_time)
+            else:
+                waitlisted_sections.append(section_id)
+        
+        # Get shopping cart (kept in the cache, not the session) and check every item at once
+        cart = list(CourseCart(student.student_id))
+        cart_items = validate_cart(student, cart)
+        cart_sections = [item.section for item in cart_items if item.can_enroll]
         
-        # Get shopping cart (stored in session)
-        cart = request.session.get('course_cart', [])
+        sections = list(sections)
+        
+        # Flag every section that clashes with the schedule or the cart
+        cart_masks = {section.section_id: section.meeting_mask for section in cart_sections}
+        cart_mask = combine_masks(cart_masks.values())
+        for section in sections:
+            if section.section_id in enrolled_sections:
+                section.has_conflict = False
+                continue
+            busy = enrolled_mask
+            if section.section_id in cart_masks:
+                busy |= combine_masks(
+                    mask for section_id, mask in cart_masks.items() if section_id != section.section_id
+                )
+            else:
+                busy |= cart_mask
+            section.has_conflict = bool(section.meeting_mask & busy)
         
         context = {
             'student': student,
             'sections': sections,
-            'enrolled_sections': list(enrolled_sections),
+            'enrolled_sections': enrolled_sections,
+            'waitlisted_sections': waitlisted_sections,
             'cart': cart,
+            'cart_items': cart_items,
         }
         return render(request, 'courses/registration.html', context)
     
     def post(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         action = request.POST.get('action')
         section_id = request.POST.get('section_id')
         
-        print(f"DEBUG: Action = {action}")
-        print(f"DEBUG: Section ID = {section_id}")
-        print(f"DEBUG: Cart = {request.session.get('course_cart', [])}")
+        cart = CourseCart(student.student_id)
         
         if action == 'add_to_cart':
-            cart = request.session.get('course_cart', [])
-            if section_id not in cart:
-                cart.append(section_id)
-                request.session['course_cart'] = cart
-                messages.success(request, 'Course added to cart.')
+            try:
+                if cart.add(section_id):
+                    messages.success(request, 'Course added to cart.')
+            except CartError as exc:
+                messages.error(request, str(exc))
         
         elif action == 'remove_from_cart':
-            cart = request.session.get('course_cart', [])
-            if section_id in cart:
-                cart.remove(section_id)
-                request.session['course_cart'] = cart
+            if cart.remove(section_id):
                 messages.success(request, 'Course removed from cart.')
         
         elif action == 'enroll':
-            print("DEBUG: Entering enroll block")
-            cart = request.session.get('course_cart', [])
-            print(f"DEBUG: Processing {len(cart)} courses from cart")
-            
-            for sec_id in cart:
-                print(f"DEBUG: Processing section {sec_id}")
-                section = get_object_or_404(CourseSection, section_id=sec_id)
-                
-                # Check if already enrolled
-                if Enrollment.objects.filter(student=student, course_section=section).exists():
-                    print(f"DEBUG: Already enrolled in {section.course.title}")
-                    messages.warning(request, f'Already enrolled in {section.course.title}')
-                    continue
-                
-                # Check capacity
-                if section.is_full():
-                    print(f"DEBUG: {section.course.title} is full")
-                    messages.error(request, f'{section.course.title} is full.')
+            results = services.enroll_cart(student, list(cart))
+            for result in results:
+                if result.status == services.NOT_FOUND:
+                    messages.error(request, f'Section {result.section_id} is no longer offered.')
                     continue
                 
-                # Create enrollment
-                enrollment = Enrollment.objects.create(
-                    student=student,
-                    course_section=section,
-                    semester=section.semester,
-                    status='Enrolled'
-                )
-                print(f"DEBUG: Created enrollment: {enrollment}")
-                
-                # Update enrolled count
-                section.enrolled_count += 1
-                section.save()
-                print(f"DEBUG: Updated seat count for {section.course.title}")
-                
-                messages.success(request, f'Successfully enrolled in {section.course.title}')
+                title = result.section.course.title
+                if result.status == services.ENROLLED:
+                    messages.success(request, f'Successfully enrolled in {title}')
+                elif result.status == services.WAITLISTED:
+                    messages.info(request, f'{title} is full. You are #{result.waitlist_position} on the waitlist.')
+                elif result.status == services.ALREADY_ENROLLED:
+                    messages.warning(request, f'Already enrolled in {title}')
+                elif result.status == services.ALREADY_WAITLISTED:
+                    messages.warning(request, f'Already on the waitlist for {title}')
+                elif result.status == services.PREREQUISITES:
+                    messages.error(request, f'You have not completed the prerequisites for {title}.')
+                elif result.status == services.CONFLICT:
+                    messages.error(request, f'{title} conflicts with your schedule.')
+                elif result.status == services.CLOSED:
+                    messages.error(request, f'Registration is closed for {title}.')
+                elif result.status == services.FULL:
+                    messages.error(request, f'{title} is full.')
+                elif result.status == services.RETRY:
+                    messages.warning(request, f'Seats in {title} changed while you registered. Please try again.')
             
-            # Clear cart
-            request.session['course_cart'] = []
-            print("DEBUG: Cart cleared")
+            # Clear cart, keeping the sections to try again
+            if any(result.status == services.RETRY for result in results):
+                for result in results:
+                    if result.status != services.RETRY:
+                        cart.remove(result.section_id)
+            else:
+                cart.clear()
+        
+        elif action == 'drop':
+            dropped, promoted = services.drop_enrollment(student, section_id)
+            if dropped is None:
+                messages.error(request, 'You are not registered for that section.')
+            else:
+                messages.success(request, f'Dropped {dropped.course_section.course.title}.')
+            if request.POST.get('next') == 'schedule':
+                return redirect('course_schedule')
         
         return redirect('course_registration')
 
 
-class CourseScheduleView(View):
-    """View student's current schedule"""
+class SectionAvailabilityView(View):
+    """JSON seat counts for the registration page, refreshed with conditional GETs"""
+    
+    semester = 'Spring 2026'  # Current registration period
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
+        if not request.session.get('student_id'):
+            return JsonResponse({'error': 'Please log in to continue.'}, status=401)
         
-        student = get_object_or_404(Student, student_id=student_id)
+        etag = availability.seat_etag(self.semester)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(availability.availability_snapshot(self.semester), content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class FreeRoomsView(View):
+    """JSON list of rooms with nothing scheduled at a given weekly time"""
+    
+    def get(self, request):
+        semester = request.GET.get('semester', 'Spring 2026')
+        building = request.GET.get('building', '')
+        days = request.GET.get('days', '').upper()
+        try:
+            start_time = datetime.strptime(request.GET.get('start', ''), '%H:%M').time()
+            end_time = datetime.strptime(request.GET.get('end', ''), '%H:%M').time()
+        except ValueError:
+            return JsonResponse({'error': 'start and end must be given as HH:MM.'}, status=400)
+        if not days or end_time <= start_time:
+            return JsonResponse({'error': 'Give meeting days and an end time after the start time.'}, status=400)
+        
+        occupancy = get_occupancy()
+        buildings = [building] if building else sorted(occupancy.buildings)
+        return JsonResponse({
+            'semester': semester,
+            'days': days,
+            'start': start_time.strftime('%H:%M'),
+            'end': end_time.strftime('%H:%M'),
+            'free_rooms': {
+                name: occupancy.free_rooms(semester, name, days, start_time, end_time)
+                for name in buildings
+            },
+        })
+
+
+class SeatEventsView(View):
+    """Server-sent stream of seat-count changes for the registration page"""
+    
+    semester = 'Spring 2026'  # Current registration period
+    heartbeat_interval = 15
+    
+    async def get(self, request):
+        if not await request.session.aget('student_id'):
+            return JsonResponse({'error': 'Please log in to continue.'}, status=401)
+        
+        if not isinstance(request, ASGIRequest):
+            # A WSGI worker can't hold the stream open. EventSource never
+            # reconnects after a 204, so the page falls back to ETag polling
+            return HttpResponse(status=204)
+        
+        response = StreamingHttpResponse(self.stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    async def stream(self):
+        # Subscribe before reading the snapshot so no change in between is lost
+        subscription = events.get_broker().subscribe()
+        try:
+            snapshot = await sync_to_async(availability.availability_snapshot)(self.semester)
+            yield f'retry: 5000\nevent: snapshot\ndata: {snapshot}\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: seats\ndata: {json.dumps(event)}\n\n'
+        finally:
+            subscription.close()
+
+
+class CourseScheduleView(StudentRequiredMixin, View):
+    """View student's current schedule"""
+    
+    def get(self, request):
+        student = request.student
         
         # Get current enrollments
         enrollments = Enrollment.objects.filter(
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.students.pagination import EstimatedCountPaginator
 from .models import FinancialAccount, FinancialAidPackage, Scholarship, Payment
 
 
@@ -8,6 +9,10 @@ class FinancialAccountAdmin(admin.ModelAdmin):
     list_filter = ['account_status', 'on_payment_plan']
     search_fields = ['student__first_name', 'student__last_name', 'student__student_id']
     readonly_fields = ['total_charged', 'account_balance', 'updated_at']
+    list_select_related = ['student']
+    raw_id_fields = ['student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Student', {
@@ -34,6 +39,10 @@ class FinancialAidPackageAdmin(admin.ModelAdmin):
     list_filter = ['academic_year', 'status']
     search_fields = ['student__first_name', 'student__last_name', 'student__student_id']
     readonly_fields = ['total_aid']
+    list_select_related = ['student']
+    raw_id_fields = ['student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Student Information', {
@@ -78,6 +87,10 @@ class PaymentAdmin(admin.ModelAdmin):
     list_filter = ['payment_method', 'payment_date']
     search_fields = ['financial_account__student__first_name', 'financial_account__student__last_name', 'reference_number']
     readonly_fields = ['payment_date']
+    list_select_related = ['financial_account__student']
+    raw_id_fields = ['financial_account']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Payment Information', {
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial_aid', '0001_initial'),
+        ('students', '0004_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='financialaccount',
+            index=models.Index(fields=['account_status'], name='financial_account_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='financialaidpackage',
+            index=models.Index(fields=['academic_year', 'status'], name='aid_package_year_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date'], name='payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_method'], name='payment_method_idx'),
+        ),
+    ]
@@ -34,6 +34,9 @@ class FinancialAccount(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
+        indexes = [
+            models.Index(fields=['account_status'], name='financial_account_status_idx'),
+        ]
         verbose_name = 'Financial Account'
         verbose_name_plural = 'Financial Accounts'
     
@@ -78,6 +81,9 @@ class FinancialAidPackage(models.Model):
     
     class Meta:
         ordering = ['-academic_year']
+        indexes = [
+            models.Index(fields=['academic_year', 'status'], name='aid_package_year_status_idx'),
+        ]
         verbose_name = 'Financial Aid Package'
         verbose_name_plural = 'Financial Aid Packages'
     
@@ -147,6 +153,10 @@ class Payment(models.Model):
     
     class Meta:
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['payment_date'], name='payment_date_idx'),
+            models.Index(fields=['payment_method'], name='payment_method_idx'),
+        ]
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
     
@@ -1,20 +1,14 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, get_object_or_404
 from django.views import View
-from django.contrib import messages
 from .models import FinancialAccount, FinancialAidPackage, Scholarship, Payment
-from apps.students.models import Student
+from apps.students.middleware import StudentRequiredMixin
 
 
-class FinancialDashboardView(View):
+class FinancialDashboardView(StudentRequiredMixin, View):
     """Main financial aid dashboard"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get or create financial account
         financial_account, created = FinancialAccount.objects.get_or_create(student=student)
@@ -42,16 +36,11 @@ class FinancialDashboardView(View):
         return render(request, 'financial/dashboard.html', context)
 
 
-class FinancialAidPackageView(View):
+class FinancialAidPackageView(StudentRequiredMixin, View):
     """View detailed financial aid packages"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get all aid packages
         aid_packages = FinancialAidPackage.objects.filter(student=student).order_by('-academic_year')
@@ -63,16 +52,11 @@ class FinancialAidPackageView(View):
         return render(request, 'financial/aid_packages.html', context)
 
 
-class ScholarshipListView(View):
+class ScholarshipListView(StudentRequiredMixin, View):
     """Browse available scholarships"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get scholarships student is eligible for
         eligible_scholarships = Scholarship.objects.filter(
@@ -91,16 +75,11 @@ class ScholarshipListView(View):
         return render(request, 'financial/scholarships.html', context)
 
 
-class PaymentHistoryView(View):
+class PaymentHistoryView(StudentRequiredMixin, View):
     """View payment history"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get financial account
         financial_account = get_object_or_404(FinancialAccount, student=student)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Enrollment, Assignment, Transcript
+from apps.students.pagination import EstimatedCountPaginator
+from .models import Enrollment, Assignment, Transcript, TranscriptTerm, GradeDistribution
+from .distributions import COLUMNS
 
 
 @admin.register(Enrollment)
@@ -8,6 +10,12 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_filter = ['semester', 'status', 'grade']
     search_fields = ['student__first_name', 'student__last_name', 'course_section__course__course_code', 'course_section__course__title']
     readonly_fields = ['enrollment_date', 'updated_at']
+    list_select_related = ['student', 'course_section__course']
+    raw_id_fields = ['student', 'course_section']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # The model's default ordering joins through to the course; newest first needs no join
+    ordering = ['-id']
     
     fieldsets = (
         ('Enrollment Information', {
@@ -29,6 +37,10 @@ class AssignmentAdmin(admin.ModelAdmin):
     list_filter = ['assignment_type', 'due_date']
     search_fields = ['title', 'enrollment__student__first_name', 'enrollment__student__last_name', 'enrollment__course_section__course__course_code']
     readonly_fields = ['submitted_date', 'graded_date']
+    list_select_related = ['enrollment__student', 'enrollment__course_section__course']
+    raw_id_fields = ['enrollment']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Assignment Information', {
@@ -48,6 +60,10 @@ class TranscriptAdmin(admin.ModelAdmin):
     list_display = ['student', 'cumulative_gpa', 'total_credits_earned', 'total_credits_attempted', 'generated_date']
     search_fields = ['student__first_name', 'student__last_name', 'student__student_id']
     readonly_fields = ['cumulative_gpa', 'total_credits_earned', 'total_credits_attempted', 'generated_date']
+    list_select_related = ['student']
+    raw_id_fields = ['student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Student', {
@@ -62,4 +78,40 @@ class TranscriptAdmin(admin.ModelAdmin):
         ('Generated', {
             'fields': ('generated_date',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(TranscriptTerm)
+class TranscriptTermAdmin(admin.ModelAdmin):
+    """Read-only view of the per-term transcript rows, which are rebuilt as grades post"""
+    list_display = ['student', 'semester', 'credits_attempted', 'credits_earned', 'term_gpa', 'cumulative_gpa']
+    list_filter = ['semester']
+    search_fields = ['student__student_id', 'student__last_name']
+    list_select_related = ['student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(GradeDistribution)
+class GradeDistributionAdmin(admin.ModelAdmin):
+    """Read-only grade distributions, rebuilt by the refresh_grade_distributions command"""
+    list_display = ['key', 'scope', 'semester', 'graded', 'mean_points', 'median_points', 'histogram', 'refreshed_at']
+    list_filter = ['scope', 'semester']
+    search_fields = ['key']
+    readonly_fields = ['histogram']
+    
+    @admin.display(description='Histogram')
+    def histogram(self, obj):
+        return '  '.join(f'{grade}: {obj.counts[grade]}' for grade in reversed(COLUMNS) if grade in obj.counts)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class GradesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.grades'
-    verbose_name = 'Grade Management'
\ No newline at end of file
+    verbose_name = 'Grade Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,229 @@
+"""
+Grade-distribution analytics.
+
+Grades are streamed out of Enrollment as (section, grade) pairs and
+counted into one histogram per section. Courses, professors and
+departments, each per semester and over all semesters, are rolled up by
+adding the histograms of their sections, so enrollments are only ever
+read once per section. Means and percentiles are taken over grade
+points. Grades are discrete, so the percentiles come straight from the
+cumulative histogram: the lowest grade that at least that share of
+students is at or below.
+
+The results live in GradeDistribution. A refresh recomputes only the
+sections with enrollments updated since the previous run, plus the
+rollups those sections belong to. Deleted enrollments leave no trace
+there, so run a full refresh after deleting graded enrollments; it also
+drops summaries of sections that no longer exist.
+
+NumPy builds the histograms and statistics for all sections at once when
+it is installed; otherwise the same numbers are computed in plain Python.
+"""
+from array import array
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.courses.models import CourseSection
+from .models import GRADE_POINTS, Enrollment, GradeDistribution
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Histogram columns: grades with grade points from lowest to highest, then P, I and W
+POINT_GRADES = sorted(GRADE_POINTS, key=GRADE_POINTS.get)
+COLUMNS = POINT_GRADES + [
+    grade for grade, _ in Enrollment._meta.get_field('grade').choices if grade not in GRADE_POINTS
+]
+COLUMN_INDEX = {grade: index for index, grade in enumerate(COLUMNS)}
+PERCENTILES = (25, 50, 75)
+
+STATISTIC_FIELDS = ['counts', 'total', 'graded', 'mean_points', 'p25_points', 'median_points', 'p75_points', 'refreshed_at']
+
+
+def histograms(pairs):
+    """``(keys, matrix)``: one row of grade counts per distinct key of ``(key, grade)`` pairs"""
+    keys = {}
+    if np is None:
+        rows = []
+        for key, grade in pairs:
+            index = keys.get(key)
+            if index is None:
+                index = keys[key] = len(rows)
+                rows.append([0] * len(COLUMNS))
+            rows[index][COLUMN_INDEX[grade]] += 1
+        return list(keys), rows
+
+    cells = array('q')
+    for key, grade in pairs:
+        index = keys.get(key)
+        if index is None:
+            index = keys[key] = len(keys)
+        cells.append(index * len(COLUMNS) + COLUMN_INDEX[grade])
+    counts = np.bincount(np.frombuffer(cells, dtype=np.int64), minlength=len(keys) * len(COLUMNS))
+    return list(keys), counts.reshape(len(keys), len(COLUMNS))
+
+
+def statistics(matrix):
+    """``(graded, mean, p25, median, p75)`` of each histogram row, over grade points"""
+    points = [GRADE_POINTS[grade] for grade in POINT_GRADES]
+    if np is None:
+        results = []
+        for row in matrix:
+            graded_counts = row[:len(POINT_GRADES)]
+            graded = sum(graded_counts)
+            if not graded:
+                results.append((0, None, None, None, None))
+                continue
+            mean = sum(count * value for count, value in zip(graded_counts, points)) / graded
+            cumulative = []
+            running = 0
+            for count in graded_counts:
+                running += count
+                cumulative.append(running)
+            percentiles = [
+                points[next(index for index, seen in enumerate(cumulative) if seen * 100 >= q * graded)]
+                for q in PERCENTILES
+            ]
+            results.append((graded, mean, *percentiles))
+        return results
+
+    matrix = np.asarray(matrix).reshape(-1, len(COLUMNS))
+    graded_counts = matrix[:, :len(POINT_GRADES)]
+    graded = graded_counts.sum(axis=1)
+    points = np.array(points)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = graded_counts @ points / graded
+    cumulative = graded_counts.cumsum(axis=1)
+    percentiles = [points[(cumulative * 100 >= q * graded[:, None]).argmax(axis=1)] for q in PERCENTILES]
+    return [
+        (int(graded[row]), *(float(values[row]) for values in [means, *percentiles])) if graded[row]
+        else (0, None, None, None, None)
+        for row in range(len(graded))
+    ]
+
+
+def as_points(value):
+    return None if value is None else Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def distribution_rows(scope, keys, matrix, refreshed_at):
+    """Unsaved GradeDistribution rows for ``(key, semester)`` keys and their histograms"""
+    rows = []
+    for (key, semester), counts, (graded, mean, p25, median, p75) in zip(keys, matrix, statistics(matrix)):
+        counts = [int(count) for count in counts]
+        rows.append(GradeDistribution(
+            scope=scope, key=key, semester=semester,
+            counts={grade: count for grade, count in zip(COLUMNS, counts) if count},
+            total=sum(counts), graded=graded,
+            mean_points=as_points(mean), p25_points=as_points(p25),
+            median_points=as_points(median), p75_points=as_points(p75),
+            refreshed_at=refreshed_at,
+        ))
+    return rows
+
+
+def rollup_keys(section):
+    """``(scope, key, semester)`` of every rollup a section's grades count toward"""
+    section_id, semester, course_id, professor_id, department_id = section
+    keys = []
+    for scope, key in [('course', course_id), ('professor', professor_id), ('department', department_id)]:
+        if key is not None:
+            keys += [(scope, key, semester), (scope, key, '')]
+    return keys
+
+
+def refresh_distributions(full=False):
+    """
+    Recompute the distributions of sections whose enrollments changed since
+    the last refresh, or of every section, and of the rollups containing
+    them. Returns how many sections were recomputed.
+    """
+    started = timezone.now()
+    since = None if full else GradeDistribution.objects.aggregate(last=Max('refreshed_at'))['last']
+    sections = {
+        row[0]: row for row in CourseSection.objects.order_by().values_list(
+            'section_id', 'semester', 'course_id', 'professor_id', 'course__department_id',
+        )
+    }
+
+    graded = Enrollment.objects.filter(grade__in=COLUMNS).order_by()
+    if since is None:
+        changed = set(sections)
+    else:
+        changed = set(
+            Enrollment.objects.filter(updated_at__gte=since).order_by()
+            .values_list('course_section_id', flat=True).distinct()
+        )
+        if not changed:
+            return 0
+        graded = graded.filter(course_section_id__in=changed)
+
+    keys, matrix = histograms(graded.values_list('course_section_id', 'grade').iterator(chunk_size=10000))
+    section_rows = distribution_rows('section', [(key, sections[key][1]) for key in keys], matrix, started)
+
+    # Every section of an affected rollup is needed to re-add it, not only the changed ones
+    affected = {rollup for section_id in changed if section_id in sections for rollup in rollup_keys(sections[section_id])}
+    members = {}
+    for section in sections.values():
+        for rollup in rollup_keys(section):
+            if rollup in affected:
+                members.setdefault(rollup, []).append(section[0])
+
+    with transaction.atomic():
+        GradeDistribution.objects.filter(scope='section', key__in=changed - set(keys)).delete()
+        GradeDistribution.objects.bulk_create(
+            section_rows, batch_size=500, update_conflicts=True,
+            unique_fields=['scope', 'key', 'semester'], update_fields=STATISTIC_FIELDS,
+        )
+
+        member_rows = GradeDistribution.objects.filter(scope='section')
+        if since is not None:
+            member_rows = member_rows.filter(key__in={section_id for ids in members.values() for section_id in ids})
+        section_counts = dict(member_rows.values_list('key', 'counts'))
+        for scope in ['course', 'professor', 'department']:
+            rollups = [rollup for rollup in affected if rollup[0] == scope]
+            rollup_matrix = []
+            present = []
+            for rollup in rollups:
+                totals = [0] * len(COLUMNS)
+                for section_id in members[rollup]:
+                    for grade, count in section_counts.get(section_id, {}).items():
+                        totals[COLUMN_INDEX[grade]] += count
+                if any(totals):
+                    present.append(rollup)
+                    rollup_matrix.append(totals)
+            for _, key, semester in set(rollups) - set(present):
+                GradeDistribution.objects.filter(scope=scope, key=key, semester=semester).delete()
+            if present:
+                GradeDistribution.objects.bulk_create(
+                    distribution_rows(scope, [(key, semester) for _, key, semester in present], rollup_matrix, started),
+                    batch_size=500, update_conflicts=True,
+                    unique_fields=['scope', 'key', 'semester'], update_fields=STATISTIC_FIELDS,
+                )
+        if since is None:
+            # Sections, courses or professors that no longer exist
+            GradeDistribution.objects.filter(refreshed_at__lt=started).delete()
+    return len(changed)
+
+
+def distribution_data(distribution):
+    """JSON-ready summary of one GradeDistribution"""
+    return {
+        'scope': distribution.scope,
+        'key': distribution.key,
+        'semester': distribution.semester or None,
+        'counts': {grade: distribution.counts.get(grade, 0) for grade in COLUMNS},
+        'total': distribution.total,
+        'graded': distribution.graded,
+        'mean_points': distribution.mean_points,
+        'p25_points': distribution.p25_points,
+        'median_points': distribution.median_points,
+        'p75_points': distribution.p75_points,
+        'refreshed_at': distribution.refreshed_at,
+    }
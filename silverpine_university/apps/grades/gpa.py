@@ -0,0 +1,213 @@
+"""
+GPA bookkeeping.
+
+Each student stores running sums of quality points (grade points times
+credits) and graded credits, with the GPA derived from them. Whenever an
+Enrollment's grade, status or student changes, only the difference is
+applied, through one UPDATE with F() expressions, so reading a GPA never
+requires scanning enrollments. reconcile() recomputes the sums from
+scratch to repair any drift, e.g. after raw SQL or queryset updates that
+bypass the signals. That recount is a single aggregate query grouped by
+student, which maps letter grades to points with CASE/WHEN, followed by
+chunked bulk updates.
+
+GPAs are rounded half up to hundredths, in exact arithmetic, both in the
+UPDATE and in Python, so a recount never disagrees with a running GPA
+over rounding alone.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, FloatField, IntegerField, Sum, Value, When
+from django.db.models.functions import Cast, Round
+
+from apps.students.context import invalidate_students
+from apps.students.models import Student
+from .models import GPA_STATUSES, GRADE_POINTS, Enrollment
+
+
+GOOD_STANDING = 'Good Standing'
+PROBATION = 'Academic Probation'
+PROBATION_BELOW = Decimal('2.00')
+
+# Honors by cumulative GPA, best first, once a student has enough graded credits
+HONORS = [(Decimal('3.90'), "President's List"), (Decimal('3.50'), "Dean's List")]
+HONORS_MIN_CREDITS = 12
+
+# Students per UPDATE when saving recomputed sums; bulk_update's CASE per row
+# and field keeps statements small only in modest batches
+SAVE_BATCH_SIZE = 50
+
+
+def contribution(status, grade, credits):
+    """(quality points, graded credits) an enrollment adds to its student's GPA"""
+    if status not in GPA_STATUSES or grade not in GRADE_POINTS:
+        return Decimal('0'), 0
+    return Decimal(str(GRADE_POINTS[grade])) * credits, credits
+
+
+def gpa_from(quality_points, graded_credits):
+    if not graded_credits:
+        return Decimal('0.00')
+    return (Decimal(quality_points) / graded_credits).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def gpa_expression(quality_points, graded_credits):
+    """
+    SQL for gpa_from(): quality points always have two decimal places, so in
+    hundredths the half-up rounding is the integer division
+    (2 * points + credits) // (2 * credits)
+    """
+    hundredths = Cast(Round(quality_points * 100), IntegerField())
+    return ExpressionWrapper(
+        (hundredths * 2 + graded_credits) / (graded_credits * 2) / Value(100.0),
+        output_field=FloatField(),
+    )
+
+
+def apply_delta(student_id, quality_points, graded_credits):
+    """Add to a student's running sums and refresh their GPA in the same UPDATE"""
+    if not quality_points and not graded_credits:
+        return
+    new_points = F('quality_points') + quality_points
+    new_credits = F('graded_credits') + graded_credits
+    Student.objects.filter(pk=student_id).update(
+        quality_points=new_points,
+        graded_credits=new_credits,
+        # Right-hand sides see the old row, so the GPA is computed from the new sums explicitly
+        gpa=Case(
+            When(graded_credits=-graded_credits, then=Value(Decimal('0.00'))),
+            default=gpa_expression(new_points, new_credits),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+    )
+    invalidate_students([student_id])
+
+
+def section_credits(enrollment):
+    if 'course_section' in enrollment._state.fields_cache:
+        return enrollment.course_section.course.credits
+    return (
+        Enrollment.objects.filter(pk=enrollment.pk)
+        .values_list('course_section__course__credits', flat=True)
+        .get()
+    )
+
+
+def enrollment_saved(enrollment, created):
+    """Apply the GPA change of one saved enrollment"""
+    old_state = None if created else getattr(enrollment, '_loaded_gpa_state', None)
+    new_state = enrollment.gpa_state()
+    enrollment._loaded_gpa_state = new_state
+
+    if not created and old_state is None:
+        # Nothing known about the previous values; recount this student
+        reconcile([enrollment.student_id])
+        return
+    if old_state == new_state:
+        return
+
+    old_student, old_status, old_grade = old_state or (enrollment.student_id, None, None)
+    new_student, new_status, new_grade = new_state
+    old_counts = old_status in GPA_STATUSES and old_grade in GRADE_POINTS
+    new_counts = new_status in GPA_STATUSES and new_grade in GRADE_POINTS
+    if not old_counts and not new_counts:
+        return
+
+    credits = section_credits(enrollment)
+    old_points, old_credits = contribution(old_status, old_grade, credits)
+    new_points, new_credits = contribution(new_status, new_grade, credits)
+    if old_student == new_student:
+        apply_delta(new_student, new_points - old_points, new_credits - old_credits)
+    else:
+        apply_delta(old_student, -old_points, -old_credits)
+        apply_delta(new_student, new_points, new_credits)
+
+
+def enrollment_deleted(enrollment):
+    """Take a deleted enrollment's grade back out of its student's GPA"""
+    student_id, status, grade = getattr(enrollment, '_loaded_gpa_state', None) or enrollment.gpa_state()
+    if status in GPA_STATUSES and grade in GRADE_POINTS:
+        points, credits = contribution(status, grade, enrollment.course_section.course.credits)
+        apply_delta(student_id, -points, -credits)
+
+
+def grade_points():
+    """SQL expression mapping an enrollment's letter grade to its grade points"""
+    return Case(
+        *[When(grade=grade, then=Value(Decimal(str(points)))) for grade, points in GRADE_POINTS.items()],
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def gpa_totals(student_ids=None):
+    """
+    ``{student_id: (quality points, graded credits)}`` for every student with
+    a graded enrollment, from one aggregate query grouped by student
+    """
+    credits = F('course_section__course__credits')
+    rows = Enrollment.objects.filter(status__in=GPA_STATUSES, grade__in=list(GRADE_POINTS))
+    if student_ids is not None:
+        rows = rows.filter(student_id__in=student_ids)
+    rows = rows.order_by().values('student_id').annotate(
+        points=Sum(grade_points() * credits, output_field=DecimalField(max_digits=7, decimal_places=2)),
+        credits=Sum(credits),
+    ).values_list('student_id', 'points', 'credits')
+    return {
+        student_id: (Decimal(points).quantize(Decimal('0.01')), credits)
+        for student_id, points, credits in rows.iterator(chunk_size=5000)
+    }
+
+
+def recompute_student(student_id):
+    """(quality points, graded credits) of one student, counted from their enrollments"""
+    return gpa_totals([student_id]).get(student_id, (Decimal('0'), 0))
+
+
+def academic_standing(gpa, graded_credits):
+    """Standing earned by a cumulative GPA"""
+    if not graded_credits:
+        return GOOD_STANDING
+    if graded_credits >= HONORS_MIN_CREDITS:
+        for minimum, standing in HONORS:
+            if gpa >= minimum:
+                return standing
+    return GOOD_STANDING if gpa >= PROBATION_BELOW else PROBATION
+
+
+def reconcile(student_ids=None, chunk_size=1000, standing=False):
+    """
+    Recompute running sums and GPA from enrollments, for the given students
+    or everyone, and save the ones that drifted. With ``standing`` academic
+    standing is reassigned as well. Returns how many students changed.
+    """
+    totals = gpa_totals(student_ids)
+
+    students = Student.objects.order_by('pk')
+    if student_ids is not None:
+        students = students.filter(pk__in=student_ids)
+    fields = ['quality_points', 'graded_credits', 'gpa'] + (['academic_standing'] if standing else [])
+
+    changed = []
+    fixed = 0
+    for student in students.only('student_id', *fields).iterator(chunk_size=chunk_size):
+        quality_points, graded_credits = totals.get(student.student_id, (Decimal('0'), 0))
+        values = [quality_points, graded_credits, gpa_from(quality_points, graded_credits)]
+        if standing:
+            values.append(academic_standing(values[2], graded_credits))
+        if [getattr(student, name) for name in fields] != values:
+            for name, value in zip(fields, values):
+                setattr(student, name, value)
+            changed.append(student)
+        if len(changed) >= chunk_size:
+            fixed += save_sums(changed, fields)
+            changed = []
+    if changed:
+        fixed += save_sums(changed, fields)
+    return fixed
+
+
+def save_sums(students, fields, batch_size=SAVE_BATCH_SIZE):
+    """Write the given fields of a chunk of students"""
+    Student.objects.bulk_update(students, fields, batch_size=batch_size)
+    invalidate_students([student.pk for student in students])
+    return len(students)
@@ -0,0 +1,160 @@
+"""
+Running course grades from assignment scores.
+
+Within a course, assignments are grouped by type into categories. A
+category's average is its points earned over points possible among the
+graded assignments. The current percentage weighs each category by the
+summed weight of its graded assignments; the projected final percentage
+weighs it by the weight of all its assignments, assuming the remaining
+work is scored at the category's current average, or at the course's
+current percentage where a category has no grades yet.
+
+grade_enrollment() gets all of that from one pass over an enrollment's
+assignments, accumulating plain sums per category, so the same arithmetic
+works over columns when a whole section is graded at once. Results are
+cached per enrollment in each process under a version, kept in the
+shared cache, that every Assignment save or delete bumps (see
+signals.py). Grading in the admin therefore reaches every web worker,
+and a page rendered from stale assignments can never overwrite a newer
+grade. Without a shared cache a worker may show an old grade for up to
+COURSE_GRADE_CACHE_TIMEOUT.
+"""
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from apps.courses.versioning import bump_version, get_versions
+
+
+# Lowest percentage earning each letter, best first
+LETTER_SCALE = [
+    (Decimal('93'), 'A'), (Decimal('90'), 'A-'),
+    (Decimal('87'), 'B+'), (Decimal('83'), 'B'), (Decimal('80'), 'B-'),
+    (Decimal('77'), 'C+'), (Decimal('73'), 'C'), (Decimal('70'), 'C-'),
+    (Decimal('67'), 'D+'), (Decimal('60'), 'D'),
+    (Decimal('0'), 'F'),
+]
+
+HUNDREDTH = Decimal('0.01')
+
+
+@dataclass
+class CategoryGrade:
+    """Totals of one assignment type within a course"""
+
+    name: str
+    weight: Decimal = Decimal('0')
+    graded_weight: Decimal = Decimal('0')
+    points_earned: Decimal = Decimal('0')
+    points_possible: Decimal = Decimal('0')
+    assignments: int = 0
+    graded: int = 0
+
+    @property
+    def average(self):
+        """Percentage earned on graded work, or None before anything is graded"""
+        if not self.graded or not self.points_possible:
+            return None
+        return (self.points_earned / self.points_possible * 100).quantize(HUNDREDTH)
+
+
+@dataclass
+class CourseGrade:
+    """Running grade of one enrollment"""
+
+    categories: list = field(default_factory=list)
+    current_percentage: Decimal = None
+    projected_percentage: Decimal = None
+    letter_grade: str = None
+    graded: int = 0
+    assignments: int = 0
+
+
+def letter_for(percentage):
+    """Letter grade earned by a percentage"""
+    if percentage is None:
+        return None
+    for minimum, letter in LETTER_SCALE:
+        if percentage >= minimum:
+            return letter
+    return LETTER_SCALE[-1][1]
+
+
+def grade_enrollment(assignments):
+    """CourseGrade of one enrollment's assignments"""
+    categories = {}
+    for assignment in assignments:
+        category = categories.get(assignment.assignment_type)
+        if category is None:
+            category = categories[assignment.assignment_type] = CategoryGrade(assignment.assignment_type)
+        category.weight += assignment.weight
+        category.assignments += 1
+        if assignment.points_earned is not None and assignment.points_possible > 0:
+            category.graded_weight += assignment.weight
+            category.points_earned += assignment.points_earned
+            category.points_possible += assignment.points_possible
+            category.graded += 1
+
+    result = CourseGrade(
+        categories=sorted(categories.values(), key=lambda category: category.name),
+        graded=sum(category.graded for category in categories.values()),
+        assignments=sum(category.assignments for category in categories.values()),
+    )
+
+    weighted = [(category.graded_weight, category.average) for category in result.categories if category.average is not None]
+    graded_weight = sum(weight for weight, _ in weighted)
+    if not graded_weight:
+        return result
+    current = sum(weight * average for weight, average in weighted) / graded_weight
+    result.current_percentage = current.quantize(HUNDREDTH)
+
+    total_weight = sum(category.weight for category in result.categories)
+    projected = sum(
+        category.weight * (current if category.average is None else category.average)
+        for category in result.categories
+    ) / total_weight
+    result.projected_percentage = projected.quantize(HUNDREDTH)
+    result.letter_grade = letter_for(result.projected_percentage)
+    return result
+
+
+def version_key(enrollment_id):
+    return f'grading:{enrollment_id}:version'
+
+
+def invalidate_enrollments(enrollment_ids):
+    """Drop the cached grades of these enrollments"""
+    for enrollment_id in enrollment_ids:
+        bump_version(version_key(enrollment_id))
+
+
+def course_grades(enrollments):
+    """
+    ``{enrollment_id: CourseGrade}`` for the given enrollments, from the cache
+    where possible. Their assignments are prefetched here, in one query, after
+    the cached versions have been read; a grade computed from assignments that
+    change meanwhile is then stored under a version nobody asks for again.
+    """
+    enrollments = list(enrollments)
+    versions = get_versions([version_key(enrollment.pk) for enrollment in enrollments])
+    keys = {
+        enrollment.pk: f'grading:{enrollment.pk}:{versions[version_key(enrollment.pk)]}'
+        for enrollment in enrollments
+    }
+    cached = cache.get_many(list(keys.values()))
+    prefetch_related_objects(enrollments, 'assignments')
+
+    grades = {}
+    missing = {}
+    for enrollment in enrollments:
+        key = keys[enrollment.pk]
+        if key in cached:
+            grades[enrollment.pk] = cached[key]
+        else:
+            grades[enrollment.pk] = missing[key] = grade_enrollment(enrollment.assignments.all())
+    if missing:
+        cache.set_many(missing, settings.COURSE_GRADE_CACHE_TIMEOUT)
+    return grades
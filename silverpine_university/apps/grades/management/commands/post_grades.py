@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.courses.models import CourseSection
+from apps.grades.posting import GradePoster, RowError, read_rows
+import time
+
+
+class Command(BaseCommand):
+    help = 'Post the grades of one section from a roster CSV with student_id and grade columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('section_id', help='Section the roster belongs to')
+        parser.add_argument('path', help='Roster CSV file')
+        parser.add_argument('--complete', action='store_true', help='Mark graded enrollments Completed (final grades)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the roster without writing')
+
+    def handle(self, *args, **options):
+        try:
+            section = CourseSection.objects.get(section_id=options['section_id'])
+        except CourseSection.DoesNotExist:
+            raise CommandError(f'Section {options["section_id"]} does not exist')
+
+        started = time.perf_counter()
+        poster = GradePoster(section, complete=options['complete'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                report = poster.run(read_rows(stream))
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["path"]}: {exc}')
+        except RowError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for line_number, message in report.errors:
+            self.stderr.write(f'line {line_number}: {message}')
+        if report.errors:
+            raise CommandError(f'Rejected {len(report.errors)} of {report.rows} rows; no grades were posted')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Would update" if options["dry_run"] else "Updated"} {report.updated} grade(s), '
+            f'{report.unchanged} unchanged, {report.skipped} without a grade ({elapsed:.2f}s)'
+        ))
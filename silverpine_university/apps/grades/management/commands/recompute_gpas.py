@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from apps.grades.gpa import reconcile
+from apps.students.models import Student
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recompute every student\'s GPA and academic standing from their enrollments (run at term end)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Students saved per batch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        changed = reconcile(chunk_size=options['chunk_size'], standing=True)
+        elapsed = time.perf_counter() - started
+
+        for row in Student.objects.values('academic_standing').annotate(students=Count('pk')).order_by('academic_standing'):
+            self.stdout.write(f'  {row["academic_standing"]:<20}{row["students"]}')
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} student(s) in {elapsed:.2f}s'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from apps.grades.gpa import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount every student\'s GPA sums from their enrollments and fix any that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('students', nargs='*', help='Student ids to check (default: everyone)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Students saved per batch')
+
+    def handle(self, *args, **options):
+        fixed = reconcile(options['students'] or None, chunk_size=options['chunk_size'])
+        if fixed:
+            self.stdout.write(self.style.WARNING(f'Corrected the GPA of {fixed} student(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Every GPA matches its enrollments'))
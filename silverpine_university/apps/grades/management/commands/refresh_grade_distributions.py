@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.grades.distributions import np, refresh_distributions
+import time
+
+
+class Command(BaseCommand):
+    help = 'Refresh grade distributions of sections whose grades changed since the last run, and their courses, professors and departments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every section instead of only changed ones')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        sections = refresh_distributions(full=options['full'])
+        elapsed = time.perf_counter() - started
+
+        engine = 'NumPy' if np is not None else 'pure Python'
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {sections} section(s) in {elapsed:.2f}s ({engine})'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_coursesection_waitlist_sequence'),
+        ('grades', '0001_initial'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='waitlist_position',
+            field=models.IntegerField(blank=True, help_text='Place in the section waitlist, lowest is promoted first', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course_section', 'status', 'waitlist_position'], name='enrollment_waitlist_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_convert_course_prerequisites'),
+        ('grades', '0002_enrollment_waitlist_position'),
+        ('students', '0004_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['due_date'], name='assignment_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['assignment_type'], name='assignment_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['semester', 'status'], name='enrollment_semester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['grade'], name='enrollment_grade_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def build_transcript_terms(apps, schema_editor):
+    from apps.grades.transcripts import TRANSCRIPT_STATUS, summarize_terms
+    Enrollment = apps.get_model('grades', 'Enrollment')
+    Student = apps.get_model('students', 'Student')
+    Transcript = apps.get_model('grades', 'Transcript')
+    TranscriptTerm = apps.get_model('grades', 'TranscriptTerm')
+
+    rows = Enrollment.objects.filter(status=TRANSCRIPT_STATUS, grade__isnull=False).order_by().values_list(
+        'student_id', 'semester', 'grade', 'course_section__course__credits',
+    )
+    summaries = summarize_terms(rows.iterator(chunk_size=5000))
+    TranscriptTerm.objects.bulk_create(
+        [TranscriptTerm(student_id=student_id, **term) for student_id, terms in summaries.items() for term in terms],
+        batch_size=1000,
+    )
+
+    # Every student gets a transcript, so the transcript page never has to create one
+    transcripts = []
+    for student_id in Student.objects.values_list('pk', flat=True).iterator(chunk_size=5000):
+        terms = summaries.get(student_id, [])
+        transcripts.append(Transcript(
+            student_id=student_id,
+            cumulative_gpa=terms[-1]['cumulative_gpa'] if terms else Decimal('0.00'),
+            total_credits_earned=terms[-1]['cumulative_credits_earned'] if terms else 0,
+            total_credits_attempted=sum(term['credits_attempted'] for term in terms),
+        ))
+    Transcript.objects.bulk_create(
+        transcripts,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=['cumulative_gpa', 'total_credits_earned', 'total_credits_attempted', 'generated_date'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0003_admin_filter_indexes'),
+        ('students', '0004_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(max_length=20)),
+                ('sequence', models.IntegerField(help_text='Chronological sort key derived from the semester name')),
+                ('credits_attempted', models.IntegerField(default=0)),
+                ('credits_earned', models.IntegerField(default=0)),
+                ('quality_points', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('graded_credits', models.IntegerField(default=0)),
+                ('term_gpa', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('cumulative_credits_earned', models.IntegerField(default=0)),
+                ('cumulative_gpa', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcript_terms', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Transcript Term',
+                'verbose_name_plural': 'Transcript Terms',
+                'ordering': ['student', 'sequence'],
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+        migrations.RunPython(build_transcript_terms, migrations.RunPython.noop),
+    ]
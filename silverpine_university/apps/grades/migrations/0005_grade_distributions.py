@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_convert_course_prerequisites'),
+        ('grades', '0004_transcript_terms'),
+        ('students', '0004_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('section', 'Section'), ('course', 'Course'), ('professor', 'Professor'), ('department', 'Department')], max_length=20)),
+                ('key', models.CharField(help_text='Section id, course code, professor id or department code', max_length=20)),
+                ('semester', models.CharField(blank=True, help_text='Blank for all semesters combined', max_length=20)),
+                ('counts', models.JSONField(default=dict, help_text='Students per letter grade')),
+                ('total', models.IntegerField(default=0)),
+                ('graded', models.IntegerField(default=0, help_text='Grades that carry grade points')),
+                ('mean_points', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('p25_points', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('median_points', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('p75_points', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Grade Distribution',
+                'verbose_name_plural': 'Grade Distributions',
+                'ordering': ['scope', 'key', 'semester'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['updated_at'], name='enrollment_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gradedistribution',
+            index=models.Index(fields=['refreshed_at'], name='distribution_refreshed_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='gradedistribution',
+            unique_together={('scope', 'key', 'semester')},
+        ),
+    ]
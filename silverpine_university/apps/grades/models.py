@@ -3,6 +3,19 @@ from apps.students.models import Student
 from apps.courses.models import CourseSection
 
 
+# Letter grades that count toward GPA and their grade points
+GRADE_POINTS = {
+    'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0,
+    'F': 0.0
+}
+
+# Enrollment statuses whose grades count toward GPA
+GPA_STATUSES = ('Enrolled', 'Completed')
+
+
 class Enrollment(models.Model):
     """Student enrollment in course sections"""
     
@@ -18,6 +31,7 @@ class Enrollment(models.Model):
         ('Completed', 'Completed'),
         ('Withdrawn', 'Withdrawn'),
     ], default='Enrolled')
+    waitlist_position = models.IntegerField(null=True, blank=True, help_text="Place in the section waitlist, lowest is promoted first")
     
     # Grade information
     grade = models.CharField(max_length=2, blank=True, null=True, choices=[
@@ -46,6 +60,12 @@ class Enrollment(models.Model):
     
     class Meta:
         unique_together = ['student', 'course_section']
+        indexes = [
+            models.Index(fields=['course_section', 'status', 'waitlist_position'], name='enrollment_waitlist_idx'),
+            models.Index(fields=['semester', 'status'], name='enrollment_semester_idx'),
+            models.Index(fields=['grade'], name='enrollment_grade_idx'),
+            models.Index(fields=['updated_at'], name='enrollment_updated_at_idx'),
+        ]
         ordering = ['-semester', 'course_section__course__course_code']
         verbose_name = 'Enrollment'
         verbose_name_plural = 'Enrollments'
@@ -53,16 +73,22 @@ class Enrollment(models.Model):
     def __str__(self):
         return f"{self.student.get_full_name()} - {self.course_section.course.course_code} ({self.semester})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so that saves can apply GPA changes as deltas
+        instance._loaded_gpa_state = instance.gpa_state()
+        return instance
+    
+    def gpa_state(self):
+        """(student_id, status, grade) as far as they are loaded, or None"""
+        if not {'student_id', 'status', 'grade'} <= self.__dict__.keys():
+            return None
+        return (self.student_id, self.status, self.grade)
+    
     def get_grade_points(self):
         """Convert letter grade to grade points"""
-        grade_points = {
-            'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        return grade_points.get(self.grade, 0.0)
+        return GRADE_POINTS.get(self.grade, 0.0)
 
 
 class Assignment(models.Model):
@@ -99,6 +125,10 @@ class Assignment(models.Model):
     
     class Meta:
         ordering = ['-due_date']
+        indexes = [
+            models.Index(fields=['due_date'], name='assignment_due_date_idx'),
+            models.Index(fields=['assignment_type'], name='assignment_type_idx'),
+        ]
         verbose_name = 'Assignment'
         verbose_name_plural = 'Assignments'
     
@@ -137,23 +167,74 @@ class Transcript(models.Model):
     
     def update_transcript(self):
         """Recalculate transcript data"""
-        self.cumulative_gpa = self.student.calculate_gpa()
-        
-        completed_enrollments = Enrollment.objects.filter(
-            student=self.student,
-            status='Completed',
-            grade__isnull=False
-        )
-        
-        self.total_credits_earned = sum([
-            e.course_section.course.credits 
-            for e in completed_enrollments 
-            if e.grade not in ['F', 'W', 'I']
-        ])
-        
-        self.total_credits_attempted = sum([
-            e.course_section.course.credits 
-            for e in completed_enrollments
-        ])
-        
-        self.save()
\ No newline at end of file
+        from .transcripts import refresh_transcripts
+        refresh_transcripts([self.student_id])
+        self.refresh_from_db()
+
+
+class TranscriptTerm(models.Model):
+    """One semester of a student's transcript, with cumulative totals up to and including it"""
+    
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='transcript_terms')
+    semester = models.CharField(max_length=20)
+    sequence = models.IntegerField(help_text="Chronological sort key derived from the semester name")
+    
+    # Term summary
+    credits_attempted = models.IntegerField(default=0)
+    credits_earned = models.IntegerField(default=0)
+    quality_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    graded_credits = models.IntegerField(default=0)
+    term_gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    
+    # Cumulative through this term
+    cumulative_credits_earned = models.IntegerField(default=0)
+    cumulative_gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    
+    class Meta:
+        unique_together = ['student', 'semester']
+        ordering = ['student', 'sequence']
+        verbose_name = 'Transcript Term'
+        verbose_name_plural = 'Transcript Terms'
+    
+    def __str__(self):
+        return f"{self.student_id} - {self.semester} ({self.term_gpa})"
+
+
+class GradeDistribution(models.Model):
+    """Grade histogram and statistics of a section, or of a course, professor or department per semester"""
+    
+    SCOPES = [
+        ('section', 'Section'),
+        ('course', 'Course'),
+        ('professor', 'Professor'),
+        ('department', 'Department'),
+    ]
+    
+    scope = models.CharField(max_length=20, choices=SCOPES)
+    key = models.CharField(max_length=20, help_text="Section id, course code, professor id or department code")
+    semester = models.CharField(max_length=20, blank=True, help_text="Blank for all semesters combined")
+    
+    # Histogram
+    counts = models.JSONField(default=dict, help_text="Students per letter grade")
+    total = models.IntegerField(default=0)
+    graded = models.IntegerField(default=0, help_text="Grades that carry grade points")
+    
+    # Statistics over grade points
+    mean_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    p25_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    median_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    p75_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['scope', 'key', 'semester']
+        indexes = [
+            models.Index(fields=['refreshed_at'], name='distribution_refreshed_idx'),
+        ]
+        ordering = ['scope', 'key', 'semester']
+        verbose_name = 'Grade Distribution'
+        verbose_name_plural = 'Grade Distributions'
+    
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.key} {self.semester or 'all semesters'}"
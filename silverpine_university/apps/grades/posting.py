@@ -0,0 +1,136 @@
+"""
+Bulk grade posting from a section roster CSV.
+
+A roster has a student_id and a grade column, one row per student. The
+section's enrollments are loaded once into a ``{student_id: enrollment}``
+map, every row is checked against it and against the grade choices, and
+only when the whole file is valid are the changed enrollments written
+with one bulk_update. bulk_update skips save(), and with it the
+per-enrollment GPA and transcript signals, so the students whose grades
+changed are then recounted together with gpa.reconcile() and
+transcripts.refresh_transcripts() inside the same transaction.
+"""
+import csv
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import gpa, transcripts
+from .models import Enrollment
+
+
+REQUIRED_FIELDS = ['student_id', 'grade']
+
+GRADES = {value for value, _ in Enrollment._meta.get_field('grade').choices}
+
+# Enrollments that can receive a grade
+GRADABLE_STATUSES = ('Enrolled', 'Completed')
+
+
+class RowError(ValueError):
+    """A row that cannot be posted"""
+
+
+def read_rows(stream):
+    """Yield ``(line_number, row dict)`` from a roster CSV stream"""
+    reader = csv.DictReader(stream)
+    missing = [name for name in REQUIRED_FIELDS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise RowError(f'missing columns: {", ".join(missing)}')
+    for row in reader:
+        yield reader.line_num, row
+
+
+@dataclass
+class PostingReport:
+    """What a roster changed, or would change, and the rows it rejected"""
+
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    student_ids: list = field(default_factory=list)
+
+    @property
+    def rows(self):
+        return self.updated + self.unchanged + self.skipped + len(self.errors)
+
+
+class GradePoster:
+    """Validates a section roster and posts its grades in one transaction"""
+
+    def __init__(self, section, complete=False, dry_run=False):
+        self.section = section
+        self.complete = complete
+        self.dry_run = dry_run
+        self.report = PostingReport()
+        self.enrollments = {
+            enrollment.student_id: enrollment
+            for enrollment in Enrollment.objects.filter(
+                course_section=section, status__in=GRADABLE_STATUSES,
+            ).only('student_id', 'status', 'grade', 'updated_at')
+        }
+
+    def run(self, rows):
+        changed = []
+        seen = set()
+        for line_number, row in rows:
+            try:
+                enrollment = self.build(row, seen)
+            except RowError as exc:
+                self.report.errors.append((line_number, str(exc)))
+                continue
+            if enrollment is None:
+                self.report.skipped += 1
+            elif enrollment is False:
+                self.report.unchanged += 1
+            else:
+                changed.append(enrollment)
+
+        if self.report.errors:
+            # A roster is posted whole or not at all
+            return self.report
+        self.report.updated = len(changed)
+        self.report.student_ids = [enrollment.student_id for enrollment in changed]
+        if changed and not self.dry_run:
+            self.write(changed)
+        return self.report
+
+    def build(self, row, seen):
+        """
+        The enrollment with the row's grade applied; False when it already has
+        that grade, None for a row without a grade. Raises RowError.
+        """
+        student_id = str(row.get('student_id') or '').strip().upper()
+        if not student_id:
+            raise RowError('missing student_id')
+        if student_id in seen:
+            raise RowError(f'student {student_id} appears more than once')
+        seen.add(student_id)
+        enrollment = self.enrollments.get(student_id)
+        if enrollment is None:
+            raise RowError(f'student {student_id} is not enrolled in {self.section.section_id}')
+
+        grade = str(row.get('grade') or '').strip().upper()
+        if not grade:
+            return None
+        if grade not in GRADES:
+            raise RowError(f'unknown grade {row.get("grade")!r}')
+        status = 'Completed' if self.complete else enrollment.status
+        if enrollment.grade == grade and enrollment.status == status:
+            return False
+        enrollment.grade = grade
+        enrollment.status = status
+        return enrollment
+
+    def write(self, enrollments):
+        # bulk_update bypasses auto_now; updated_at is what refreshes grade distributions
+        now = timezone.now()
+        for enrollment in enrollments:
+            enrollment.updated_at = now
+        student_ids = sorted(set(self.report.student_ids))
+        with transaction.atomic():
+            Enrollment.objects.bulk_update(enrollments, ['grade', 'status', 'updated_at'], batch_size=500)
+            gpa.reconcile(student_ids)
+            transcripts.refresh_transcripts(student_ids)
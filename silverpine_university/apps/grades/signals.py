@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Assignment, Enrollment
+from . import gpa, grading, transcripts
+
+
+@receiver(post_save, sender=Enrollment)
+def apply_enrollment_gpa(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else getattr(instance, '_loaded_gpa_state', None)
+    gpa.enrollment_saved(instance, created)
+    transcripts.refresh_transcripts(transcripts.changed_students(instance, old_state, created))
+
+
+@receiver(post_delete, sender=Enrollment)
+def remove_enrollment_gpa(sender, instance, **kwargs):
+    gpa.enrollment_deleted(instance)
+    if instance.status == transcripts.TRANSCRIPT_STATUS:
+        # After commit, so that a cascading student delete has finished first
+        student_id = instance.student_id
+        transaction.on_commit(lambda: transcripts.refresh_transcripts([student_id]))
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_course_grade(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    grading.invalidate_enrollments([instance.enrollment_id])
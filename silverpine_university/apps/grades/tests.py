@@ -0,0 +1,149 @@
+import io
+from datetime import date, time
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.courses.models import Course, CourseSection, Department, Professor
+from apps.students.models import Student
+from . import gpa
+from .models import Enrollment, Transcript
+from .posting import GradePoster, RowError, read_rows
+
+
+class GradesTestCase(TestCase):
+    """A one-credit and a three-credit section and two students"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(
+            code='CSCI', name='Computer Science', description='', building='Hall', phone='555', email='cs@example.com',
+        )
+        professor = Professor.objects.create(
+            professor_id='P1', first_name='Ada', last_name='Byron', title='Professor', department=department,
+            email='ada@example.com', office_location='Hall 1', office_hours='MWF',
+        )
+        cls.sections = []
+        for number, credits in enumerate([1, 3]):
+            course = Course.objects.create(
+                course_code=f'CSCI10{number}0', title=f'Course {number}', department=department, description='',
+                level='Undergraduate', credits=credits,
+            )
+            cls.sections.append(CourseSection.objects.create(
+                section_id=f'CSCI10{number}0-A', course=course, professor=professor, semester='Spring 2026',
+                days='MWF', start_time=time(8 + 2 * number), end_time=time(9 + 2 * number),
+                building='Hall', room_number=str(number),
+            ))
+        cls.students = [
+            Student.objects.create(
+                student_id=f'S{number:04d}', first_name='Student', last_name=f'Number{number}',
+                email=f'student{number}@example.com', major='Computer Science', academic_year='Freshman',
+                enrollment_date=date(2025, 8, 25), expected_graduation=date(2029, 5, 15),
+            )
+            for number in range(2)
+        ]
+
+    def enroll(self, student, section, grade=None, status='Enrolled'):
+        return Enrollment.objects.create(
+            student=student, course_section=section, semester=section.semester, status=status, grade=grade,
+        )
+
+
+class RunningGpaTests(GradesTestCase):
+
+    def assert_matches_recount(self, student):
+        student.refresh_from_db()
+        quality_points, graded_credits = gpa.recompute_student(student.pk)
+        self.assertEqual((student.quality_points, student.graded_credits), (quality_points, graded_credits))
+        self.assertEqual(student.gpa, gpa.gpa_from(quality_points, graded_credits))
+
+    def test_running_sums_follow_grade_changes(self):
+        student = self.students[0]
+        first = self.enroll(student, self.sections[0], grade='A')
+        second = self.enroll(student, self.sections[1], grade='B-')
+        self.assert_matches_recount(student)
+        # 12.1 points over 4 credits is exactly 3.025, a rounding tie
+        self.assertEqual(student.gpa, Decimal('3.03'))
+
+        second.grade = 'B+'
+        second.save()
+        self.assert_matches_recount(student)
+
+        first.status = 'Dropped'
+        first.save()
+        self.assert_matches_recount(student)
+        self.assertEqual(student.gpa, Decimal('3.30'))
+
+        second.delete()
+        self.assert_matches_recount(student)
+        self.assertEqual((student.graded_credits, student.gpa), (0, Decimal('0.00')))
+
+    def test_moving_an_enrollment_between_students(self):
+        enrollment = self.enroll(self.students[0], self.sections[1], grade='A-')
+        enrollment.student = self.students[1]
+        enrollment.save()
+
+        for student in self.students:
+            self.assert_matches_recount(student)
+        self.assertEqual(self.students[1].gpa, Decimal('3.70'))
+
+    def test_reconcile_finds_no_drift_after_signal_updates(self):
+        self.enroll(self.students[0], self.sections[0], grade='A')
+        self.enroll(self.students[0], self.sections[1], grade='B-')
+        self.enroll(self.students[1], self.sections[1], grade='C+')
+
+        self.assertEqual(gpa.reconcile(), 0)
+
+    def test_reconcile_repairs_updates_that_bypass_signals(self):
+        self.enroll(self.students[0], self.sections[1], grade='A')
+        Enrollment.objects.filter(student=self.students[0]).update(grade='C')
+
+        self.assertEqual(gpa.reconcile(), 1)
+        self.assert_matches_recount(self.students[0])
+        self.assertEqual(self.students[0].gpa, Decimal('2.00'))
+
+
+class GradePostingTests(GradesTestCase):
+
+    def setUp(self):
+        self.section = self.sections[1]
+        for student in self.students:
+            self.enroll(student, self.section)
+
+    def post(self, text, **options):
+        return GradePoster(self.section, **options).run(read_rows(io.StringIO(text)))
+
+    def grades(self):
+        return dict(Enrollment.objects.filter(course_section=self.section).values_list('student_id', 'grade'))
+
+    def test_valid_roster_posts_grades_and_recounts_gpas(self):
+        report = self.post('student_id,grade\ns0000, a- \nS0001,\n', complete=True)
+
+        self.assertEqual((report.updated, report.unchanged, report.skipped, report.errors), (1, 0, 1, []))
+        self.assertEqual(self.grades(), {'S0000': 'A-', 'S0001': None})
+        self.assertEqual(Enrollment.objects.get(student_id='S0000', course_section=self.section).status, 'Completed')
+        student = Student.objects.get(pk='S0000')
+        self.assertEqual((student.graded_credits, student.gpa), (3, Decimal('3.70')))
+        self.assertEqual(Transcript.objects.get(student=student).cumulative_gpa, Decimal('3.70'))
+
+        # Posting the same roster again changes nothing
+        report = self.post('student_id,grade\nS0000,A-\n', complete=True)
+        self.assertEqual((report.updated, report.unchanged), (0, 1))
+
+    def test_any_bad_row_rejects_the_whole_roster(self):
+        report = self.post('student_id,grade\nS0000,B\nS0001,Z\nS0009,A\nS0000,A\n')
+
+        self.assertEqual(report.updated, 0)
+        self.assertEqual([line_number for line_number, _ in report.errors], [3, 4, 5])
+        self.assertEqual(self.grades(), {'S0000': None, 'S0001': None})
+        self.assertEqual(Student.objects.get(pk='S0000').graded_credits, 0)
+
+    def test_dry_run_writes_nothing(self):
+        report = self.post('student_id,grade\nS0000,B\n', dry_run=True)
+
+        self.assertEqual(report.updated, 1)
+        self.assertEqual(self.grades(), {'S0000': None, 'S0001': None})
+
+    def test_missing_columns_are_reported(self):
+        with self.assertRaisesMessage(RowError, 'missing columns: grade'):
+            self.post('student_id,score\nS0000,90\n')
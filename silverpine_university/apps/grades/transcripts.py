@@ -0,0 +1,128 @@
+"""
+Materialized transcripts.
+
+Each student's completed, graded enrollments are summarized into one
+TranscriptTerm row per semester (credits attempted and earned, term GPA)
+carrying cumulative totals through that term, and the newest totals are
+copied onto their Transcript. Rows are rebuilt per student whenever one
+of their completed enrollments changes, so showing a transcript is a
+read of a handful of rows.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.students.models import Student
+from .gpa import gpa_from
+from .models import GRADE_POINTS, Enrollment, Transcript, TranscriptTerm
+
+
+TRANSCRIPT_STATUS = 'Completed'
+
+# Grades that carry no earned credit
+UNEARNED_GRADES = {'F', 'W', 'I'}
+
+SEASONS = {'Winter': 0, 'Spring': 1, 'Summer': 2, 'Fall': 3}
+
+
+def term_sequence(semester):
+    """Sort key putting semesters such as 'Spring 2026' in calendar order"""
+    season, _, year = semester.rpartition(' ')
+    try:
+        return int(year) * 10 + SEASONS.get(season, 9)
+    except ValueError:
+        return 0
+
+
+def summarize_terms(rows):
+    """
+    ``{student_id: [term values, oldest first]}`` from
+    ``(student_id, semester, grade, credits)`` rows of graded, completed enrollments
+    """
+    terms = {}
+    for student_id, semester, grade, credits in rows:
+        term = terms.setdefault(student_id, {}).setdefault(semester, {
+            'semester': semester,
+            'sequence': term_sequence(semester),
+            'credits_attempted': 0,
+            'credits_earned': 0,
+            'quality_points': Decimal('0'),
+            'graded_credits': 0,
+        })
+        term['credits_attempted'] += credits
+        if grade not in UNEARNED_GRADES:
+            term['credits_earned'] += credits
+        if grade in GRADE_POINTS:
+            term['quality_points'] += Decimal(str(GRADE_POINTS[grade])) * credits
+            term['graded_credits'] += credits
+
+    summaries = {}
+    for student_id, semesters in terms.items():
+        quality_points, graded_credits, earned = Decimal('0'), 0, 0
+        ordered = sorted(semesters.values(), key=lambda term: (term['sequence'], term['semester']))
+        for term in ordered:
+            quality_points += term['quality_points']
+            graded_credits += term['graded_credits']
+            earned += term['credits_earned']
+            term['term_gpa'] = gpa_from(term['quality_points'], term['graded_credits'])
+            term['cumulative_gpa'] = gpa_from(quality_points, graded_credits)
+            term['cumulative_credits_earned'] = earned
+        summaries[student_id] = ordered
+    return summaries
+
+
+def transcript_rows(student_ids=None):
+    rows = Enrollment.objects.filter(status=TRANSCRIPT_STATUS, grade__isnull=False)
+    if student_ids is not None:
+        rows = rows.filter(student_id__in=student_ids)
+    return rows.order_by().values_list('student_id', 'semester', 'grade', 'course_section__course__credits')
+
+
+def refresh_transcripts(student_ids):
+    """Rebuild the transcript terms and totals of the given students"""
+    if not student_ids:
+        return
+    # Students deleted in the meantime have nothing left to summarize
+    student_ids = list(Student.objects.filter(pk__in=set(student_ids)).values_list('pk', flat=True))
+    summaries = summarize_terms(transcript_rows(student_ids))
+    terms = [
+        TranscriptTerm(student_id=student_id, **term)
+        for student_id, student_terms in summaries.items()
+        for term in student_terms
+    ]
+    transcripts = []
+    for student_id in student_ids:
+        student_terms = summaries.get(student_id, [])
+        latest = student_terms[-1] if student_terms else {}
+        transcripts.append(Transcript(
+            student_id=student_id,
+            cumulative_gpa=latest.get('cumulative_gpa', Decimal('0.00')),
+            total_credits_earned=latest.get('cumulative_credits_earned', 0),
+            total_credits_attempted=sum(term['credits_attempted'] for term in student_terms),
+        ))
+    with transaction.atomic():
+        TranscriptTerm.objects.filter(student_id__in=student_ids).delete()
+        TranscriptTerm.objects.bulk_create(terms)
+        Transcript.objects.bulk_create(
+            transcripts,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['cumulative_gpa', 'total_credits_earned', 'total_credits_attempted', 'generated_date'],
+        )
+
+
+def changed_students(enrollment, old_state, created):
+    """
+    Students whose transcript a saved enrollment touches, given its
+    ``(student_id, status, grade)`` as loaded; when that is unknown the
+    enrollment's student is refreshed to be safe
+    """
+    new_state = enrollment.gpa_state()
+    if new_state is None or (old_state is None and not created):
+        return [enrollment.student_id]
+    states = [new_state] if created else [old_state, new_state]
+    if not created and old_state == new_state:
+        return []
+    if all(status != TRANSCRIPT_STATUS for _, status, _ in states):
+        return []
+    return list(dict.fromkeys(student_id for student_id, _, _ in states))
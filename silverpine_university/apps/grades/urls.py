@@ -5,4 +5,6 @@ urlpatterns = [
     path('transcript/', views.TranscriptView.as_view(), name='transcript'),
     path('past-classes/', views.PastClassesView.as_view(), name='past_classes'),
     path('current/', views.CurrentGradesView.as_view(), name='current_grades'),
+    path('distributions/', views.GradeDistributionView.as_view(), name='grade_distributions'),
+    path('sections/<str:section_id>/post/', views.PostGradesView.as_view(), name='post_grades'),
 ]
\ No newline at end of file
@@ -1,24 +1,25 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import io
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.decorators import method_decorator
 from django.views import View
-from django.contrib import messages
-from .models import Enrollment, Transcript, Assignment
-from apps.students.models import Student
+from apps.courses.models import CourseSection
+from .models import Enrollment, GradeDistribution, Transcript, TranscriptTerm
+from . import distributions, grading, posting
+from apps.students.middleware import StudentRequiredMixin
 
 
-class TranscriptView(View):
+class TranscriptView(StudentRequiredMixin, View):
     """View student transcript and GPA"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
-        # Get or create transcript
-        transcript, created = Transcript.objects.get_or_create(student=student)
-        transcript.update_transcript()
+        # Summaries are kept current as grades post, so this page only reads them
+        transcript = Transcript.objects.filter(student=student).first() or Transcript(student=student)
+        terms = list(TranscriptTerm.objects.filter(student=student).order_by('-sequence'))
         
         # Get all completed enrollments
         enrollments = Enrollment.objects.filter(
@@ -27,32 +28,25 @@ class TranscriptView(View):
             grade__isnull=False
         ).select_related('course_section', 'course_section__course', 'course_section__professor')
         
-        # Group by semester
-        semesters = {}
+        courses = {}
         for enrollment in enrollments:
-            semester = enrollment.semester
-            if semester not in semesters:
-                semesters[semester] = []
-            semesters[semester].append(enrollment)
+            courses.setdefault(enrollment.semester, []).append(enrollment)
+        for term in terms:
+            term.courses = courses.get(term.semester, [])
         
         context = {
             'student': student,
             'transcript': transcript,
-            'semesters': semesters,
+            'terms': terms,
         }
         return render(request, 'grades/transcript.html', context)
 
 
-class PastClassesView(View):
+class PastClassesView(StudentRequiredMixin, View):
     """View past completed classes"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get completed courses
         past_enrollments = Enrollment.objects.filter(
@@ -67,16 +61,11 @@ class PastClassesView(View):
         return render(request, 'grades/past_classes.html', context)
 
 
-class CurrentGradesView(View):
+class CurrentGradesView(StudentRequiredMixin, View):
     """View current semester grades and assignments"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id)
+        student = request.student
         
         # Get current enrollments
         current_enrollments = Enrollment.objects.filter(
@@ -85,17 +74,74 @@ class CurrentGradesView(View):
             status='Enrolled'
         ).select_related('course_section', 'course_section__course', 'course_section__professor')
         
-        # Get assignments for each enrollment
+        # Assignments for every course come from one prefetch inside the grading engine
+        current_enrollments = list(current_enrollments)
+        course_grades = grading.course_grades(current_enrollments)
         enrollment_data = []
         for enrollment in current_enrollments:
-            assignments = Assignment.objects.filter(enrollment=enrollment)
             enrollment_data.append({
                 'enrollment': enrollment,
-                'assignments': assignments,
+                'assignments': enrollment.assignments.all(),
+                'course_grade': course_grades[enrollment.pk],
             })
         
         context = {
             'student': student,
             'enrollment_data': enrollment_data,
         }
-        return render(request, 'grades/current_grades.html', context)
\ No newline at end of file
+        return render(request, 'grades/current_grades.html', context)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class GradeDistributionView(View):
+    """JSON grade distributions of one scope, optionally narrowed to a key and semester"""
+    
+    def get(self, request):
+        scope = request.GET.get('scope', 'section')
+        if scope not in dict(GradeDistribution.SCOPES):
+            return JsonResponse({'error': f'scope must be one of {", ".join(dict(GradeDistribution.SCOPES))}.'}, status=400)
+        
+        rows = GradeDistribution.objects.filter(scope=scope)
+        if request.GET.get('key'):
+            rows = rows.filter(key=request.GET['key'])
+        if 'semester' in request.GET:
+            # An empty semester selects the all-semester rollups
+            rows = rows.filter(semester=request.GET['semester'])
+        
+        return JsonResponse({
+            'scope': scope,
+            'grades': distributions.COLUMNS,
+            'distributions': [distributions.distribution_data(row) for row in rows],
+        })
+
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class PostGradesView(View):
+    """Post a section's grades from an uploaded roster CSV; the whole roster is rejected if any row is invalid"""
+    
+    def post(self, request, section_id):
+        section = get_object_or_404(CourseSection, section_id=section_id)
+        upload = request.FILES.get('roster')
+        if upload is None:
+            return JsonResponse({'error': 'Upload the roster CSV as "roster".'}, status=400)
+        
+        poster = posting.GradePoster(
+            section,
+            complete=request.POST.get('complete') in ('1', 'true', 'on'),
+            dry_run=request.POST.get('dry_run') in ('1', 'true', 'on'),
+        )
+        try:
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            report = poster.run(posting.read_rows(stream))
+        except (posting.RowError, UnicodeDecodeError) as exc:
+            return JsonResponse({'error': f'Cannot read the roster: {exc}'}, status=400)
+        
+        return JsonResponse({
+            'section': section.section_id,
+            'dry_run': poster.dry_run,
+            'updated': report.updated,
+            'unchanged': report.unchanged,
+            'skipped': report.skipped,
+            'errors': [{'line': line_number, 'error': message} for line_number, message in report.errors],
+        }, status=400 if report.errors else 200)
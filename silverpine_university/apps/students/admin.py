@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Student
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(Student)
@@ -7,14 +8,16 @@ class StudentAdmin(admin.ModelAdmin):
     list_display = ['student_id', 'first_name', 'last_name', 'major', 'academic_year', 'gpa', 'is_active']
     list_filter = ['academic_year', 'academic_standing', 'is_active', 'major']
     search_fields = ['student_id', 'first_name', 'last_name', 'email']
-    readonly_fields = ['created_at', 'updated_at', 'gpa']
+    readonly_fields = ['created_at', 'updated_at', 'gpa', 'quality_points', 'graded_credits']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Personal Information', {
             'fields': ('student_id', 'first_name', 'last_name', 'email', 'phone', 'profile_picture', 'bio')
         }),
         ('Academic Information', {
-            'fields': ('major', 'minor', 'academic_year', 'enrollment_date', 'expected_graduation', 'gpa', 'total_credits', 'academic_standing')
+            'fields': ('major', 'minor', 'academic_year', 'enrollment_date', 'expected_graduation', 'gpa', 'quality_points', 'graded_credits', 'total_credits', 'academic_standing')
         }),
         ('Status', {
             'fields': ('is_active',)
@@ -24,9 +27,3 @@ class StudentAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
-    
-    def save_model(self, request, obj, form, change):
-        """Update GPA when saving student"""
-        super().save_model(request, obj, form, change)
-        obj.gpa = obj.calculate_gpa()
-        obj.save()
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Per-process cache of logged-in students.
+
+Every portal page needs the current student, but only a handful of their
+columns. get_student() loads those columns once and serves the instance
+from process memory for STUDENT_CONTEXT_TTL seconds. Each student has a
+version in the shared cache alias that saves bump (see signals.py), so a
+process notices a change on its next lookup instead of waiting out the
+TTL. Queryset updates that bypass save() call invalidate_students().
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+
+from apps.courses.versioning import bump_version, get_version
+from .models import Student
+
+
+# Columns portal pages read; anything else is fetched on first access
+STUDENT_FIELDS = (
+    'student_id', 'first_name', 'last_name', 'email', 'major', 'minor', 'academic_year',
+    'expected_graduation', 'gpa', 'total_credits', 'academic_standing', 'is_active',
+)
+
+MAX_CACHED_STUDENTS = 10000
+
+_students = {}  # student_id -> (student, version, loaded_at)
+_students_lock = threading.Lock()
+
+
+def version_key(student_id):
+    return f'students:{student_id}:version'
+
+
+def invalidate_students(student_ids):
+    """Make every process reload these students on next use"""
+    for student_id in student_ids:
+        _students.pop(student_id, None)
+        bump_version(version_key(student_id))
+
+
+def get_student(student_id):
+    """The active student with this id, or None; each caller gets its own copy"""
+    version = get_version(version_key(student_id))
+    entry = _students.get(student_id)
+    if entry is not None and entry[1] == version and time.monotonic() - entry[2] < settings.STUDENT_CONTEXT_TTL:
+        return copy.copy(entry[0])
+
+    try:
+        student = Student.objects.only(*STUDENT_FIELDS).get(pk=student_id, is_active=True)
+    except Student.DoesNotExist:
+        _students.pop(student_id, None)
+        return None
+    with _students_lock:
+        _students[student_id] = (student, version, time.monotonic())
+        while len(_students) > MAX_CACHED_STUDENTS:
+            _students.pop(next(iter(_students)))
+    return copy.copy(student)
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.students.models import Student, name_key
+from datetime import date
+import random
+import statistics
+import time
+
+
+STUDENT_ID_PREFIX = 'BL'
+FIRST_NAMES = ['José', 'Zoë', 'Ana', 'Björn', 'Chloé', 'Darius', 'Émile', 'Farah', 'Grace', 'Håkon', 'Ines', 'Jun']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare login lookup latency by case-insensitive name match and by the indexed name keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000, help='Students in the table while measuring')
+        parser.add_argument('--lookups', type=int, default=500, help='Logins timed for each lookup')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated students')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self.fill(options['students'])
+                names = list(
+                    Student.objects.filter(is_active=True).order_by('?').values_list('first_name', 'last_name')[:options['lookups']]
+                )
+                # Vary the case the way people type their names
+                names = [(first.upper(), last.lower()) if rng.random() < 0.5 else (first, last) for first, last in names]
+                self.stdout.write(f'{Student.objects.count()} students, {len(names)} logins per lookup')
+
+                before = self.measure('iexact', names, lambda first, last: Student.objects.filter(
+                    first_name__iexact=first, last_name__iexact=last, is_active=True,
+                ).order_by())
+                after = self.measure('name keys', names, lambda first, last: Student.objects.filter(
+                    last_name_key=name_key(last), first_name_key=name_key(first), is_active=True,
+                ).order_by())
+                if before and after:
+                    self.stdout.write(self.style.SUCCESS(f'Name keys are {before / after:.1f}x faster at the median'))
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, target):
+        """Top the table up to ``target`` students with synthetic ones"""
+        missing = target - Student.objects.count()
+        if missing <= 0:
+            return
+        start = time.perf_counter()
+        batch = []
+        for n in range(missing):
+            student = Student(
+                student_id=f'{STUDENT_ID_PREFIX}{n:07d}',
+                first_name=FIRST_NAMES[n % len(FIRST_NAMES)],
+                last_name=f'Bench{n:07d}',
+                email=f'bench{n:07d}@student.silverpine.edu',
+                major='Undeclared',
+                academic_year='Freshman',
+                enrollment_date=date(2025, 8, 15),
+                expected_graduation=date(2029, 5, 15),
+            )
+            student.update_name_keys()
+            batch.append(student)
+            if len(batch) == 5000:
+                Student.objects.bulk_create(batch)
+                batch = []
+        Student.objects.bulk_create(batch)
+        self.stdout.write(f'Added {missing} synthetic students in {time.perf_counter() - start:.1f}s')
+
+    def measure(self, label, names, lookup):
+        first, last = names[0]
+        plan = lookup(first, last).explain()
+        timings = []
+        for first, last in names:
+            start = time.perf_counter()
+            list(lookup(first, last)[:2])
+            timings.append((time.perf_counter() - start) * 1000)
+        if not timings:
+            return None
+        timings.sort()
+        median = statistics.median(timings)
+        self.stdout.write(
+            f'{label:<10} median {median:.3f} ms  p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms  '
+            f'max {timings[-1]:.3f} ms'
+        )
+        self.stdout.write(f'{"":<10} plan: {" / ".join(line.strip() for line in plan.splitlines())}')
+        return median
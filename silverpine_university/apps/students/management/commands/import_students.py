@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.students.roster import DEFAULT_CHUNK_SIZE, RowError, StudentImporter, read_rows
+import time
+
+
+class Command(BaseCommand):
+    help = 'Create students, with their financial accounts and transcripts, from a CSV roster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file of admitted students')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Students written per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing')
+
+    def handle(self, *args, **options):
+        self.started = time.perf_counter()
+        importer = StudentImporter(
+            chunk_size=options['chunk_size'], dry_run=options['dry_run'], progress=self.show_progress,
+        )
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                report = importer.run(read_rows(stream))
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["path"]}: {exc}')
+        except RowError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - self.started
+
+        for line_number, message in report.errors:
+            self.stderr.write(f'line {line_number}: {message}')
+
+        summary = (
+            f'{"Would create" if options["dry_run"] else "Created"} {report.created} students, '
+            f'rejected {len(report.errors)} ({report.rows} rows in {elapsed:.2f}s, '
+            f'{report.rows / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not report.errors else self.style.WARNING(summary))
+
+    def show_progress(self, report):
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'{report.rows} rows, {report.created} students, {report.rows / elapsed:.0f} rows/s')
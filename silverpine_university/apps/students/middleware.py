@@ -0,0 +1,50 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib import messages
+from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+from .context import get_student
+
+
+class StudentMiddleware:
+    """
+    Attach per-request portal context to the request.
+
+    ``request.student`` is the logged-in student (or None), loaded on first
+    use. Further per-request context belongs here as well. The middleware
+    runs natively under both WSGI and ASGI, so async views such as the seat
+    event stream do not pay for a thread hop; they must not touch
+    ``request.student`` outside sync_to_async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.student = SimpleLazyObject(lambda: self.load_student(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.student = SimpleLazyObject(lambda: self.load_student(request))
+        return await self.get_response(request)
+
+    @staticmethod
+    def load_student(request):
+        student_id = request.session.get('student_id')
+        return get_student(student_id) if student_id else None
+
+
+class StudentRequiredMixin:
+    """Send visitors who are not logged in as a student back to the login page"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.student:
+            messages.warning(request, 'Please log in to continue.')
+            return redirect('student_login')
+        return super().dispatch(request, *args, **kwargs)
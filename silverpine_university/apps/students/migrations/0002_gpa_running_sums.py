@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_gpa_sums(apps, schema_editor):
+    from apps.grades.gpa import contribution, gpa_from
+    from apps.grades.models import GPA_STATUSES, GRADE_POINTS
+    Student = apps.get_model('students', 'Student')
+    Enrollment = apps.get_model('grades', 'Enrollment')
+
+    totals = {}
+    rows = Enrollment.objects.filter(status__in=GPA_STATUSES, grade__in=list(GRADE_POINTS)).values_list(
+        'student_id', 'status', 'grade', 'course_section__course__credits',
+    )
+    for student_id, status, grade, credits in rows.iterator(chunk_size=5000):
+        points, counted = contribution(status, grade, credits)
+        current = totals.get(student_id, (Decimal('0'), 0))
+        totals[student_id] = (current[0] + points, current[1] + counted)
+
+    # Students without graded enrollments get a GPA of zero, as on their next dashboard visit before
+    students = []
+    for student in Student.objects.only('student_id'):
+        student.quality_points, student.graded_credits = totals.get(student.student_id, (Decimal('0'), 0))
+        student.gpa = gpa_from(student.quality_points, student.graded_credits)
+        students.append(student)
+    Student.objects.bulk_update(students, ['quality_points', 'graded_credits', 'gpa'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+        ('grades', '0002_enrollment_waitlist_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='quality_points',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='graded_credits',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_gpa_sums, migrations.RunPython.noop),
+    ]
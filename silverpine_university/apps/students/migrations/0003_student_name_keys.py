@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_name_keys(apps, schema_editor):
+    from apps.students.models import name_key
+    Student = apps.get_model('students', 'Student')
+    last_pk = ''
+    while True:
+        batch = list(
+            Student.objects.filter(pk__gt=last_pk).order_by('pk').only('student_id', 'first_name', 'last_name')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for student in batch:
+            student.first_name_key = name_key(student.first_name)
+            student.last_name_key = name_key(student.last_name)
+        Student.objects.bulk_update(batch, ['first_name_key', 'last_name_key'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_gpa_running_sums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='first_name_key',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='last_name_key',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        # Fill the keys before building the index so it is created once over final values
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name_key', 'first_name_key'], name='student_name_key_idx'),
+        ),
+    ]
@@ -1,5 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
+import unicodedata
+
+
+def name_key(name):
+    """Casefolded, accent-free form of a name used for indexed login lookups"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
 
 
 class Student(models.Model):
@@ -9,6 +17,9 @@ class Student(models.Model):
     student_id = models.CharField(max_length=10, unique=True, primary_key=True)
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
+    # Normalized names for login, maintained on save
+    first_name_key = models.CharField(max_length=100, editable=False, default='')
+    last_name_key = models.CharField(max_length=100, editable=False, default='')
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15, blank=True)
     
@@ -27,6 +38,10 @@ class Student(models.Model):
     gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     total_credits = models.IntegerField(default=0)
     
+    # Running GPA sums, kept up to date as enrollment grades change
+    quality_points = models.DecimalField(max_digits=7, decimal_places=2, default=0, editable=False)
+    graded_credits = models.IntegerField(default=0, editable=False)
+    
     # Status
     is_active = models.BooleanField(default=True)
     academic_standing = models.CharField(max_length=50, choices=[
@@ -48,39 +63,35 @@ class Student(models.Model):
         ordering = ['last_name', 'first_name']
         verbose_name = 'Student'
         verbose_name_plural = 'Students'
+        indexes = [
+            models.Index(fields=['last_name_key', 'first_name_key'], name='student_name_key_idx'),
+            models.Index(fields=['academic_year'], name='student_academic_year_idx'),
+            models.Index(fields=['academic_standing'], name='student_standing_idx'),
+            models.Index(fields=['major'], name='student_major_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.student_id})"
     
+    def save(self, *args, **kwargs):
+        self.update_name_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'first_name_key', 'last_name_key'}
+        super().save(*args, **kwargs)
+    
+    def update_name_keys(self):
+        """Refresh the login keys; call before bulk_create, which skips save()"""
+        self.first_name_key = name_key(self.first_name)
+        self.last_name_key = name_key(self.last_name)
+    
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
     
     def calculate_gpa(self):
-        """Calculate GPA from enrolled courses"""
-        from apps.grades.models import Enrollment
-        enrollments = Enrollment.objects.filter(student=self, grade__isnull=False)
-        
-        if not enrollments.exists():
-            return 0.00
-        
-        grade_points = {
-            'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        
-        total_points = 0
-        total_credits = 0
-        
-        for enrollment in enrollments:
-            if enrollment.grade in grade_points:
-                points = grade_points[enrollment.grade] * enrollment.course.credits
-                total_points += points
-                total_credits += enrollment.course.credits
-        
-        if total_credits == 0:
+        """Calculate GPA from scratch over every graded enrollment"""
+        from apps.grades.gpa import recompute_student
+        quality_points, graded_credits = recompute_student(self.student_id)
+        if graded_credits == 0:
             return 0.00
-        
-        return round(total_points / total_credits, 2)
\ No newline at end of file
+        return round(float(quality_points) / graded_credits, 2)
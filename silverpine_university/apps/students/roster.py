@@ -0,0 +1,171 @@
+"""
+Streaming import of admitted students from CSV.
+
+Rows are read one at a time, normalized and validated, and deduplicated
+against sets of the student ids and emails already in use, which are
+loaded once up front. Students are then inserted in chunks together with
+their FinancialAccount and Transcript, so nobody's first page view has
+to create those. Existing students are never modified. A row whose id or
+email is already taken is reported and skipped, including rows that lose
+to a student inserted concurrently while the import runs.
+"""
+import csv
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from apps.financial_aid.models import FinancialAccount
+from apps.grades.models import Transcript
+from .models import Student
+
+
+REQUIRED_FIELDS = ['student_id', 'first_name', 'last_name', 'email', 'major', 'academic_year', 'enrollment_date']
+
+ACADEMIC_YEARS = {value.lower(): value for value, _ in Student._meta.get_field('academic_year').choices}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class RowError(ValueError):
+    """A row that cannot be imported"""
+
+
+def read_rows(stream):
+    """Yield ``(line_number, row dict)`` from a CSV stream"""
+    reader = csv.DictReader(stream)
+    missing = [name for name in REQUIRED_FIELDS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise RowError(f'missing columns: {", ".join(missing)}')
+    for row in reader:
+        yield reader.line_num, row
+
+
+def clean_text(value, name, max_length, required=True):
+    text = ' '.join(str(value or '').split())
+    if required and not text:
+        raise RowError(f'missing {name}')
+    if len(text) > max_length:
+        raise RowError(f'{name} is longer than {max_length} characters')
+    return text
+
+
+def parse_date(value, name):
+    try:
+        return date.fromisoformat(str(value or '').strip())
+    except ValueError:
+        raise RowError(f'invalid {name} {value!r}, expected YYYY-MM-DD')
+
+
+@dataclass
+class ImportReport:
+    """Counts and problems collected while importing"""
+
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows(self):
+        return self.created + len(self.errors)
+
+
+class StudentImporter:
+    """Validates rows and inserts students, financial accounts and transcripts in chunks"""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress=None):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.report = ImportReport()
+        self.student_ids = set(Student.objects.values_list('student_id', flat=True).iterator(chunk_size=10000))
+        self.emails = {email.lower() for email in Student.objects.values_list('email', flat=True).iterator(chunk_size=10000)}
+
+    def run(self, rows):
+        chunk = []
+        for line_number, row in rows:
+            try:
+                student = self.build(row)
+            except RowError as exc:
+                self.report.errors.append((line_number, str(exc)))
+                continue
+            chunk.append((line_number, student))
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.write_chunk(chunk)
+        return self.report
+
+    def build(self, row):
+        """Turn one input row into an unsaved Student, or raise RowError"""
+        student_id = clean_text(row.get('student_id'), 'student_id', 10).upper()
+        if student_id in self.student_ids:
+            raise RowError(f'student_id {student_id} already exists')
+
+        email = clean_text(row.get('email'), 'email', 254).lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError(f'invalid email {email!r}')
+        if email in self.emails:
+            raise RowError(f'email {email} already belongs to another student')
+
+        academic_year = ACADEMIC_YEARS.get(clean_text(row.get('academic_year'), 'academic_year', 20).lower())
+        if academic_year is None:
+            raise RowError(f'unknown academic_year {row.get("academic_year")!r}')
+        enrollment_date = parse_date(row.get('enrollment_date'), 'enrollment_date')
+        if str(row.get('expected_graduation') or '').strip():
+            expected_graduation = parse_date(row.get('expected_graduation'), 'expected_graduation')
+        else:
+            # Four years out, graduating in May
+            expected_graduation = date(enrollment_date.year + 4, 5, 15)
+        if expected_graduation <= enrollment_date:
+            raise RowError('expected_graduation must be after enrollment_date')
+
+        student = Student(
+            student_id=student_id,
+            first_name=clean_text(row.get('first_name'), 'first_name', 100),
+            last_name=clean_text(row.get('last_name'), 'last_name', 100),
+            email=email,
+            phone=clean_text(row.get('phone'), 'phone', 15, required=False),
+            major=clean_text(row.get('major'), 'major', 100),
+            minor=clean_text(row.get('minor'), 'minor', 100, required=False),
+            academic_year=academic_year,
+            enrollment_date=enrollment_date,
+            expected_graduation=expected_graduation,
+        )
+        student.update_name_keys()
+        # Claim the id and email now so that later rows of the same file are caught too
+        self.student_ids.add(student_id)
+        self.emails.add(email)
+        return student
+
+    def write_chunk(self, chunk):
+        students = [student for _, student in chunk]
+        if not self.dry_run:
+            with transaction.atomic():
+                # Rows added since the id and email sets were loaded are skipped, not overwritten
+                Student.objects.bulk_create(students, ignore_conflicts=True)
+                emails = {student.pk: student.email for student in students}
+                created = {
+                    student_id
+                    for student_id, email in Student.objects.filter(pk__in=list(emails)).values_list('pk', 'email')
+                    if emails[student_id] == email
+                }
+                FinancialAccount.objects.bulk_create(
+                    [FinancialAccount(student_id=student_id) for student_id in created], ignore_conflicts=True,
+                )
+                Transcript.objects.bulk_create(
+                    [Transcript(student_id=student_id) for student_id in created], ignore_conflicts=True,
+                )
+            self.report.created += len(created)
+            self.report.errors += [
+                (line_number, f'student {student.pk} or email {student.email} already exists (created concurrently)')
+                for line_number, student in chunk if student.pk not in created
+            ]
+        else:
+            self.report.created += len(students)
+        if self.progress:
+            self.progress(self.report)
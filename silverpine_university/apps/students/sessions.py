@@ -0,0 +1,248 @@
+"""
+Tiered session store.
+
+Sessions are read through three tiers: a bounded per-process LRU, the
+shared cache named by SESSION_CACHE_ALIAS, and finally django_session.
+A process serves a session from its own memory for at most
+SESSION_LOCAL_MAX_AGE seconds before going back to the cache, which
+bounds how stale a session can look after another worker changed it.
+
+New sessions are inserted into the database straight away so that keys
+stay unique. Later changes (cart edits, messages, logins) go to the
+cache at once and are queued for the database. A background thread
+writes the queue in one batched UPDATE every SESSION_WRITE_BEHIND_DELAY
+seconds, or sooner once SESSION_WRITE_BEHIND_BATCH sessions are waiting,
+so a burst of writes to one session costs a single row update. Pending
+writes are also flushed when the process exits.
+
+All of that relies on every worker seeing the same cache. When the alias
+is backed by local memory, which each process holds on its own, the
+cache tier is skipped and changes are written straight to the database,
+so the LRU age stays the only staleness bound.
+"""
+import atexit
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+KEY_PREFIX = 'sessions:'
+
+logger = logging.getLogger('django.contrib.sessions')
+
+
+class LocalSessionCache:
+    """Bounded LRU of decoded sessions held by one process"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()  # session key -> (data, expire_date, stored_at)
+        self.lock = threading.Lock()
+
+    def get(self, session_key, max_age):
+        with self.lock:
+            entry = self.entries.get(session_key)
+            if entry is None:
+                return None
+            data, expire_date, stored_at = entry
+            if time.monotonic() - stored_at > max_age or expire_date <= timezone.now():
+                del self.entries[session_key]
+                return None
+            self.entries.move_to_end(session_key)
+        # Callers mutate the session they get back, so never hand out the stored copy
+        return copy.deepcopy(data)
+
+    def set(self, session_key, data, expire_date):
+        entry = (copy.deepcopy(data), expire_date, time.monotonic())
+        with self.lock:
+            self.entries[session_key] = entry
+            self.entries.move_to_end(session_key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def discard(self, session_key):
+        with self.lock:
+            self.entries.pop(session_key, None)
+
+
+class WriteBehindQueue:
+    """Coalesces session updates and writes them to the database in batches"""
+
+    def __init__(self, delay, batch_size):
+        self.delay = delay
+        self.batch_size = batch_size
+        self.pending = {}  # session key -> (encoded data, expire_date)
+        self.lock = threading.Lock()
+        # Held while writing so that a delete cannot interleave with a batch
+        self.write_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def put(self, session_key, session_data, expire_date):
+        with self.lock:
+            self.pending[session_key] = (session_data, expire_date)
+            full = len(self.pending) >= self.batch_size
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='session-write-behind', daemon=True)
+                self.thread.start()
+        if full:
+            self.wakeup.set()
+
+    def discard(self, session_key):
+        with self.lock:
+            self.pending.pop(session_key, None)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.delay)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write queued sessions to the database')
+            finally:
+                # This thread's connection would otherwise stay open between batches
+                connections.close_all()
+
+    def flush(self):
+        """Write every queued session now; returns how many were written"""
+        with self.write_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+            if not batch:
+                return 0
+            Session = DBStore.get_model_class()
+            sessions = [
+                Session(session_key=session_key, session_data=session_data, expire_date=expire_date)
+                for session_key, (session_data, expire_date) in batch.items()
+            ]
+            try:
+                with transaction.atomic():
+                    # An UPDATE, not an upsert, so a session deleted meanwhile stays deleted
+                    Session.objects.bulk_update(sessions, ['session_data', 'expire_date'], batch_size=500)
+            except Exception:
+                with self.lock:
+                    for session_key, values in batch.items():
+                        # Keep anything written since; it is newer than the failed batch
+                        self.pending.setdefault(session_key, values)
+                raise
+            return len(sessions)
+
+
+local_sessions = LocalSessionCache(settings.SESSION_LOCAL_CACHE_SIZE)
+write_behind = WriteBehindQueue(settings.SESSION_WRITE_BEHIND_DELAY, settings.SESSION_WRITE_BEHIND_BATCH)
+atexit.register(write_behind.flush)
+
+
+def session_cache():
+    """The cache tier, or None when SESSION_CACHE_ALIAS is not shared between processes"""
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        # Other workers would keep serving, and writing back, their own copies
+        return None
+    return cache
+
+
+class SessionStore(DBStore):
+    """Session store reading through a local LRU and the cache, writing behind to the database"""
+
+    def __init__(self, session_key=None):
+        self._cache = session_cache()
+        super().__init__(session_key)
+
+    def load(self):
+        session_key = self.session_key
+        if session_key is None:
+            return {}
+        data = local_sessions.get(session_key, settings.SESSION_LOCAL_MAX_AGE)
+        if data is not None:
+            return data
+
+        cached = None
+        if self._cache is not None:
+            try:
+                cached = self._cache.get(KEY_PREFIX + session_key)
+            except Exception:
+                # Some backends reject malformed keys; treat that as a miss
+                cached = None
+        if cached is None:
+            stored = self._get_session_from_db()
+            if stored is None:
+                return {}
+            cached = (self.decode(stored.session_data), stored.expire_date)
+            self.cache_session(*cached)
+        else:
+            local_sessions.set(session_key, *cached)
+        return cached[0]
+
+    def exists(self, session_key):
+        return bool(session_key) and (
+            (self._cache is not None and (KEY_PREFIX + session_key) in self._cache) or super().exists(session_key)
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        expire_date = self.get_expiry_date()
+        if must_create or self._cache is None:
+            super().save(must_create=must_create)
+        else:
+            write_behind.put(self.session_key, self.encode(data), expire_date)
+        self.cache_session(data, expire_date)
+
+    def cache_session(self, data, expire_date):
+        local_sessions.set(self.session_key, data, expire_date)
+        if self._cache is None:
+            return
+        try:
+            self._cache.set(KEY_PREFIX + self.session_key, (data, expire_date), self.get_expiry_age(expiry=expire_date))
+        except Exception:
+            logger.exception('Error saving to cache (%s)', self._cache)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with write_behind.write_lock:
+            write_behind.discard(session_key)
+            super().delete(session_key)
+        local_sessions.discard(session_key)
+        if self._cache is not None:
+            self._cache.delete(KEY_PREFIX + session_key)
+
+    def flush(self):
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    @classmethod
+    def clear_expired(cls, batch_size=1000, pause=0):
+        """
+        Delete expired sessions a batch at a time, so the database write lock
+        is only ever held briefly. Returns how many were deleted.
+        """
+        Session = cls.get_model_class()
+        deleted = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=timezone.now())
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                return deleted
+            time.sleep(pause)
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Student
+from .context import invalidate_students
+
+
+@receiver([post_save, post_delete], sender=Student)
+def forget_cached_student(sender, instance, **kwargs):
+    invalidate_students([instance.pk])
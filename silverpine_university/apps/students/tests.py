@@ -0,0 +1,120 @@
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.courses.models import Course, CourseSection, Department, Professor
+from apps.financial_aid.models import FinancialAccount, FinancialAidPackage, Payment
+from apps.grades.models import Assignment, Enrollment, Transcript
+from . import pagination
+from .models import Student
+
+
+# Queries per changelist page: user, row estimate, count and one SELECT joining
+# the related rows (the session comes from the cache), plus one DISTINCT for
+# each free-text list_filter. The numbers must not grow with the rows listed.
+CHANGELIST_QUERIES = {
+    'admin:students_student_changelist': 5,
+    'admin:grades_enrollment_changelist': 5,
+    'admin:grades_assignment_changelist': 4,
+    'admin:grades_transcript_changelist': 4,
+    'admin:financial_aid_financialaccount_changelist': 4,
+    'admin:financial_aid_financialaidpackage_changelist': 5,
+    'admin:financial_aid_payment_changelist': 4,
+}
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelists of the large tables run a fixed number of queries per page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('registrar', 'registrar@example.com', 'password')
+        department = Department.objects.create(
+            code='CSCI', name='Computer Science', description='', building='Hall', phone='555', email='cs@example.com',
+        )
+        professor = Professor.objects.create(
+            professor_id='P1', first_name='Ada', last_name='Byron', title='Professor', department=department,
+            email='ada@example.com', office_location='Hall 1', office_hours='MWF',
+        )
+        course = Course.objects.create(
+            course_code='CSCI1010', title='Programming', department=department, description='', level='Undergraduate',
+        )
+        cls.sections = [
+            CourseSection.objects.create(
+                section_id=f'CSCI1010-{number}', course=course, professor=professor, semester='Spring 2026',
+                days='MWF', start_time=time(9), end_time=time(10), building='Hall', room_number=str(number),
+            )
+            for number in range(3)
+        ]
+
+    def add_student(self, number):
+        student = Student.objects.create(
+            student_id=f'S{number:04d}', first_name='Student', last_name=f'Number{number}',
+            email=f'student{number}@example.com', major='Computer Science', academic_year='Freshman',
+            enrollment_date=date(2025, 8, 25), expected_graduation=date(2029, 5, 15),
+        )
+        account = FinancialAccount.objects.create(student=student)
+        Transcript.objects.get_or_create(student=student)
+        FinancialAidPackage.objects.create(student=student, academic_year='2025-2026')
+        Payment.objects.create(
+            financial_account=account, amount=Decimal('100.00'), payment_method='Check', reference_number=f'REF{number}',
+        )
+        for section in self.sections:
+            enrollment = Enrollment.objects.create(student=student, course_section=section, semester='Spring 2026')
+            Assignment.objects.create(
+                enrollment=enrollment, title='Homework 1', assignment_type='Homework', points_possible=10,
+                assigned_date=date(2026, 1, 12), due_date=date(2026, 1, 19),
+            )
+
+    def assert_changelist_queries(self):
+        for name, queries in CHANGELIST_QUERIES.items():
+            self.client.force_login(self.admin)
+            url = reverse(name)
+            self.client.get(url)  # settle the session
+            with self.assertNumQueries(queries, msg=name):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, name)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_student(0)
+        self.assert_changelist_queries()
+        for number in range(1, 12):
+            self.add_student(number)
+        self.assert_changelist_queries()
+
+    def test_searched_changelist_reaches_its_last_page(self):
+        for number in range(4):
+            self.add_student(number)
+        self.client.force_login(self.admin)
+        with mock.patch.object(pagination, 'EXACT_COUNT_LIMIT', 1):
+            response = self.client.get(reverse('admin:grades_enrollment_changelist'), {'q': 'Number', 'p': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 12)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    def setUp(self):
+        for number in range(5):
+            Student.objects.create(
+                student_id=f'S{number:04d}', first_name='Student', last_name=f'Number{number}',
+                email=f'student{number}@example.com', major='History', academic_year='Freshman',
+                enrollment_date=date(2025, 8, 25), expected_graduation=date(2029, 5, 15),
+            )
+
+    def test_pages_past_an_underestimate_are_served(self):
+        with mock.patch.object(pagination, 'EXACT_COUNT_LIMIT', 1), \
+                mock.patch.object(pagination, 'estimated_row_count', return_value=2):
+            paginator = pagination.EstimatedCountPaginator(Student.objects.order_by('pk'), 2)
+            self.assertEqual(paginator.num_pages, 1)
+            self.assertEqual([student.pk for student in paginator.page(3)], ['S0004'])
+
+    def test_filtered_lists_are_counted_exactly(self):
+        with mock.patch.object(pagination, 'EXACT_COUNT_LIMIT', 1):
+            paginator = pagination.EstimatedCountPaginator(Student.objects.filter(major='History'), 2)
+            self.assertEqual(paginator.count, 5)
+            self.assertEqual(paginator.num_pages, 3)
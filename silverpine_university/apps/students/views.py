@@ -1,7 +1,8 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib import messages
-from .models import Student
+from .middleware import StudentRequiredMixin
+from .models import Student, name_key
 
 
 class StudentLoginView(View):
@@ -19,9 +20,10 @@ class StudentLoginView(View):
             return render(request, 'auth/login.html')
         
         try:
+            # One seek on the name key index instead of a case-insensitive table scan
             student = Student.objects.get(
-                first_name__iexact=first_name,
-                last_name__iexact=last_name,
+                last_name_key=name_key(last_name),
+                first_name_key=name_key(first_name),
                 is_active=True
             )
             # Store student ID in session
@@ -38,21 +40,11 @@ class StudentLoginView(View):
             return render(request, 'auth/login.html')
 
 
-class StudentDashboardView(View):
+class StudentDashboardView(StudentRequiredMixin, View):
     """Main student dashboard after login"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id, is_active=True)
-        
-        # Update GPA
-        student.gpa = student.calculate_gpa()
-        student.save()
+        student = request.student
         
         context = {
             'student': student,
@@ -69,17 +61,11 @@ class StudentLogoutView(View):
         return redirect('student_login')
 
 
-class StudentProfileView(View):
+class StudentProfileView(StudentRequiredMixin, View):
     """View student profile"""
     
     def get(self, request):
-        student_id = request.session.get('student_id')
-        
-        if not student_id:
-            messages.warning(request, 'Please log in to continue.')
-            return redirect('student_login')
-        
-        student = get_object_or_404(Student, student_id=student_id, is_active=True)
+        student = request.student
         
         context = {
             'student': student,
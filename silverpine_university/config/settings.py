@@ -43,6 +43,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'apps.students.middleware.StudentMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -71,9 +72,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take SQLite's write lock when a transaction starts so that
+            # concurrent registrations serialize instead of overselling seats
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# Cache
+CACHES = {
+    # Private to each process: rendered pages and other data that is cheap to rebuild
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'silverpine-default',
+    },
+    # Sessions and the version keys that tell every process its copies are stale.
+    # Set REDIS_URL whenever more than one process serves the site; the
+    # local-memory fallback is only shared within a single process.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'silverpine-shared',
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -108,5 +134,37 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
-SESSION_COOKIE_AGE = 86400  # 24 hours
\ No newline at end of file
+SESSION_ENGINE = 'apps.students.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_COOKIE_AGE = 86400  # 24 hours
+SESSION_LOCAL_CACHE_SIZE = 10000   # sessions each process keeps in memory
+SESSION_LOCAL_MAX_AGE = 2          # seconds a process trusts its own copy before rereading the cache
+SESSION_WRITE_BEHIND_DELAY = 1     # seconds between batched session writes to the database
+SESSION_WRITE_BEHIND_BATCH = 500   # queued sessions that trigger an early write
+
+# Seconds a process may reuse a logged-in student's record before rereading it
+STUDENT_CONTEXT_TTL = 30
+
+# Course catalog
+CATALOG_PAGE_SIZE = 24
+CATALOG_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+
+# Running course grades, cached per enrollment until an assignment changes
+COURSE_GRADE_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+
+# Live seat counts pushed to the registration page
+SEAT_EVENTS_BACKEND = 'apps.courses.events.LocalSeatEventBroker'
+
+# Admission control for registration surges, per protected view
+ADMISSION_BACKEND = 'apps.courses.admission.LocalAdmissionBackend'
+ADMISSION_CONTROL = {
+    'course_registration': {
+        'rate': 10,          # requests admitted per second
+        'burst': 20,
+        'queue_size': 500,
+    },
+}
+
+# Registration carts live in the cache so that editing them never writes to the database
+CART_TIMEOUT = SESSION_COOKIE_AGE
+CART_MAX_ITEMS = 10
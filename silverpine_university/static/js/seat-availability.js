@@ -0,0 +1,71 @@
+// ===== LIVE SEAT AVAILABILITY =====
+
+(function() {
+    const script = document.currentScript;
+    const availabilityUrl = script && script.dataset.availabilityUrl;
+    const eventsUrl = script && script.dataset.eventsUrl;
+    const REFRESH_INTERVAL = 15000;
+    let etag = null;
+
+    function applySeats(sections) {
+        Object.entries(sections).forEach(([sectionId, seats]) => {
+            const counter = document.querySelector(`[data-seats-for="${sectionId}"]`);
+            if (!counter) {
+                return;
+            }
+            counter.textContent = `${seats.available} / ${seats.capacity}`;
+            counter.classList.toggle('low-seats', seats.available <= 5);
+        });
+    }
+
+    function refreshSeats() {
+        if (document.hidden) {
+            return;
+        }
+
+        // Conditional GET: an unchanged seat version comes back as an empty 304
+        const headers = etag ? { 'If-None-Match': etag } : {};
+        fetch(availabilityUrl, { headers: headers, cache: 'no-store', credentials: 'same-origin' })
+            .then(response => {
+                if (response.status !== 200) {
+                    return null;
+                }
+                etag = response.headers.get('ETag');
+                return response.json();
+            })
+            .then(snapshot => {
+                if (snapshot) {
+                    applySeats(snapshot.sections);
+                }
+            })
+            .catch(() => {});
+    }
+
+    function pollSeats() {
+        if (!availabilityUrl) {
+            return;
+        }
+        setInterval(refreshSeats, REFRESH_INTERVAL);
+        document.addEventListener('visibilitychange', refreshSeats);
+    }
+
+    function listenForSeats() {
+        // One long-lived stream pushes seat changes as enrollments commit
+        const source = new EventSource(eventsUrl);
+        source.addEventListener('snapshot', event => applySeats(JSON.parse(event.data).sections));
+        source.addEventListener('seats', event => applySeats(JSON.parse(event.data)));
+        source.addEventListener('error', () => {
+            // A 204 (no streaming on this server) or any other refusal closes the
+            // source for good; keep the counts fresh with conditional GETs instead
+            if (source.readyState === EventSource.CLOSED) {
+                pollSeats();
+            }
+        });
+    }
+
+    if (eventsUrl && window.EventSource) {
+        listenForSeats();
+    } else {
+        pollSeats();
+    }
+})();
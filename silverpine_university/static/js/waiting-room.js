@@ -0,0 +1,22 @@
+// ===== REGISTRATION WAITING ROOM =====
+
+(function() {
+    const form = document.getElementById('waiting-room-form');
+    const countdown = document.querySelector('[data-countdown]');
+    if (!form) {
+        return;
+    }
+
+    let remaining = parseInt(form.dataset.retryAfter, 10) || 1;
+    const timer = setInterval(() => {
+        remaining -= 1;
+        if (countdown) {
+            countdown.textContent = Math.max(remaining, 0);
+        }
+        if (remaining <= 0) {
+            clearInterval(timer);
+            // Resubmit the original request with the ticket cookie to keep our place
+            form.submit();
+        }
+    }, 1000);
+})();